@@ -0,0 +1,51 @@
+import pytest
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher.models import Cipher
+from mp.apps.cipher.tests.factories import CipherFactory
+
+pytestmark = pytest.mark.django_db
+
+ROWS = 500
+
+
+def _read_fields(ciphers: list[Cipher]) -> None:
+    for cipher in ciphers:
+        _ = (cipher.key, cipher.is_favorite, cipher.status)
+
+
+@pytest.fixture
+def vault():
+    owner = UserFactory()
+    CipherFactory.create_batch(ROWS, owner=owner)
+    return owner
+
+
+def test_eager_decryption(benchmark, vault):
+    def run():
+        _read_fields(list(Cipher.objects.filter(owner=vault).eager()))
+
+    benchmark("decrypt rows: eager", run, rounds=20, ops_per_round=ROWS)
+
+
+def test_lazy_decryption(benchmark, vault):
+    def run():
+        _read_fields(list(Cipher.objects.filter(owner=vault)))
+
+    benchmark("decrypt rows: lazy", run, rounds=20, ops_per_round=ROWS)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4, 8])
+def test_batch_decryption(benchmark, settings, vault, workers):
+    settings.DB_DECRYPTION_WORKERS = workers
+    settings.DB_DECRYPTION_PARALLEL_THRESHOLD = 0
+
+    def run():
+        _read_fields(list(Cipher.objects.filter(owner=vault).batch_decrypt()))
+
+    benchmark(
+        f"decrypt rows: batch, {workers} workers",
+        run,
+        rounds=20,
+        ops_per_round=ROWS,
+    )
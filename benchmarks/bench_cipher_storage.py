@@ -0,0 +1,69 @@
+import base64
+import os
+
+import pytest
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher.graphql.types import Cipher as CipherType
+from mp.apps.cipher.models import CipherDataStorage
+from mp.apps.cipher.models import CipherType as CipherTypeChoices
+from mp.apps.cipher.services import create_cipher, get_all_ciphers_by_owner
+
+pytestmark = pytest.mark.django_db
+
+STORAGES = [CipherDataStorage.TABLES, CipherDataStorage.INLINE]
+VAULT_SIZE = 1000
+
+
+def _random_text(size: int) -> str:
+    # Base64 like the client-side encrypted values the server receives.
+    return base64.b64encode(os.urandom(size * 3 // 4)).decode("utf-8")[:size]
+
+
+def _create_login_cipher(owner):
+    return create_cipher(
+        owner=owner,
+        type=CipherTypeChoices.LOGIN,
+        name=_random_text(64),
+        key=_random_text(64),
+        status=_random_text(32),
+        is_favorite=_random_text(32),
+        data={
+            "username": _random_text(64),
+            "password": _random_text(64),
+            "authenticatorKey": _random_text(64),
+        },
+        notes=_random_text(256),
+    )
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_create_cipher(benchmark, settings, storage):
+    settings.CIPHER_DATA_STORAGE = storage
+    owner = UserFactory()
+
+    benchmark(
+        f"create cipher, {storage} storage",
+        lambda: _create_login_cipher(owner),
+        rounds=200,
+    )
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_vault_listing(benchmark, settings, storage):
+    settings.CIPHER_DATA_STORAGE = storage
+    owner = UserFactory()
+    for _ in range(VAULT_SIZE):
+        _create_login_cipher(owner)
+
+    def list_vault():
+        for cipher in get_all_ciphers_by_owner(owner).batch_decrypt():
+            CipherType.from_model(cipher)
+
+    benchmark(
+        f"vault listing, {VAULT_SIZE} ciphers, {storage} storage",
+        list_vault,
+        rounds=5,
+        ops_per_round=VAULT_SIZE,
+        warmup=1,
+    )
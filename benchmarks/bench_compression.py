@@ -0,0 +1,41 @@
+import base64
+import os
+
+import pytest
+from django.test import override_settings
+
+from mp.core.model.fields import EncryptedTextField
+
+# Secure note bodies are encrypted client-side, the server receives them as a
+# "<type>.<iv>|<data>|<mac>" string of base64 encoded random bytes.
+SIZES = [1024, 8192, 65536]
+
+
+def _client_encrypted(size: int) -> str:
+    iv = base64.b64encode(os.urandom(16)).decode("utf-8")
+    mac = base64.b64encode(os.urandom(32)).decode("utf-8")
+    data = base64.b64encode(os.urandom(size * 3 // 4)).decode("utf-8")
+    return f"2.{iv}|{data}|{mac}"
+
+
+def _plain_text(size: int) -> str:
+    text = "- [ ] Rotate the staging database password every quarter.\n"
+    return (text * (size // len(text) + 1))[:size]
+
+
+@override_settings(DB_COMPRESSION_THRESHOLD=1024)
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("payload", [_client_encrypted, _plain_text])
+@pytest.mark.parametrize("compress", [False, True])
+def test_compression(benchmark, size, payload, compress):
+    field = EncryptedTextField(compress=compress)
+    value = payload(size)
+    encrypted_value = field.encrypt(value)
+
+    name = f"{payload.__name__.strip('_')}, {size}B, compress={compress}"
+    benchmark(
+        f"{name}: decrypt",
+        lambda: field.decrypt(encrypted_value),
+        extra={"stored_bytes": len(encrypted_value), "value_bytes": len(value)},
+    )
+    benchmark(f"{name}: encrypt", lambda: field.encrypt(value))
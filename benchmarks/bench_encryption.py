@@ -0,0 +1,187 @@
+import base64
+import os
+from uuid import uuid4
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+
+from mp.apps.authx.models import RSAOAEPKey
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher.graphql.types import Cipher as CipherType
+from mp.apps.cipher.models import (
+    Cipher,
+    CipherCardData,
+    CipherDatabaseData,
+    CipherLoginData,
+    CipherType as CipherTypeChoices,
+)
+from mp.apps.cipher.services import get_all_ciphers_by_owner
+from mp.core.model.datakeys import data_key_scope
+from mp.core.model.fields import EncryptedBinaryField
+
+pytestmark = pytest.mark.django_db
+
+PAYLOAD_SIZES = [32, 256, 4096, 65536]
+
+
+def _random_text(size: int) -> str:
+    # Base64 like the client-side encrypted values the server receives.
+    return base64.b64encode(os.urandom(size * 3 // 4)).decode("utf-8")[:size]
+
+
+def _text_field(model, name):
+    return model._meta.get_field(name)
+
+
+# Field encrypt/decrypt.
+
+
+@pytest.mark.parametrize("size", PAYLOAD_SIZES)
+def test_text_field_master_key(benchmark, size):
+    field = _text_field(RSAOAEPKey, "public_key")
+    value = _random_text(size)
+    encrypted_value = field.encrypt(value)
+
+    benchmark(f"text field encrypt, master key, {size}B", lambda: field.encrypt(value))
+    benchmark(
+        f"text field decrypt, master key, {size}B",
+        lambda: field.decrypt(encrypted_value),
+    )
+
+
+@pytest.mark.parametrize("size", PAYLOAD_SIZES)
+def test_text_field_data_key(benchmark, size):
+    field = _text_field(Cipher, "key")
+    value = _random_text(size)
+
+    with data_key_scope(UserFactory()):
+        encrypted_value = field.encrypt(value)
+        benchmark(
+            f"text field encrypt, data key, {size}B",
+            lambda: field.encrypt(value),
+        )
+    benchmark(
+        f"text field decrypt, data key, {size}B",
+        lambda: field.decrypt(encrypted_value),
+    )
+
+
+@pytest.mark.parametrize("size", PAYLOAD_SIZES)
+def test_binary_field(benchmark, size):
+    field = EncryptedBinaryField()
+    value = _random_text(size)
+    encrypted_value = field.encrypt(value)
+
+    benchmark(f"binary field encrypt, {size}B", lambda: field.encrypt(value))
+    benchmark(f"binary field decrypt, {size}B", lambda: field.decrypt(encrypted_value))
+
+
+# Model round-trips.
+
+
+def _build_login_data() -> CipherLoginData:
+    return CipherLoginData(
+        name=_random_text(64),
+        notes=_random_text(256),
+        username=_random_text(64),
+        password=_random_text(64),
+        authenticator_key=_random_text(64),
+    )
+
+
+def _build_card_data() -> CipherCardData:
+    return CipherCardData(
+        name=_random_text(64),
+        notes=_random_text(256),
+        cardholder_name=_random_text(64),
+        number=_random_text(64),
+        brand=_random_text(64),
+        exp_month=_random_text(64),
+        exp_year=_random_text(64),
+        security_code=_random_text(64),
+    )
+
+
+def _build_database_data() -> CipherDatabaseData:
+    return CipherDatabaseData(
+        name=_random_text(64),
+        notes=_random_text(256),
+        engine=_random_text(64),
+        connection_type=_random_text(64),
+        url=_random_text(128),
+        host=_random_text(64),
+        port=_random_text(64),
+        database=_random_text(64),
+        username=_random_text(64),
+        password=_random_text(64),
+    )
+
+
+@pytest.mark.parametrize(
+    "build_data",
+    [_build_login_data, _build_card_data, _build_database_data],
+)
+def test_model_round_trip(benchmark, build_data):
+    obj = build_data()
+    model = obj.__class__
+    model_name = model.__name__
+    field_names = [f.attname for f in model._meta.concrete_fields]
+
+    def save():
+        obj.pk = None
+        obj.uuid = uuid4()
+        obj.save()
+
+    def load():
+        loaded_obj = model.objects.get(pk=obj.pk)
+        for name in field_names:
+            getattr(loaded_obj, name)
+
+    benchmark(f"{model_name} save", save, rounds=50)
+    benchmark(f"{model_name} load", load, rounds=50)
+
+
+# Vault listing.
+
+
+def _create_vault(size: int):
+    owner = UserFactory()
+    with data_key_scope(owner):
+        cipher_data = CipherLoginData.objects.bulk_create(
+            [_build_login_data() for _ in range(size)],
+            batch_size=1000,
+        )
+        content_type = ContentType.objects.get_for_model(CipherLoginData)
+        Cipher.objects.bulk_create(
+            [
+                Cipher(
+                    owner=owner,
+                    type=CipherTypeChoices.LOGIN,
+                    key=_random_text(64),
+                    is_favorite=_random_text(32),
+                    status=_random_text(32),
+                    content_type=content_type,
+                    object_id=data.pk,
+                )
+                for data in cipher_data
+            ],
+            batch_size=1000,
+        )
+    return owner
+
+
+@pytest.mark.parametrize("size", [1000, 10000])
+def test_vault_listing(benchmark, size):
+    owner = _create_vault(size)
+
+    def list_vault():
+        for cipher in get_all_ciphers_by_owner(owner).batch_decrypt():
+            CipherType.from_model(cipher)
+
+    benchmark(
+        f"vault listing, {size} ciphers",
+        list_vault,
+        rounds=3,
+        ops_per_round=size,
+        warmup=0,
+    )
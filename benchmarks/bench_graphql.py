@@ -0,0 +1,62 @@
+import pytest
+from strawberry.extensions import ParserCache, ValidationCache
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.core.strawberry.test import TestClient
+from mp.graphql.schema import schema
+
+pytestmark = pytest.mark.django_db
+
+# Listing query of the web client, on an empty vault to mostly measure the
+# request overhead.
+CIPHERS_QUERY = """
+    query Ciphers($first: Int, $after: String) {
+        ciphers(first: $first, after: $after) {
+            edges {
+                node {
+                    id
+                    type
+                    name
+                    key
+                    status
+                    isFavorite
+                    data
+                    notes
+                    created
+                    updated
+                }
+            }
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+        }
+    }
+"""
+
+
+def _clear_document_caches():
+    for extension in schema.extensions:
+        if isinstance(extension, ParserCache):
+            extension.cached_parse_document.cache_clear()
+        elif isinstance(extension, ValidationCache):
+            extension.cached_validate_document.cache_clear()
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_ciphers_query(benchmark, cached):
+    user = UserFactory()
+    client = TestClient("/graphql")
+    client._client.force_login(user)  # noqa: SLF001
+
+    def query():
+        if not cached:
+            _clear_document_caches()
+        return client.query(CIPHERS_QUERY, variables={"first": 50})
+
+    benchmark(
+        f"ciphers query, document cache {'on' if cached else 'off'}",
+        query,
+        rounds=500,
+        warmup=10,
+    )
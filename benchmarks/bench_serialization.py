@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from mp.apps.cipher.models import CipherCardData, CipherType
+from mp.apps.cipher.services import DATA_BUILDER_FACTORY
+
+pytestmark = pytest.mark.django_db
+
+ITEMS = 10000
+
+CARD_DATA = {
+    "cardholderName": "John Doe",
+    "number": "4111111111111111",
+    "brand": "Visa",
+    "expMonth": "01",
+    "expYear": "2030",
+    "securityCode": "123",
+}
+
+
+def _legacy_to_json(cipher_data):
+    # Field names resolved per call, as before the precomputed field names.
+    data = {}
+    for f in cipher_data._meta.concrete_fields:  # noqa: SLF001
+        if f.name in ("id", "uuid", "name", "notes"):
+            continue
+        field_name = re.sub(r"_([a-z])", lambda x: x.group(1).upper(), f.name)
+        data[field_name] = f.value_from_object(cipher_data)
+    return data
+
+
+def _legacy_set_cipher_data(cipher_data, new_data):
+    for key, value in new_data.items():
+        _key = "".join("_" + c.lower() if c.isupper() else c for c in key)
+        setattr(cipher_data, _key, value)
+
+
+@pytest.mark.parametrize("implementation", ["legacy", "precomputed"])
+def test_to_json(benchmark, implementation):
+    cipher_data = CipherCardData(
+        **{CipherCardData.data_fields.attnames[k]: v for k, v in CARD_DATA.items()}
+    )
+    to_json = _legacy_to_json if implementation == "legacy" else CipherCardData.to_json
+
+    def serialize():
+        for _ in range(ITEMS):
+            to_json(cipher_data)
+
+    benchmark(
+        f"card data to_json, {implementation}",
+        serialize,
+        rounds=10,
+        ops_per_round=ITEMS,
+        warmup=1,
+    )
+
+
+@pytest.mark.parametrize("implementation", ["legacy", "precomputed"])
+def test_set_cipher_data(benchmark, implementation):
+    cipher_data = CipherCardData()
+    builder = DATA_BUILDER_FACTORY[CipherType.CARD]
+
+    def deserialize():
+        for _ in range(ITEMS):
+            if implementation == "legacy":
+                _legacy_set_cipher_data(cipher_data, CARD_DATA)
+            else:
+                builder.set_cipher_data(cipher_data, CARD_DATA)
+
+    benchmark(
+        f"card data set_cipher_data, {implementation}",
+        deserialize,
+        rounds=10,
+        ops_per_round=ITEMS,
+        warmup=1,
+    )
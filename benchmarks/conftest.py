@@ -0,0 +1,116 @@
+"""Benchmark harness.
+
+Benchmarks are not collected by the regular test run, run them explicitly:
+
+    pytest benchmarks/bench_*.py
+
+Set `BENCHMARK_OUTPUT` to a file path to also write the results as JSON.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+
+import pytest
+
+_results: list["BenchmarkResult"] = []
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    rounds: int
+    ops_per_round: int
+    ops_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    # Other measurements, e.g. sizes.
+    extra: dict[str, float] = field(default_factory=dict)
+
+
+def _percentile(timings: list[float], percentile: int) -> float:
+    if len(timings) == 1:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[percentile - 1]
+
+
+class Benchmark:
+    def __call__(
+        self,
+        name: str,
+        func: Callable[[], object],
+        *,
+        rounds: int = 100,
+        ops_per_round: int = 1,
+        warmup: int = 3,
+        extra: dict[str, float] | None = None,
+    ) -> BenchmarkResult:
+        """Time `rounds` calls of `func`, each call performing `ops_per_round` ops.
+
+        Latencies (p50/p99) are per round, throughput is per operation.
+        """
+        for _ in range(warmup):
+            func()
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        result = BenchmarkResult(
+            name=name,
+            rounds=rounds,
+            ops_per_round=ops_per_round,
+            ops_per_sec=rounds * ops_per_round / sum(timings),
+            p50_ms=_percentile(timings, 50) * 1000,
+            p99_ms=_percentile(timings, 99) * 1000,
+            extra=extra or {},
+        )
+        _results.append(result)
+        return result
+
+
+@pytest.fixture
+def benchmark() -> Benchmark:
+    return Benchmark()
+
+
+def pytest_terminal_summary(terminalreporter) -> None:  # noqa: ANN001
+    if not _results:
+        return
+
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(
+        f"{'name':<56} {'ops/sec':>12} {'p50 ms':>10} {'p99 ms':>10}",
+    )
+    for result in _results:
+        extra = " ".join(f"{key}={value}" for key, value in result.extra.items())
+        terminalreporter.write_line(
+            f"{result.name:<56} {result.ops_per_sec:>12.1f} "
+            f"{result.p50_ms:>10.3f} {result.p99_ms:>10.3f} {extra}".rstrip(),
+        )
+
+
+def pytest_sessionfinish() -> None:
+    output = os.environ.get("BENCHMARK_OUTPUT")
+    if not output or not _results:
+        return
+
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "created": datetime.now(tz=UTC).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpu_count": os.cpu_count(),
+                "results": [asdict(result) for result in _results],
+            },
+            f,
+            indent=2,
+        )
@@ -0,0 +1,111 @@
+"""Load test of the /graphql endpoint of a running server.
+
+Sends a query (the vault listing by default) from `--concurrency` clients at once for
+`--duration` seconds and prints the throughput and latencies, e.g. to compare
+the sync (gunicorn) and async (uvicorn) deployments:
+
+    python benchmarks/load_graphql.py --sessionid <session id> --concurrency 50
+
+The session id is the `sessionid` cookie of a logged in user.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+CSRF_TOKEN = "loadtestloadtestloadtestloadtest"  # noqa: S105
+
+QUERIES = {
+    # Vault listing, mostly decryption.
+    "ciphers": """
+        query Ciphers($first: Int) {
+            ciphers(first: $first) {
+                edges { node { id type name key status isFavorite data notes } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+    """,
+    # Single database lookup.
+    "revision": "query { vaultRevision }",
+}
+
+
+def _client(
+    args: argparse.Namespace,
+    deadline: float,
+    latencies: list[float],
+    errors: list[str],
+) -> None:
+    url = urlsplit(args.url)
+    connection = http.client.HTTPConnection(url.netloc, timeout=60)
+    body = json.dumps(
+        {"query": QUERIES[args.query], "variables": {"first": args.first}}
+    )
+    headers = {
+        "Content-Type": "application/json",
+        "Cookie": f"sessionid={args.sessionid}; csrftoken={CSRF_TOKEN}",
+        "X-CSRFToken": CSRF_TOKEN,
+    }
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request("POST", url.path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as error:
+            errors.append(repr(error))
+            connection.close()
+            continue
+
+        if response.status != 200 or b'"errors"' in data:
+            errors.append(f"{response.status}: {data[:200]!r}")
+        else:
+            latencies.append(time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000/graphql")
+    parser.add_argument("--sessionid", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--query", choices=QUERIES, default="ciphers")
+    parser.add_argument("--first", type=int, default=50, help="ciphers per query")
+    args = parser.parse_args()
+
+    latencies: list[float] = []
+    errors: list[str] = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=_client, args=(args, deadline, latencies, errors))
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = [
+        f"query        {args.query}, concurrency {args.concurrency}",
+        f"requests     {len(latencies)} ok, {len(errors)} failed",
+        f"throughput   {len(latencies) / args.duration:.1f} req/s",
+    ]
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        lines += [
+            f"p50          {percentiles[49] * 1000:.1f} ms",
+            f"p99          {percentiles[98] * 1000:.1f} ms",
+        ]
+    if errors:
+        lines.append(f"first error  {errors[0]}")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
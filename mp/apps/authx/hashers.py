@@ -1,13 +1,31 @@
 from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
 
+from mp.core.instrumentation import timed_crypto_op
+
 
 class MellonPassPBKDF2PasswordHasher(PBKDF2PasswordHasher):
     """A subclass of PBKDF2PasswordHasher that uses 720k iterations."""
 
     iterations = 720000
 
+    @timed_crypto_op("pbkdf2")
+    def encode(self, *args, **kwargs) -> str:  # noqa: ANN002
+        return super().encode(*args, **kwargs)
+
+    @timed_crypto_op("pbkdf2")
+    def verify(self, *args, **kwargs) -> bool:  # noqa: ANN002
+        return super().verify(*args, **kwargs)
+
 
 class MellonPassArgon2PasswordHasher(Argon2PasswordHasher):
     """A subclass of Argon2PasswordHasher that uses 10x time cost."""
 
     time_cost = 10
+
+    @timed_crypto_op("argon2")
+    def encode(self, *args, **kwargs) -> str:  # noqa: ANN002
+        return super().encode(*args, **kwargs)
+
+    @timed_crypto_op("argon2")
+    def verify(self, *args, **kwargs) -> bool:  # noqa: ANN002
+        return super().verify(*args, **kwargs)
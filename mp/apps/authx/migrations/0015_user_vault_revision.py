@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authx", "0014_rsaoaepkey_delete_userecc"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="vault_revision",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                help_text="Incremented on every change of the user's ciphers.",
+            ),
+        ),
+    ]
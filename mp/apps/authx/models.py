@@ -17,6 +17,7 @@ from django.db.models import (
     ForeignKey,
     Model,
     OneToOneField,
+    PositiveBigIntegerField,
     UUIDField,
 )
 from django.utils import timezone
@@ -81,6 +82,11 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     verified = BooleanField(default=False)
 
+    vault_revision = PositiveBigIntegerField(
+        default=0,
+        help_text="Incremented on every change of the user's ciphers.",
+    )
+
     date_joined = DateTimeField(auto_now_add=True)
     updated = DateTimeField(auto_now=True)
 
@@ -4,8 +4,10 @@ from mp.apps.cipher.models import (
     Cipher,
     CipherCardData,
     CipherDatabaseData,
+    CipherImport,
     CipherLoginData,
     CipherSecureNoteData,
+    CipherTombstone,
 )
 
 
@@ -14,8 +16,19 @@ class CipherAdmin(admin.ModelAdmin):
     readonly_fields = ("uuid",)
 
 
+class CipherTombstoneAdmin(admin.ModelAdmin):
+    list_display = ("uuid", "owner", "deleted")
+
+
+class CipherImportAdmin(admin.ModelAdmin):
+    list_display = ("uuid", "owner", "status", "imported", "failed", "created")
+    readonly_fields = ("uuid",)
+
+
 admin.site.register(CipherCardData)
 admin.site.register(CipherDatabaseData)
 admin.site.register(CipherLoginData)
 admin.site.register(CipherSecureNoteData)
 admin.site.register(Cipher, CipherAdmin)
+admin.site.register(CipherTombstone, CipherTombstoneAdmin)
+admin.site.register(CipherImport, CipherImportAdmin)
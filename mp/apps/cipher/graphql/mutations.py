@@ -2,12 +2,17 @@ import logging
 from uuid import UUID
 
 import strawberry
+from asgiref.sync import sync_to_async
 from django.db import transaction
+from strawberry import relay
 
 from mp.apps.cipher.graphql.types import (
     Cipher,
     CipherCreateFailed,
     CipherCreatePayload,
+    CipherDeleted,
+    CipherDeleteFailed,
+    CipherDeletePayload,
     CipherUpdateFailed,
     CipherUpdatePayload,
     CreateCipherInput,
@@ -16,10 +21,14 @@ from mp.apps.cipher.graphql.types import (
 from mp.apps.cipher.models import Cipher as CipherModel
 from mp.apps.cipher.services import (
     create_cipher,
+    create_ciphers,
+    delete_ciphers_by_owner_and_uuids,
     restore_cipher_from_delete_state,
     update_cipher,
     update_cipher_to_delete_state,
+    update_ciphers,
 )
+from mp.core.exceptions import ServiceValidationError
 from mp.core.graphql.permissions import IsAuthenticated
 
 logger = logging.getLogger(__name__)
@@ -156,3 +165,219 @@ class CipherMutation:
             return CipherUpdateFailed(
                 message="Something went wrong when updating a vault item.",
             )
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    def create_many(
+        self,
+        info: strawberry.Info,
+        input: list[CreateCipherInput],
+    ) -> list[CipherCreatePayload]:
+        """Create the ciphers in one transaction, one result per input."""
+        try:
+            results = create_ciphers(
+                owner=info.context.request.user,
+                items=[
+                    {
+                        "type": item.type.value,
+                        "name": item.name,
+                        "key": item.key,
+                        "status": item.status,
+                        "is_favorite": item.isFavorite,
+                        "data": item.data,
+                        "notes": item.notes,
+                    }
+                    for item in input
+                ],
+            )
+        except ServiceValidationError as error:
+            logger.warning("Create ciphers rejected!", exc_info=error)
+            return [CipherCreateFailed(message=str(error)) for _ in input]
+        except Exception as error:
+            # log error with stacktrace do not reveal on API.
+            logger.exception("Create ciphers failed!", exc_info=error)
+            return [
+                CipherCreateFailed(
+                    message="Something went wrong when creating a vault item.",
+                )
+                for _ in input
+            ]
+
+        return [
+            Cipher.from_model(result)
+            if isinstance(result, CipherModel)
+            else CipherCreateFailed(message=str(result))
+            for result in results
+        ]
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    def update_many(
+        self,
+        info: strawberry.Info,
+        input: list[UpdateCipherInput],
+    ) -> list[CipherUpdatePayload]:
+        """Update the ciphers in one transaction, one result per input."""
+        uuids = [_get_cipher_uuid(item.id) for item in input]
+        try:
+            results = iter(
+                update_ciphers(
+                    owner=info.context.request.user,
+                    items=[
+                        {
+                            "uuid": uuid,
+                            "key": item.key,
+                            "is_favorite": item.is_favorite,
+                            "name": item.name,
+                            "status": item.status,
+                            "data": item.data,
+                            "notes": item.notes,
+                        }
+                        for item, uuid in zip(input, uuids, strict=True)
+                        if uuid is not None
+                    ],
+                ),
+            )
+        except ServiceValidationError as error:
+            logger.warning("Update ciphers rejected!", exc_info=error)
+            return [CipherUpdateFailed(message=str(error)) for _ in input]
+        except Exception as error:
+            logger.exception("Unable to update ciphers!", exc_info=error)
+            return [
+                CipherUpdateFailed(
+                    message="Something went wrong when updating a vault item.",
+                )
+                for _ in input
+            ]
+
+        payloads: list[CipherUpdatePayload] = []
+        for item, uuid in zip(input, uuids, strict=True):
+            result = (
+                next(results)
+                if uuid is not None
+                else ServiceValidationError(f"Invalid cipher id {item.id}.")
+            )
+            payloads.append(
+                Cipher.from_model(result)
+                if isinstance(result, CipherModel)
+                else CipherUpdateFailed(message=str(result)),
+            )
+        return payloads
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    def delete_many(
+        self,
+        info: strawberry.Info,
+        ids: list[relay.GlobalID],
+    ) -> CipherDeletePayload:
+        """Delete the ciphers right away, unknown and invalid ids are ignored."""
+        uuids = [_get_cipher_uuid(global_id) for global_id in ids]
+        try:
+            deleted_uuids = delete_ciphers_by_owner_and_uuids(
+                owner=info.context.request.user,
+                uuids=[uuid for uuid in uuids if uuid is not None],
+            )
+        except ServiceValidationError as error:
+            logger.warning("Delete ciphers rejected!", exc_info=error)
+            return CipherDeleteFailed(message=str(error))
+        except Exception as error:
+            logger.exception("Unable to delete ciphers!", exc_info=error)
+            return CipherDeleteFailed(
+                message="Something went wrong when deleting vault items.",
+            )
+
+        return CipherDeleted(
+            deleted_ids=[
+                relay.GlobalID(type_name=Cipher.__name__, node_id=str(uuid))
+                for uuid in deleted_uuids
+            ],
+        )
+
+
+def _get_cipher_uuid(global_id: relay.GlobalID) -> UUID | None:
+    try:
+        return UUID(global_id.node_id)
+    except ValueError:
+        return None
+
+
+@strawberry.type(name="CipherMutation")
+class AsyncCipherMutation:
+    """`CipherMutation` for the async schema, each mutation runs in a thread."""
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def create(
+        self,
+        info: strawberry.Info,
+        input: CreateCipherInput,
+    ) -> CipherCreatePayload:
+        return await sync_to_async(CipherMutation.create)(CipherMutation(), info, input)
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def update(
+        self,
+        info: strawberry.Info,
+        input: UpdateCipherInput,
+    ) -> CipherUpdatePayload:
+        return await sync_to_async(CipherMutation.update)(CipherMutation(), info, input)
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def update_to_delete(
+        self,
+        info: strawberry.Info,
+        input: UpdateCipherInput,
+    ) -> CipherUpdatePayload:
+        return await sync_to_async(CipherMutation.update_to_delete)(
+            CipherMutation(),
+            info,
+            input,
+        )
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def restore_cipher_from_delete(
+        self,
+        info: strawberry.Info,
+        input: UpdateCipherInput,
+    ) -> CipherUpdatePayload:
+        return await sync_to_async(CipherMutation.restore_cipher_from_delete)(
+            CipherMutation(),
+            info,
+            input,
+        )
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def create_many(
+        self,
+        info: strawberry.Info,
+        input: list[CreateCipherInput],
+    ) -> list[CipherCreatePayload]:
+        """Create the ciphers in one transaction, one result per input."""
+        return await sync_to_async(CipherMutation.create_many)(
+            CipherMutation(),
+            info,
+            input,
+        )
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def update_many(
+        self,
+        info: strawberry.Info,
+        input: list[UpdateCipherInput],
+    ) -> list[CipherUpdatePayload]:
+        """Update the ciphers in one transaction, one result per input."""
+        return await sync_to_async(CipherMutation.update_many)(
+            CipherMutation(),
+            info,
+            input,
+        )
+
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def delete_many(
+        self,
+        info: strawberry.Info,
+        ids: list[relay.GlobalID],
+    ) -> CipherDeletePayload:
+        """Delete the ciphers right away, unknown ids are ignored."""
+        return await sync_to_async(CipherMutation.delete_many)(
+            CipherMutation(),
+            info,
+            ids,
+        )
@@ -4,13 +4,31 @@ from typing import cast
 from uuid import UUID
 
 import strawberry
+from asgiref.sync import sync_to_async
 from strawberry import relay
 
-from mp.apps.cipher.graphql.types import Cipher, CipherConnection
+from mp.apps.cipher.graphql.types import (
+    AsyncCipherConnection,
+    Cipher,
+    CipherConnection,
+    CipherImport,
+    CipherSync,
+    CipherSyncFailed,
+    CipherSyncPayload,
+)
 from mp.apps.cipher.models import Cipher as CipherModel
+from mp.apps.cipher.models import CipherImport as CipherImportModel
 from mp.apps.cipher.services import (
+    InvalidSyncTokenError,
+    aget_cipher_by_owner_and_uuid,
+    aget_cipher_import_by_owner_and_uuid,
+    aget_vault_revision,
+    create_sync_token,
     get_all_ciphers_by_owner,
     get_cipher_by_owner_and_uuid,
+    get_cipher_changes,
+    get_cipher_import_by_owner_and_uuid,
+    get_vault_revision,
 )
 from mp.core.graphql.permissions import IsAuthenticated
 
@@ -43,5 +61,136 @@ class CipherQuery:
     def ciphers(self, info: strawberry.Info) -> Iterable[Cipher]:
         return cast(
             "Iterable",
-            get_all_ciphers_by_owner(owner=info.context.request.user),
+            get_all_ciphers_by_owner(owner=info.context.request.user).batch_decrypt(),
+        )
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    def vault_revision(self, info: strawberry.Info) -> int:
+        """Incremented on every change of the user's ciphers."""
+        return get_vault_revision(owner=info.context.request.user)
+
+    @strawberry.field(
+        permission_classes=[IsAuthenticated],
+        deprecation_reason="Use the `syncToken` of the first `ciphers` page.",
+    )
+    def cipher_sync_token(self, info: strawberry.Info) -> str:
+        """Sync token to use with `ciphersChangedSince`.
+
+        It must be obtained before the full sync starts, otherwise the changes
+        made during the full sync are missed. `ciphers` returns it with the first
+        page.
+        """
+        return create_sync_token(owner=info.context.request.user)
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    def ciphers_changed_since(
+        self,
+        info: strawberry.Info,
+        sync_token: str,
+    ) -> CipherSyncPayload:
+        try:
+            changes = get_cipher_changes(
+                owner=info.context.request.user,
+                sync_token=sync_token,
+            )
+        except InvalidSyncTokenError as error:
+            return CipherSyncFailed(message=str(error))
+
+        return CipherSync(
+            ciphers=[Cipher.from_model(cipher) for cipher in changes.ciphers],
+            deleted_ids=[
+                relay.GlobalID(type_name=Cipher.__name__, node_id=str(uuid))
+                for uuid in changes.deleted_uuids
+            ],
+            sync_token=changes.sync_token,
+        )
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    def cipher_import(
+        self,
+        info: strawberry.Info,
+        id: relay.GlobalID,
+    ) -> CipherImport | None:
+        """Progress of an import started with `POST /ciphers/import`."""
+        try:
+            cipher_import = get_cipher_import_by_owner_and_uuid(
+                owner=info.context.request.user,
+                uuid=UUID(id.node_id),
+            )
+        except CipherImportModel.DoesNotExist:
+            return None
+        return CipherImport.from_model(cipher_import)
+
+
+@strawberry.type
+class AsyncCipherQuery:
+    """`CipherQuery` for the async schema.
+
+    Lookups use the async ORM, anything decrypting ciphers runs in a thread.
+    """
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def cipher(
+        self,
+        info: strawberry.Info,
+        id: relay.GlobalID,
+    ) -> Cipher | None:
+        try:
+            cipher = await aget_cipher_by_owner_and_uuid(
+                owner=info.context.request.user,
+                uuid=UUID(id.node_id),
+            )
+        except CipherModel.DoesNotExist as error:
+            logger.warning(
+                "Cipher resource not found for %s",
+                id.node_id,
+                exc_info=error,
+            )
+            return None
+        return await sync_to_async(Cipher.from_model)(cipher)
+
+    @relay.connection(AsyncCipherConnection, permission_classes=[IsAuthenticated])
+    def ciphers(self, info: strawberry.Info) -> Iterable[Cipher]:
+        # The queryset is lazy, the connection loads and decrypts it in a thread.
+        return CipherQuery.ciphers(CipherQuery(), info)
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def vault_revision(self, info: strawberry.Info) -> int:
+        """Incremented on every change of the user's ciphers."""
+        return await aget_vault_revision(owner=info.context.request.user)
+
+    @strawberry.field(
+        permission_classes=[IsAuthenticated],
+        deprecation_reason="Use the `syncToken` of the first `ciphers` page.",
+    )
+    async def cipher_sync_token(self, info: strawberry.Info) -> str:
+        """Sync token to use with `ciphersChangedSince`, see `CipherQuery`."""
+        return await sync_to_async(CipherQuery.cipher_sync_token)(CipherQuery(), info)
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def ciphers_changed_since(
+        self,
+        info: strawberry.Info,
+        sync_token: str,
+    ) -> CipherSyncPayload:
+        return await sync_to_async(CipherQuery.ciphers_changed_since)(
+            CipherQuery(),
+            info,
+            sync_token,
         )
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def cipher_import(
+        self,
+        info: strawberry.Info,
+        id: relay.GlobalID,
+    ) -> CipherImport | None:
+        """Progress of an import started with `POST /ciphers/import`."""
+        try:
+            cipher_import = await aget_cipher_import_by_owner_and_uuid(
+                owner=info.context.request.user,
+                uuid=UUID(id.node_id),
+            )
+        except CipherImportModel.DoesNotExist:
+            return None
+        return CipherImport.from_model(cipher_import)
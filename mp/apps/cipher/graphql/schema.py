@@ -1,7 +1,7 @@
 import strawberry
 
-from mp.apps.cipher.graphql.mutations import CipherMutation
-from mp.apps.cipher.graphql.queries import CipherQuery
+from mp.apps.cipher.graphql.mutations import AsyncCipherMutation, CipherMutation
+from mp.apps.cipher.graphql.queries import AsyncCipherQuery, CipherQuery
 
 
 @strawberry.type
@@ -13,3 +13,14 @@ class Mutation:
 
 @strawberry.type
 class Query(CipherQuery): ...
+
+
+@strawberry.type(name="Mutation")
+class AsyncMutation:
+    @strawberry.field
+    def cipher(self) -> AsyncCipherMutation:
+        return AsyncCipherMutation()
+
+
+@strawberry.type(name="Query")
+class AsyncQuery(AsyncCipherQuery): ...
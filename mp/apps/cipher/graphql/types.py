@@ -1,12 +1,17 @@
+from collections.abc import Awaitable
 from datetime import datetime
 from typing import Annotated, cast
 
 import strawberry
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
 from strawberry import relay
+from strawberry.relay.utils import from_base64, to_base64
 from strawberry.scalars import JSON
 
 from mp.apps.cipher.models import Cipher as CipherModel
-from mp.apps.cipher.services import CipherTypeEnum
+from mp.apps.cipher.models import CipherImport as CipherImportModel
+from mp.apps.cipher.services import CipherTypeEnum, create_sync_token
 
 # Types
 
@@ -43,11 +48,161 @@ class Cipher(relay.Node):
 
 
 @strawberry.type
-class CipherConnection(relay.ListConnection[Cipher]):
+class CipherImport(relay.Node):
+    uuid: relay.NodeID[strawberry.ID]
+    status: str
+    total: int
+    imported: int
+    failed: int
+    errors: JSON
+    created: datetime
+    updated: datetime
+
+    @classmethod
+    def from_model(cls, model: CipherImportModel) -> "CipherImport":
+        return cls(
+            uuid=cast("strawberry.ID", model.uuid),
+            status=model.status,
+            total=model.total,
+            imported=model.imported,
+            failed=model.failed,
+            errors=model.errors,
+            created=model.created,
+            updated=model.updated,
+        )
+
+
+CIPHER_CURSOR_PREFIX = "cipher"
+
+
+def to_cipher_cursor(cipher: CipherModel) -> str:
+    return to_base64(CIPHER_CURSOR_PREFIX, cipher.pk)
+
+
+def from_cipher_cursor(cursor: str, argument: str) -> int:
+    try:
+        prefix, pk = from_base64(cursor)
+        if prefix != CIPHER_CURSOR_PREFIX:
+            raise ValueError  # noqa: TRY301
+        return int(pk)
+    except ValueError as error:
+        err_msg = f"Argument '{argument}' contains a non-existing value."
+        raise TypeError(err_msg) from error
+
+
+@strawberry.type(name="CipherEdge")
+class CipherEdge(relay.Edge[Cipher]): ...
+
+
+@strawberry.type
+class CipherConnection(relay.Connection[Cipher]):
+    """Ciphers paginated by primary key (keyset) cursors.
+
+    Pages are read with `WHERE id > cursor ORDER BY id LIMIT n` (or the reverse
+    with `last`/`before`), so the cost of a page doesn't depend on its depth and
+    the ordering stays stable while ciphers are added or removed.
+    """
+
+    edges: list[CipherEdge] = strawberry.field(
+        description="Contains the nodes in this connection",
+    )
+    sync_token: str | None = strawberry.field(
+        default=None,
+        description=(
+            "Sync token to use with `ciphersChangedSince` once every page is "
+            "read. Only set on the first page (without `after`/`before`), it is "
+            "issued before the page is read so no change made during the full "
+            "sync is missed."
+        ),
+    )
+
     @classmethod
     def resolve_node(cls, node: CipherModel, **_kwargs) -> Cipher:  # type: ignore[override]
         return Cipher.from_model(node)
 
+    @classmethod
+    def resolve_connection(  # type: ignore[override]
+        cls,
+        nodes: QuerySet[CipherModel],
+        *,
+        info: strawberry.Info,
+        before: str | None = None,
+        after: str | None = None,
+        first: int | None = None,
+        last: int | None = None,
+        max_results: int | None = None,
+        **kwargs,
+    ) -> "CipherConnection":
+        max_results = (
+            max_results
+            if max_results is not None
+            else info.schema.config.relay_max_results
+        )
+        for argument, value in (("first", first), ("last", last)):
+            if value is None:
+                continue
+            if value < 0:
+                err_msg = f"Argument '{argument}' must be a non-negative integer."
+                raise ValueError(err_msg)
+            if value > max_results:
+                err_msg = f"Argument '{argument}' cannot be higher than {max_results}."
+                raise ValueError(err_msg)
+
+        if after:
+            nodes = nodes.filter(pk__gt=from_cipher_cursor(after, "after"))
+        if before:
+            nodes = nodes.filter(pk__lt=from_cipher_cursor(before, "before"))
+
+        # Issued before reading the first page, see `sync_token`.
+        sync_token = (
+            None
+            if after or before
+            else create_sync_token(owner=info.context.request.user)
+        )
+
+        backward = first is None and last is not None
+        limit = last if backward else first
+        if limit is None:
+            limit = max_results
+
+        # Fetch one more row to know if there is another page.
+        ciphers = list(nodes.order_by("-pk" if backward else "pk")[: limit + 1])
+        has_more = len(ciphers) > limit
+        ciphers = ciphers[:limit]
+        if backward:
+            ciphers.reverse()
+
+        edges = [
+            CipherEdge(
+                cursor=to_cipher_cursor(cipher),
+                node=cls.resolve_node(cipher, info=info, **kwargs),
+            )
+            for cipher in ciphers
+        ]
+        return cls(
+            edges=edges,  # type: ignore[arg-type]
+            page_info=relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_more if backward else bool(after),
+                has_next_page=bool(before) if backward else has_more,
+            ),
+            sync_token=sync_token,
+        )
+
+
+@strawberry.type(name="CipherConnection")
+class AsyncCipherConnection(CipherConnection):
+    """`CipherConnection` of the async schema, resolved in a thread."""
+
+    @classmethod
+    def resolve_connection(  # type: ignore[override]
+        cls,
+        nodes: QuerySet[CipherModel],
+        **kwargs,
+    ) -> Awaitable[CipherConnection]:
+        return sync_to_async(super().resolve_connection)(nodes, **kwargs)
+
 
 @strawberry.type
 class CipherMutateFailed:
@@ -59,14 +214,30 @@ class CipherCreateFailed(CipherMutateFailed): ...
 
 
 @strawberry.type
-class CipherDeletePayload:
+class CipherDeleted:
     deleted_ids: list[relay.GlobalID]
 
 
+@strawberry.type
+class CipherDeleteFailed(CipherMutateFailed): ...
+
+
 @strawberry.type
 class CipherUpdateFailed(CipherMutateFailed): ...
 
 
+@strawberry.type
+class CipherSync:
+    ciphers: list[Cipher]
+    deleted_ids: list[relay.GlobalID]
+    sync_token: str
+
+
+@strawberry.type
+class CipherSyncFailed:
+    message: str
+
+
 CipherCreatePayload = Annotated[
     Cipher | CipherCreateFailed,
     strawberry.union("CipherCreatePayload"),
@@ -77,6 +248,16 @@ CipherUpdatePayload = Annotated[
     strawberry.union("CipherUpdatePayload"),
 ]
 
+CipherDeletePayload = Annotated[
+    CipherDeleted | CipherDeleteFailed,
+    strawberry.union("CipherDeletePayload"),
+]
+
+CipherSyncPayload = Annotated[
+    CipherSync | CipherSyncFailed,
+    strawberry.union("CipherSyncPayload"),
+]
+
 
 # Inputs
 
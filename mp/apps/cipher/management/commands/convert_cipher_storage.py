@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from mp.apps.cipher.models import CipherDataStorage
+from mp.apps.cipher.services import convert_cipher_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the data of existing ciphers to the given storage, set "
+        "CIPHER_DATA_STORAGE to it first so new ciphers use it too."
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument("storage", choices=CipherDataStorage.values)
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):  # noqa: ANN002
+        converted = convert_cipher_storage(
+            CipherDataStorage(options["storage"]),
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{converted} ciphers moved to the {options['storage']} storage.",
+            ),
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 02:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cipher", "0003_cipherdatabasedata_alter_cipher_type"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="cipher",
+            options={"base_manager_name": "objects"},
+        ),
+        migrations.AlterModelOptions(
+            name="ciphercarddata",
+            options={"base_manager_name": "objects"},
+        ),
+        migrations.AlterModelOptions(
+            name="cipherdatabasedata",
+            options={"base_manager_name": "objects"},
+        ),
+        migrations.AlterModelOptions(
+            name="cipherlogindata",
+            options={"base_manager_name": "objects"},
+        ),
+        migrations.AlterModelOptions(
+            name="ciphersecurenotedata",
+            options={"base_manager_name": "objects"},
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.25 on 2026-10-18 02:35
+
+from django.db import migrations
+import mp.core.model.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cipher", "0004_cipher_base_manager"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ciphercarddata",
+            name="notes",
+            field=mp.core.model.fields.EncryptedTextField(
+                blank=True, compress=True, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="cipherdatabasedata",
+            name="notes",
+            field=mp.core.model.fields.EncryptedTextField(
+                blank=True, compress=True, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="cipherlogindata",
+            name="notes",
+            field=mp.core.model.fields.EncryptedTextField(
+                blank=True, compress=True, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ciphersecurenotedata",
+            name="notes",
+            field=mp.core.model.fields.EncryptedTextField(
+                blank=True, compress=True, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.25 on 2026-10-18 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cipher", "0005_compress_notes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cipher",
+            index=models.Index(
+                fields=["owner", "id"], name="cipher_ciph_owner_i_881c9b_idx"
+            ),
+        ),
+    ]
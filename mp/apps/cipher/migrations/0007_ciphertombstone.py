@@ -0,0 +1,53 @@
+# Generated by Django 4.2.25 on 2026-10-18 02:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("cipher", "0006_cipher_owner_id_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CipherTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("uuid", models.UUIDField()),
+                ("deleted", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="cipher",
+            index=models.Index(
+                fields=["owner", "updated"], name="cipher_ciph_owner_i_f5f7f3_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="ciphertombstone",
+            name="owner",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="cipher_tombstones",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ciphertombstone",
+            index=models.Index(
+                fields=["owner", "deleted"], name="cipher_ciph_owner_i_03c7fd_idx"
+            ),
+        ),
+    ]
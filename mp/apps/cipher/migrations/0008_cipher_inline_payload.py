@@ -0,0 +1,38 @@
+# Generated by Django 4.2.25 on 2026-10-18 03:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import mp.core.model.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("cipher", "0007_ciphertombstone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cipher",
+            name="payload",
+            field=mp.core.model.fields.EncryptedTextField(
+                blank=True, compress=True, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="cipher",
+            name="content_type",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="contenttypes.contenttype",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="cipher",
+            name="object_id",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cipher", "0008_cipher_inline_payload"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cipher",
+            index=models.Index(
+                condition=models.Q(("delete_on__isnull", False)),
+                fields=["delete_on"],
+                name="cipher_delete_on_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.25 on 2026-10-18 04:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cipher", "0010_cipherimport"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CipherImportPart",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("data", models.BinaryField()),
+                (
+                    "cipher_import",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="parts",
+                        to="cipher.cipherimport",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("cipher_import", "number")},
+            },
+        ),
+    ]
@@ -1,4 +1,7 @@
+import json
 import re
+from dataclasses import dataclass
+from typing import Any, ClassVar
 from uuid import uuid4
 
 from django.conf import settings
@@ -7,18 +10,25 @@ from django.contrib.contenttypes.models import ContentType
 from django.db.models import (
     CASCADE,
     RESTRICT,
+    BinaryField,
     CharField,
     DateTimeField,
     ForeignKey,
     Index,
+    JSONField,
     Model,
     PositiveIntegerField,
+    Q,
     TextChoices,
     UUIDField,
 )
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from mp.core.model.fields import EncryptedTextField
+from mp.core.model.mixins import EncryptedModelMixin
+from mp.core.model.query import EncryptedQuerySet
 
 
 class CipherType(TextChoices):
@@ -32,7 +42,36 @@ class SecureNoteType(TextChoices):
     GENERIC = "GENERIC", _("Generic")
 
 
-class Cipher(Model):
+class CipherDataStorage(TextChoices):
+    TABLES = "tables", _("Cipher data tables")
+    INLINE = "inline", _("Inline payload")
+
+
+class CipherDataForeignKey(GenericForeignKey):
+    """`Cipher.data`, a row of a cipher data table or built from `Cipher.payload`.
+
+    Ciphers stored inline have no content type, their data is an unsaved
+    `CipherData` instance built from the payload on first access.
+    """
+
+    def __get__(self, instance, cls=None):  # noqa: ANN001, ANN204
+        if instance is None or not instance.has_inline_data:
+            return super().__get__(instance, cls)
+
+        rel_obj = self.get_cached_value(instance, default=None)
+        if rel_obj is None and instance.payload is not None:
+            data_model = CIPHER_DATA_MODELS[CipherType(instance.type)]
+            rel_obj = data_model.from_payload(instance.payload)
+            self.set_cached_value(instance, rel_obj)
+        return rel_obj
+
+    def is_cached(self, instance: Model) -> bool:
+        # The inline data is never saved on its own, e.g. `Model.save()` refuses
+        # to save an instance with an unsaved related object.
+        return not instance.has_inline_data and super().is_cached(instance)
+
+
+class Cipher(EncryptedModelMixin, Model):
     uuid = UUIDField(unique=True, null=False, blank=False, default=uuid4)
     type = CharField(
         max_length=25,
@@ -47,9 +86,12 @@ class Cipher(Model):
         blank=False,
     )
 
-    object_id = PositiveIntegerField()
-    content_type = ForeignKey(ContentType, on_delete=CASCADE)
-    data: "CipherData" = GenericForeignKey("content_type", "object_id")  # type: ignore[assignment]
+    # Empty for ciphers stored inline, see `payload`.
+    object_id = PositiveIntegerField(null=True, blank=True)
+    content_type = ForeignKey(ContentType, on_delete=CASCADE, null=True, blank=True)
+    data: "CipherData" = CipherDataForeignKey("content_type", "object_id")  # type: ignore[assignment]
+    # Cipher data stored inline as encrypted JSON, see `CIPHER_DATA_STORAGE`.
+    payload = EncryptedTextField(null=True, blank=True, compress=True)
 
     owner = ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -66,8 +108,26 @@ class Cipher(Model):
     created = DateTimeField(auto_now_add=True)
     updated = DateTimeField(auto_now=True)
 
+    objects = EncryptedQuerySet.as_manager()
+
+    # Encrypt with the owner's data key, see `mp.core.model.datakeys`.
+    use_data_key_encryption = True
+
     class Meta:
-        indexes = (Index(fields=["content_type", "object_id"]),)
+        base_manager_name = "objects"
+        indexes = (
+            Index(fields=["content_type", "object_id"]),
+            # Keyset pagination of an owner's ciphers, see `CipherConnection`.
+            Index(fields=["owner", "id"]),
+            # Incremental sync, see `get_cipher_changes`.
+            Index(fields=["owner", "updated"]),
+            # Only the ciphers scheduled for deletion, see `delete_ciphers_task`.
+            Index(
+                fields=["delete_on"],
+                condition=Q(delete_on__isnull=False),
+                name="cipher_delete_on_idx",
+            ),
+        )
         unique_together = (
             "content_type",
             "object_id",
@@ -76,8 +136,145 @@ class Cipher(Model):
     def __str__(self) -> str:
         return f"{self.__class__.__name__}:{self.type} - {self.pk}"
 
+    @classmethod
+    def get_data_key_owner_ids(cls, pks: list[int]) -> dict[int, int]:
+        """Return the owner id of the data key of each row, by primary key."""
+        return dict(cls.objects.filter(pk__in=pks).values_list("pk", "owner_id"))
+
+    @property
+    def has_inline_data(self) -> bool:
+        return self.content_type_id is None
+
+    def set_inline_data(self, cipher_data: "CipherData") -> None:
+        """Store the cipher data in `payload` instead of its table."""
+        self.content_type = None
+        self.object_id = None
+        self.payload = cipher_data.to_payload()
+        Cipher.data.set_cached_value(self, cipher_data)
+
+
+class CipherTombstone(Model):
+    """Trace of a deleted cipher, clients remove it on their next sync.
+
+    Tombstones are purged after `CIPHER_TOMBSTONE_RETENTION_DAYS`, older sync
+    tokens are rejected.
+    """
+
+    uuid = UUIDField(null=False, blank=False)
+    owner = ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=False,
+        blank=False,
+        on_delete=CASCADE,
+        related_name="cipher_tombstones",
+    )
+    deleted = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = (Index(fields=["owner", "deleted"]),)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}:{self.uuid}"
+
+
+class CipherImportStatus(TextChoices):
+    PENDING = "PENDING", _("Pending")
+    RUNNING = "RUNNING", _("Running")
+    COMPLETED = "COMPLETED", _("Completed")
+    FAILED = "FAILED", _("Failed")
+
 
-class CipherData(Model):
+class CipherImport(Model):
+    """Import of client-encrypted ciphers, run by `import_ciphers_task`."""
+
+    uuid = UUIDField(unique=True, null=False, blank=False, default=uuid4)
+    owner = ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=False,
+        blank=False,
+        on_delete=CASCADE,
+        related_name="cipher_imports",
+    )
+    status = CharField(
+        max_length=25,
+        null=False,
+        blank=False,
+        choices=CipherImportStatus.choices,
+        default=CipherImportStatus.PENDING,
+    )
+    total = PositiveIntegerField(default=0, help_text="Items read so far.")
+    imported = PositiveIntegerField(default=0)
+    failed = PositiveIntegerField(default=0)
+    errors = JSONField(
+        default=list,
+        blank=True,
+        help_text="Line and message of the first failed items.",
+    )
+    created = DateTimeField(auto_now_add=True)
+    updated = DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}:{self.uuid} - {self.status}"
+
+
+class CipherImportPart(Model):
+    """Part of the uploaded file of an import, until the import is run.
+
+    The file is stored in the database to be readable by the huey consumer
+    wherever it runs, the parts are deleted once the import is done.
+    """
+
+    cipher_import = ForeignKey(
+        CipherImport,
+        null=False,
+        blank=False,
+        on_delete=CASCADE,
+        related_name="parts",
+    )
+    number = PositiveIntegerField()
+    data = BinaryField()
+
+    class Meta:
+        unique_together = ("cipher_import", "number")
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}:{self.cipher_import_id} - {self.number}"
+
+
+def to_camel_case(name: str) -> str:
+    return re.sub(r"_([a-z])", lambda x: x.group(1).upper(), name)
+
+
+@dataclass(frozen=True)
+class CipherDataFields:
+    """Field names of a `CipherData` model, computed once when it is prepared."""
+
+    # Fields stored in `Cipher.payload`.
+    payload_attnames: tuple[str, ...]
+    # Type specific fields, attname and GraphQL (camelCase) name.
+    json_fields: tuple[tuple[str, str], ...]
+    # GraphQL name to attname of every payload field.
+    attnames: dict[str, str]
+
+    @classmethod
+    def from_model(cls, model: type[Model]) -> "CipherDataFields":
+        fields = [
+            f
+            for f in model._meta.concrete_fields  # noqa: SLF001
+            if f.name not in ("id", "uuid")
+        ]
+        return cls(
+            payload_attnames=tuple(f.attname for f in fields),
+            json_fields=tuple(
+                (f.attname, to_camel_case(f.name))
+                for f in fields
+                if f.name not in ("name", "notes")
+            ),
+            attnames={to_camel_case(f.name): f.attname for f in fields},
+        )
+
+
+class CipherData(EncryptedModelMixin, Model):
     uuid = UUIDField(
         unique=True,
         null=False,
@@ -86,27 +283,58 @@ class CipherData(Model):
         editable=False,
     )
     name = EncryptedTextField(null=False, blank=False)
-    notes = EncryptedTextField(null=True, blank=True)
+    # Notes (e.g. secure note bodies) can be large.
+    notes = EncryptedTextField(null=True, blank=True, compress=True)
+
+    objects = EncryptedQuerySet.as_manager()
+
+    use_data_key_encryption = True
+
+    # Set when the model is prepared, see `_set_cipher_data_fields`.
+    data_fields: ClassVar[CipherDataFields]
 
     class Meta:
         abstract = True
+        # Also used by the `Cipher.data` generic foreign key.
+        base_manager_name = "objects"
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}:{self.pk}"
 
+    @classmethod
+    def get_data_key_owner_ids(cls, pks: list[int]) -> dict[int, int]:
+        """Return the owner id of the data key of each row, the cipher's owner."""
+        return dict(
+            Cipher.objects.filter(
+                content_type=ContentType.objects.get_for_model(cls),
+                object_id__in=pks,
+            ).values_list("object_id", "owner_id"),
+        )
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "CipherData":
+        return cls(**json.loads(payload))
+
+    def to_payload(self) -> str:
+        """Return the field values as JSON, to be stored in `Cipher.payload`."""
+        payload: dict[str, Any] = {
+            attname: getattr(self, attname)
+            for attname in self.data_fields.payload_attnames
+        }
+        return json.dumps(payload, separators=(",", ":"))
+
     def to_json(self) -> dict:
-        skip_fields = ("id", "uuid", "name", "notes")
-        data = {}
-        for f in self._meta.concrete_fields:
-            if f.name in skip_fields:
-                continue
+        # Need to conform to GraphQL field casing (camelCase).
+        return {
+            field_name: getattr(self, attname)
+            for attname, field_name in self.data_fields.json_fields
+        }
 
-            # Need to conform to GraphQL field casing:
-            # Convert fieldname from snake_case to camelCase.
-            field_name = re.sub(r"_([a-z])", lambda x: x.group(1).upper(), f.name)
-            data[field_name] = f.value_from_object(self)
 
-        return data
+@receiver(class_prepared)
+def _set_cipher_data_fields(sender: type[Model], **kwargs) -> None:  # noqa: ARG001
+    if issubclass(sender, CipherData):
+        sender.data_fields = CipherDataFields.from_model(sender)
 
 
 class CipherLoginData(CipherData):
@@ -143,3 +371,11 @@ class CipherDatabaseData(CipherData):
     database = EncryptedTextField(null=True, blank=True)
     username = EncryptedTextField(null=True, blank=True)
     password = EncryptedTextField(null=True, blank=True)
+
+
+CIPHER_DATA_MODELS: dict[CipherType, type[CipherData]] = {
+    CipherType.CARD: CipherCardData,
+    CipherType.LOGIN: CipherLoginData,
+    CipherType.SECURE_NOTE: CipherSecureNoteData,
+    CipherType.DATABASE: CipherDatabaseData,
+}
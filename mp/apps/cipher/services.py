@@ -1,11 +1,17 @@
+import json
 from abc import ABC, abstractmethod
-from datetime import timedelta
-from typing import Generic, TypeVar
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import BinaryIO, Generic, TypeVar
 from uuid import UUID
 
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core import signing
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import F, Prefetch, QuerySet
 from django.utils import timezone
 
 from mp.apps.authx.models import User
@@ -14,18 +20,48 @@ from mp.apps.cipher.models import (
     CipherCardData,
     CipherData,
     CipherDatabaseData,
+    CipherDataStorage,
+    CipherImport,
+    CipherImportPart,
+    CipherImportStatus,
     CipherLoginData,
     CipherSecureNoteData,
+    CipherTombstone,
     CipherType,
     SecureNoteType,
+    to_camel_case,
 )
-from mp.core.exceptions import ServiceValidationError
+from mp.core.exceptions import MPError, ServiceValidationError
+from mp.core.model.datakeys import data_key_scope
+from mp.core.model.decryption import decrypt_instances
+from mp.core.model.fields import EncryptedFieldMixin
+from mp.core.model.query import EncryptedQuerySet
 
 CipherTypeEnum = CipherType
 
+SYNC_TOKEN_SALT = "mp.apps.cipher.sync"  # noqa: S105
+
+# Item keys of an import line (GraphQL casing) and their service argument.
+IMPORT_ITEM_FIELDS = {
+    "type": "type",
+    "name": "name",
+    "key": "key",
+    "status": "status",
+    "isFavorite": "is_favorite",
+    "data": "data",
+    "notes": "notes",
+}
+IMPORT_ITEM_OPTIONAL_FIELDS = ("data", "notes")
+# Bytes of an uploaded import stored per `CipherImportPart` row.
+IMPORT_PART_SIZE = 1024 * 1024
+
 T = TypeVar("T", bound=CipherData)
 
 
+class InvalidSyncTokenError(MPError):
+    """Sync token is invalid or expired, the client needs a full sync."""
+
+
 class DataBuilderMissingDataError(Exception):
     def __init__(self, builder: object) -> None:
         object_name = builder.__class__.__name__
@@ -53,10 +89,13 @@ class CipherDataBuilder(ABC, Generic[T]):
         if new_data is None:
             return cipher_data
 
+        attnames = cipher_data.data_fields.attnames
         for key, value in new_data.items():
             # Covert camelCase (GraphQL field format) into
             # snake_case (Model field formal).
-            _key = "".join("_" + c.lower() if c.isupper() else c for c in key)
+            _key = attnames.get(key) or "".join(
+                "_" + c.lower() if c.isupper() else c for c in key
+            )
             setattr(cipher_data, _key, value)
 
         return cipher_data
@@ -122,8 +161,28 @@ DATA_BUILDER_FACTORY: dict[CipherTypeEnum, CipherDataBuilder] = {
 }
 
 
-@transaction.atomic
-def create_cipher(
+def bump_vault_revision(owner_ids: Iterable[int]) -> None:
+    """Increment the vault revision of the owners.
+
+    Call it in the transaction changing their ciphers, the revision is updated in
+    the database so concurrent changes are not lost.
+    """
+    User.objects.filter(pk__in=owner_ids).update(
+        vault_revision=F("vault_revision") + 1,
+    )
+
+
+def get_vault_revision(owner: User) -> int:
+    return User.objects.values_list("vault_revision", flat=True).get(pk=owner.pk)
+
+
+async def aget_vault_revision(owner: User) -> int:
+    return await User.objects.values_list("vault_revision", flat=True).aget(
+        pk=owner.pk,
+    )
+
+
+def _build_cipher(
     owner: User,
     type: str,
     name: str,
@@ -132,7 +191,7 @@ def create_cipher(
     is_favorite: str,
     data: dict | None = None,
     notes: str | None = None,
-) -> Cipher:
+) -> tuple[Cipher, CipherData]:
     cipher_type = CipherTypeEnum(type)
 
     try:
@@ -144,68 +203,296 @@ def create_cipher(
     cipher_data: CipherData = data_builder.build_cipher_data(data)
     cipher_data.name = name
     cipher_data.notes = notes
-    cipher_data.save()
 
-    return Cipher.objects.create(
+    cipher = Cipher(
         owner=owner,
         status=status,
         is_favorite=is_favorite,
         type=type,
         key=key,
-        data=cipher_data,
     )
+    return cipher, cipher_data
 
 
-@transaction.atomic
-def update_cipher(
-    owner: User,
-    uuid: UUID,
+def _set_cipher_values(
+    cipher: Cipher,
     key: str,
     is_favorite: str,
     name: str,
     status: str,
     data: dict | None = None,
     notes: str | None = None,
-) -> Cipher:
-    cipher = Cipher.objects.get(owner=owner, uuid=uuid)
+) -> CipherData:
     cipher.key = key
     cipher.is_favorite = is_favorite
     cipher.status = status
     cipher.data.name = name
     cipher.data.notes = notes
-    cipher.save()
 
     data_builder = DATA_BUILDER_FACTORY[CipherTypeEnum(cipher.type)]
-    cipher_data = data_builder.set_cipher_data(cipher.data, new_data=data)
-    cipher_data.save()
+    return data_builder.set_cipher_data(cipher.data, new_data=data)
 
+
+def _use_inline_storage() -> bool:
+    return CipherDataStorage(settings.CIPHER_DATA_STORAGE) == CipherDataStorage.INLINE
+
+
+@transaction.atomic
+def create_cipher(
+    owner: User,
+    type: str,
+    name: str,
+    key: str,
+    status: str,
+    is_favorite: str,
+    data: dict | None = None,
+    notes: str | None = None,
+) -> Cipher:
+    cipher, cipher_data = _build_cipher(
+        owner=owner,
+        type=type,
+        name=name,
+        key=key,
+        status=status,
+        is_favorite=is_favorite,
+        data=data,
+        notes=notes,
+    )
+    with data_key_scope(owner):
+        if _use_inline_storage():
+            cipher.set_inline_data(cipher_data)
+        else:
+            cipher_data.save()
+            cipher.data = cipher_data
+        cipher.save()
+
+    bump_vault_revision([owner.pk])
     return cipher
 
 
+@transaction.atomic
+def update_cipher(
+    owner: User,
+    uuid: UUID,
+    key: str,
+    is_favorite: str,
+    name: str,
+    status: str,
+    data: dict | None = None,
+    notes: str | None = None,
+) -> Cipher:
+    cipher = Cipher.objects.get(owner=owner, uuid=uuid)
+    cipher_data = _set_cipher_values(
+        cipher,
+        key=key,
+        is_favorite=is_favorite,
+        name=name,
+        status=status,
+        data=data,
+        notes=notes,
+    )
+
+    with data_key_scope(owner):
+        if cipher.has_inline_data:
+            cipher.payload = cipher_data.to_payload()
+        else:
+            cipher_data.save()
+        cipher.save()
+
+    bump_vault_revision([owner.pk])
+    return cipher
+
+
+def _check_bulk_size(items: list) -> None:
+    if len(items) > settings.CIPHER_BULK_MAX_ITEMS:
+        err_msg = f"At most {settings.CIPHER_BULK_MAX_ITEMS} items are allowed."
+        raise ServiceValidationError(err_msg)
+
+
+def _check_required_values(*objs: Cipher | CipherData) -> None:
+    """Raise `ServiceValidationError` if a required encrypted value is missing.
+
+    A bulk write would otherwise fail the whole batch with an `IntegrityError`.
+    """
+    for obj in objs:
+        for field in obj._meta.concrete_fields:  # noqa: SLF001
+            if (
+                isinstance(field, EncryptedFieldMixin)
+                and not field.null
+                and getattr(obj, field.attname) is None
+            ):
+                err_msg = f"Missing value for {to_camel_case(field.name)}."
+                raise ServiceValidationError(err_msg)
+
+
+def _group_by_model(cipher_data: Iterable[CipherData]) -> dict[type, list]:
+    groups: dict[type, list] = {}
+    for obj in cipher_data:
+        groups.setdefault(obj.__class__, []).append(obj)
+    return groups
+
+
+@transaction.atomic
+def create_ciphers(
+    owner: User,
+    items: list[dict],
+) -> list[Cipher | ServiceValidationError]:
+    """Create the ciphers of the items (`create_cipher` arguments) at once.
+
+    The items are validated first, the valid ones are inserted with one
+    `bulk_create` per data table. Returns the cipher or the validation error of
+    each item, in order.
+    """
+    _check_bulk_size(items)
+
+    results: list[Cipher | ServiceValidationError] = []
+    built: list[tuple[Cipher, CipherData]] = []
+    for item in items:
+        try:
+            cipher, cipher_data = _build_cipher(owner=owner, **item)
+            _check_required_values(cipher, cipher_data)
+        except KeyError as error:
+            results.append(ServiceValidationError(f"Missing cipher data {error}."))
+            continue
+        except ServiceValidationError as error:
+            results.append(error)
+            continue
+        except (DataBuilderMissingDataError, TypeError, ValueError) as error:
+            results.append(ServiceValidationError(str(error)))
+            continue
+        results.append(cipher)
+        built.append((cipher, cipher_data))
+
+    if not built:
+        return results
+
+    with data_key_scope(owner):
+        if _use_inline_storage():
+            for cipher, cipher_data in built:
+                cipher.set_inline_data(cipher_data)
+        else:
+            for model, objs in _group_by_model(data for _, data in built).items():
+                model.objects.bulk_create(objs)
+            for cipher, cipher_data in built:
+                cipher.data = cipher_data
+        Cipher.objects.bulk_create([cipher for cipher, _ in built])
+
+    bump_vault_revision([owner.pk])
+    return results
+
+
+@transaction.atomic
+def update_ciphers(
+    owner: User,
+    items: list[dict],
+) -> list[Cipher | ServiceValidationError]:
+    """Update the ciphers of the items (`update_cipher` arguments) at once.
+
+    The ciphers are loaded with one query and written with one `bulk_update` per
+    table. Returns the cipher or the error of each item, in order.
+    """
+    _check_bulk_size(items)
+
+    ciphers = {
+        cipher.uuid: cipher
+        for cipher in get_ciphers_by_owner_and_uuids(
+            owner,
+            [item["uuid"] for item in items],
+        ).prefetch_related("data")
+    }
+    now = timezone.now()
+
+    results: list[Cipher | ServiceValidationError] = []
+    updated: dict[UUID, Cipher] = {}
+    for item in items:
+        cipher = ciphers.get(item["uuid"])
+        if cipher is None:
+            results.append(ServiceValidationError(f"Cipher {item['uuid']} not found."))
+            continue
+
+        values = {name: value for name, value in item.items() if name != "uuid"}
+        cipher_data = _set_cipher_values(cipher, **values)
+        try:
+            _check_required_values(cipher, cipher_data)
+        except ServiceValidationError as error:
+            results.append(error)
+            continue
+        if cipher.has_inline_data:
+            cipher.payload = cipher_data.to_payload()
+        cipher.updated = now
+        results.append(cipher)
+        updated[cipher.uuid] = cipher
+
+    if not updated:
+        return results
+
+    with data_key_scope(owner):
+        Cipher.objects.bulk_update(
+            updated.values(),
+            fields=["key", "is_favorite", "status", "payload", "updated"],
+        )
+        table_data = (c.data for c in updated.values() if not c.has_inline_data)
+        for model, objs in _group_by_model(table_data).items():
+            model.objects.bulk_update(
+                objs,
+                fields=[
+                    f.name
+                    for f in model._meta.concrete_fields  # noqa: SLF001
+                    if not f.primary_key and f.name != "uuid"
+                ],
+            )
+
+    bump_vault_revision([owner.pk])
+    return results
+
+
+@transaction.atomic
 def update_cipher_to_delete_state(owner: User, uuid: UUID) -> Cipher:
     cipher = Cipher.objects.get(owner=owner, uuid=uuid)
     cipher.delete_on = timezone.now() + timedelta(
         days=settings.CIPHER_DELETE_DAYS_PERIOD,
     )
-    cipher.save(update_fields=["delete_on"])
+    cipher.save(update_fields=["delete_on", "updated"])
+    bump_vault_revision([owner.pk])
     return cipher
 
 
+@transaction.atomic
 def restore_cipher_from_delete_state(owner: User, uuid: UUID) -> Cipher:
     cipher = Cipher.objects.get(owner=owner, uuid=uuid)
     cipher.delete_on = None
-    cipher.save(update_fields=["delete_on"])
+    cipher.save(update_fields=["delete_on", "updated"])
+    bump_vault_revision([owner.pk])
     return cipher
 
 
+@transaction.atomic
 def delete_ciphers_by_owner_and_uuids(
     owner: User,
     uuids: list[UUID],
 ) -> list[UUID]:
+    _check_bulk_size(uuids)
+
     qs = Cipher.objects.filter(owner=owner, uuid__in=uuids)
-    to_delete_uuids = list(qs.values_list("uuid", flat=True))
+    rows = list(qs.values_list("uuid", "content_type_id", "object_id"))
+    to_delete_uuids = [uuid for uuid, _, _ in rows]
+    # The data rows (generic foreign keys) are deleted by type, ciphers stored
+    # inline have none.
+    object_ids_by_content_type: dict[int, list[int]] = defaultdict(list)
+    for _, content_type_id, object_id in rows:
+        if content_type_id is not None:
+            object_ids_by_content_type[content_type_id].append(object_id)
+
     qs.delete()
+    for content_type_id, object_ids in object_ids_by_content_type.items():
+        data_model = ContentType.objects.get_for_id(content_type_id).model_class()
+        data_model._base_manager.filter(pk__in=object_ids).delete()  # type: ignore[union-attr]  # noqa: SLF001
 
+    CipherTombstone.objects.bulk_create(
+        CipherTombstone(owner=owner, uuid=uuid) for uuid in to_delete_uuids
+    )
+    if to_delete_uuids:
+        bump_vault_revision([owner.pk])
     return to_delete_uuids
 
 
@@ -213,6 +500,10 @@ def get_cipher_by_owner_and_uuid(owner: User, uuid: UUID) -> Cipher:
     return Cipher.objects.get(owner=owner, uuid=uuid)
 
 
+async def aget_cipher_by_owner_and_uuid(owner: User, uuid: UUID) -> Cipher:
+    return await Cipher.objects.aget(owner=owner, uuid=uuid)
+
+
 def get_ciphers_by_owner_and_uuids(
     owner: User,
     uuids: list[UUID],
@@ -220,5 +511,293 @@ def get_ciphers_by_owner_and_uuids(
     return Cipher.objects.filter(owner=owner, uuid__in=uuids)
 
 
-def get_all_ciphers_by_owner(owner: User) -> QuerySet[Cipher]:
-    return Cipher.objects.filter(owner=owner)
+def get_all_ciphers_by_owner(owner: User) -> EncryptedQuerySet:
+    """Return the owner's ciphers with their owner and data prefetched.
+
+    The cipher data is prefetched with one query per data type (content type).
+    """
+    return Cipher.objects.filter(owner=owner).prefetch_related(
+        Prefetch("owner", queryset=User.objects.only("id", "uuid")),
+        "data",
+    )
+
+
+@dataclass
+class CipherChanges:
+    ciphers: EncryptedQuerySet
+    deleted_uuids: list[UUID]
+    sync_token: str
+
+
+def create_sync_token(owner: User) -> str:
+    """Return a signed token of the owner's sync point (now).
+
+    The sync point goes back `CIPHER_SYNC_TOKEN_MARGIN` seconds, a few changes
+    can be sent twice but none is missed.
+    """
+    since = timezone.now() - timedelta(seconds=settings.CIPHER_SYNC_TOKEN_MARGIN)
+    return signing.dumps(
+        {"owner": str(owner.uuid), "since": since.isoformat()},
+        salt=SYNC_TOKEN_SALT,
+        compress=True,
+    )
+
+
+def _load_sync_token(owner: User, sync_token: str) -> datetime:
+    try:
+        payload = signing.loads(sync_token, salt=SYNC_TOKEN_SALT)
+    except signing.BadSignature as error:
+        err_msg = "Invalid sync token."
+        raise InvalidSyncTokenError(err_msg) from error
+
+    if payload.get("owner") != str(owner.uuid):
+        err_msg = "Invalid sync token."
+        raise InvalidSyncTokenError(err_msg)
+
+    since = datetime.fromisoformat(payload["since"])
+    retention = timedelta(days=settings.CIPHER_TOMBSTONE_RETENTION_DAYS)
+    if since < timezone.now() - retention:
+        err_msg = "Sync token expired, a full sync is required."
+        raise InvalidSyncTokenError(err_msg)
+    return since
+
+
+def get_cipher_changes(owner: User, sync_token: str) -> CipherChanges:
+    """Return the owner's ciphers changed and deleted since the sync token.
+
+    Raises `InvalidSyncTokenError` if the token is invalid or older than the
+    tombstones retention.
+    """
+    since = _load_sync_token(owner, sync_token)
+    # Issued before reading so changes made meanwhile are part of the next sync.
+    next_sync_token = create_sync_token(owner)
+
+    ciphers = get_all_ciphers_by_owner(owner).filter(updated__gt=since)
+    deleted_uuids = list(
+        CipherTombstone.objects.filter(owner=owner, deleted__gt=since).values_list(
+            "uuid",
+            flat=True,
+        ),
+    )
+    return CipherChanges(
+        ciphers=ciphers,
+        deleted_uuids=deleted_uuids,
+        sync_token=next_sync_token,
+    )
+
+
+def purge_cipher_tombstones() -> int:
+    """Delete the tombstones older than `CIPHER_TOMBSTONE_RETENTION_DAYS`."""
+    retention = timedelta(days=settings.CIPHER_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = CipherTombstone.objects.filter(
+        deleted__lt=timezone.now() - retention,
+    ).delete()
+    return deleted
+
+
+def convert_cipher_storage(
+    storage: CipherDataStorage,
+    chunk_size: int = 500,
+) -> int:
+    """Move the data of the ciphers stored otherwise to `storage`.
+
+    The ciphers are streamed in chunks of `chunk_size`, each cipher is converted
+    in its own transaction. Returns the number of converted ciphers.
+    """
+    ciphers = (
+        Cipher.objects.filter(content_type__isnull=storage == CipherDataStorage.TABLES)
+        .select_related("owner")
+        .prefetch_related("data")
+    )
+
+    converted = 0
+    for cipher in ciphers.iterator(chunk_size=chunk_size):
+        with transaction.atomic(), data_key_scope(cipher.owner):
+            cipher_data = cipher.data
+            if storage == CipherDataStorage.INLINE:
+                cipher.set_inline_data(cipher_data)
+                cipher.save()
+                cipher_data.delete()
+            else:
+                cipher_data.save()
+                cipher.data = cipher_data
+                cipher.payload = None
+                cipher.save()
+        converted += 1
+    return converted
+
+
+@transaction.atomic
+def create_cipher_import(owner: User, stream: BinaryIO) -> CipherImport:
+    """Store the newline-delimited JSON stream of an import, in parts.
+
+    Raises `ServiceValidationError` if the stream is larger than
+    `CIPHER_IMPORT_MAX_SIZE`. Run the import with `run_cipher_import`.
+    """
+    cipher_import = CipherImport.objects.create(owner=owner)
+
+    size = 0
+    number = 0
+    while part := stream.read(IMPORT_PART_SIZE):
+        size += len(part)
+        if size > settings.CIPHER_IMPORT_MAX_SIZE:
+            err_msg = f"Import is larger than {settings.CIPHER_IMPORT_MAX_SIZE} bytes."
+            raise ServiceValidationError(err_msg)
+        CipherImportPart.objects.create(
+            cipher_import=cipher_import,
+            number=number,
+            data=part,
+        )
+        number += 1
+
+    return cipher_import
+
+
+def _iter_import_lines(cipher_import: CipherImport) -> Iterator[bytes]:
+    """Yield the lines of the stored import, loading one part at a time."""
+    parts = CipherImportPart.objects.filter(cipher_import=cipher_import)
+    rest = b""
+    for pk in parts.order_by("number").values_list("pk", flat=True):
+        data = rest + bytes(parts.values_list("data", flat=True).get(pk=pk))
+        *lines, rest = data.split(b"\n")
+        yield from lines
+    if rest:
+        yield rest
+
+
+def _parse_import_line(line: bytes) -> dict:
+    item = json.loads(line)
+    if not isinstance(item, dict):
+        err_msg = "Item must be a JSON object."
+        raise ServiceValidationError(err_msg)
+
+    missing = [
+        key
+        for key in IMPORT_ITEM_FIELDS
+        if key not in item and key not in IMPORT_ITEM_OPTIONAL_FIELDS
+    ]
+    if missing:
+        err_msg = f"Missing fields {', '.join(missing)}."
+        raise ServiceValidationError(err_msg)
+
+    invalid = [
+        key
+        for key in IMPORT_ITEM_FIELDS
+        if key != "data"
+        and not isinstance(item.get(key), str)
+        and not (key in IMPORT_ITEM_OPTIONAL_FIELDS and item.get(key) is None)
+    ]
+    if invalid:
+        err_msg = f"Fields must be strings: {', '.join(invalid)}."
+        raise ServiceValidationError(err_msg)
+
+    if not isinstance(item.get("data"), dict | None):
+        err_msg = "Field data must be a JSON object."
+        raise ServiceValidationError(err_msg)
+
+    return {name: item.get(key) for key, name in IMPORT_ITEM_FIELDS.items()}
+
+
+def _add_import_error(cipher_import: CipherImport, line: int, message: str) -> None:
+    cipher_import.failed += 1
+    if len(cipher_import.errors) < settings.CIPHER_IMPORT_MAX_ERRORS:
+        cipher_import.errors.append({"line": line, "message": message})
+
+
+def _import_chunk(cipher_import: CipherImport, chunk: list[tuple[int, dict]]) -> None:
+    results = create_ciphers(cipher_import.owner, [item for _, item in chunk])
+    for (line, _), result in zip(chunk, results, strict=True):
+        if isinstance(result, ServiceValidationError):
+            _add_import_error(cipher_import, line, str(result))
+        else:
+            cipher_import.imported += 1
+
+    # Progress of the import.
+    cipher_import.save(update_fields=["total", "imported", "failed", "errors"])
+
+
+def run_cipher_import(cipher_import: CipherImport) -> None:
+    """Import the stored items, `CIPHER_IMPORT_CHUNK_SIZE` items per transaction.
+
+    The file is read line by line, only one chunk of items is in memory. Invalid
+    items are counted and reported, the others are imported.
+    """
+    cipher_import.status = CipherImportStatus.RUNNING
+    cipher_import.save(update_fields=["status"])
+
+    try:
+        chunk: list[tuple[int, dict]] = []
+        lines = _iter_import_lines(cipher_import)
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+
+            cipher_import.total += 1
+            try:
+                chunk.append((line_number, _parse_import_line(line)))
+            except ValueError:
+                _add_import_error(cipher_import, line_number, "Invalid JSON.")
+            except ServiceValidationError as error:
+                _add_import_error(cipher_import, line_number, str(error))
+
+            if len(chunk) >= settings.CIPHER_IMPORT_CHUNK_SIZE:
+                _import_chunk(cipher_import, chunk)
+                chunk = []
+
+        _import_chunk(cipher_import, chunk)
+    except Exception:
+        cipher_import.status = CipherImportStatus.FAILED
+        cipher_import.save(update_fields=["status"])
+        raise
+    finally:
+        # The upload is not kept, a failed import is started again by the user.
+        cipher_import.parts.all().delete()
+
+    cipher_import.status = CipherImportStatus.COMPLETED
+    # Items are validated when read or when written, list the errors in order.
+    cipher_import.errors.sort(key=lambda error: error["line"])
+    cipher_import.save(update_fields=["status", "errors"])
+
+
+def get_cipher_import_by_owner_and_uuid(owner: User, uuid: UUID) -> CipherImport:
+    return CipherImport.objects.get(owner=owner, uuid=uuid)
+
+
+async def aget_cipher_import_by_owner_and_uuid(
+    owner: User,
+    uuid: UUID,
+) -> CipherImport:
+    return await CipherImport.objects.aget(owner=owner, uuid=uuid)
+
+
+def _to_export_item(cipher: Cipher) -> dict:
+    return {
+        "id": str(cipher.uuid),
+        "type": cipher.type,
+        "name": cipher.data.name,
+        "key": cipher.key,
+        "status": cipher.status,
+        "isFavorite": cipher.is_favorite,
+        "data": cipher.data.to_json(),
+        "notes": cipher.data.notes,
+    }
+
+
+def iter_cipher_export(owner: User, chunk_size: int = 1000) -> Iterator[dict]:
+    """Yield the owner's ciphers as import items (see `run_cipher_import`).
+
+    The rows are read with a server-side cursor, `chunk_size` ciphers at a time,
+    their data is prefetched and decrypted per chunk.
+    """
+    ciphers = get_all_ciphers_by_owner(owner).order_by("pk")
+
+    chunk: list[Cipher] = []
+    for cipher in ciphers.iterator(chunk_size=chunk_size):
+        chunk.append(cipher)
+        if len(chunk) >= chunk_size:
+            decrypt_instances(chunk)
+            yield from (_to_export_item(cipher) for cipher in chunk)
+            chunk = []
+
+    decrypt_instances(chunk)
+    yield from (_to_export_item(cipher) for cipher in chunk)
@@ -3,9 +3,14 @@ import logging
 from django.db import transaction
 from django.utils import timezone
 from huey import crontab
-from huey.contrib.djhuey import db_periodic_task
+from huey.contrib.djhuey import db_periodic_task, db_task
 
-from mp.apps.cipher.models import Cipher
+from mp.apps.cipher.models import Cipher, CipherImport, CipherTombstone
+from mp.apps.cipher.services import (
+    bump_vault_revision,
+    purge_cipher_tombstones,
+    run_cipher_import,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +19,33 @@ logger = logging.getLogger(__name__)
 def delete_ciphers_task():
     with transaction.atomic():
         qs = Cipher.objects.filter(delete_on__lte=timezone.now())
+        tombstones = []
         for c in qs:
-            c.data.delete()
+            if not c.has_inline_data:
+                c.data.delete()
             c.delete()
+            tombstones.append(CipherTombstone(owner_id=c.owner_id, uuid=c.uuid))
             logger.info("Cipher %s has been deleted.", c.uuid)
+
+        CipherTombstone.objects.bulk_create(tombstones)
+        bump_vault_revision({tombstone.owner_id for tombstone in tombstones})
+
+
+@db_periodic_task(crontab(minute="30", hour="0"))
+def purge_cipher_tombstones_task():
+    deleted = purge_cipher_tombstones()
+    logger.info("%s cipher tombstones have been purged.", deleted)
+
+
+@db_task()
+def import_ciphers_task(cipher_import_id: int):
+    cipher_import = CipherImport.objects.select_related("owner").get(
+        pk=cipher_import_id,
+    )
+    run_cipher_import(cipher_import)
+    logger.info(
+        "Cipher import %s: %s imported, %s failed.",
+        cipher_import.uuid,
+        cipher_import.imported,
+        cipher_import.failed,
+    )
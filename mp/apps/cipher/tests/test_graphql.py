@@ -1,13 +1,28 @@
+import io
 from datetime import timedelta
 from uuid import uuid4
 
 import pytest
 from django.conf import settings
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from strawberry import relay
 
 from mp.apps.authx.tests.factories import UserFactory
-from mp.apps.cipher.models import Cipher, CipherType, SecureNoteType
+from mp.apps.cipher.graphql import mutations
+from mp.apps.cipher.models import (
+    Cipher,
+    CipherDataStorage,
+    CipherTombstone,
+    CipherType,
+    SecureNoteType,
+)
+from mp.apps.cipher.services import (
+    convert_cipher_storage,
+    create_cipher_import,
+    run_cipher_import,
+)
 from mp.apps.cipher.tests.factories import (
     CipherDataCardFactory,
     CipherDataLoginFactory,
@@ -527,3 +542,545 @@ def test_get_ciphers():
         node = data[0]["node"]
         assert node["id"] is not None
         assert node["data"] is not None
+
+
+def test_get_ciphers_number_of_queries():
+    user = UserFactory()
+    for _ in range(10):
+        CipherFactory(owner=user, type=CipherType.LOGIN)
+        CipherFactory(
+            owner=user,
+            type=CipherType.SECURE_NOTE,
+            data=CipherDataSecureNoteFactory(),
+        )
+
+    query = """
+        query GetGiphers($first: Int!) {
+            ciphers(first: $first) {
+                edges {
+                    node {
+                        id
+                        ownerId
+                        name
+                        data
+                    }
+                }
+            }
+        }
+    """
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        num_queries = []
+        for first in (4, 20):
+            with CaptureQueriesContext(connection) as context:
+                response = client.query(query, variables={"first": first})
+            assert len(response.data["ciphers"]["edges"]) == first
+            num_queries.append(len(context.captured_queries))
+
+    # Session and user, ciphers, owners and one query per data type.
+    assert num_queries == [6, 6]
+
+
+def test_get_ciphers_inline_storage():
+    user = UserFactory()
+    for _ in range(10):
+        CipherFactory(owner=user, type=CipherType.LOGIN)
+        CipherFactory(
+            owner=user,
+            type=CipherType.SECURE_NOTE,
+            data=CipherDataSecureNoteFactory(),
+        )
+    expected = {
+        str(relay.GlobalID("Cipher", str(cipher.uuid))): cipher.data.to_json()
+        for cipher in Cipher.objects.all()
+    }
+    convert_cipher_storage(CipherDataStorage.INLINE)
+
+    query = """
+        query GetGiphers($first: Int!) {
+            ciphers(first: $first) {
+                edges {
+                    node {
+                        id
+                        data
+                    }
+                }
+            }
+        }
+    """
+
+    client = TestClient("/graphql")
+    with client.login(user), CaptureQueriesContext(connection) as context:
+        response = client.query(query, variables={"first": 20})
+
+    edges = response.data["ciphers"]["edges"]
+    assert {edge["node"]["id"]: edge["node"]["data"] for edge in edges} == expected
+    # Session and user, ciphers and owners, no cipher data table is queried.
+    assert len(context.captured_queries) == 4
+
+
+CIPHERS_PAGE_QUERY = """
+    query GetGiphers(
+        $first: Int, $after: String, $last: Int, $before: String
+    ) {
+        ciphers(first: $first, after: $after, last: $last, before: $before) {
+            edges {
+                cursor
+                node {
+                    id
+                }
+            }
+            pageInfo {
+                startCursor
+                endCursor
+                hasNextPage
+                hasPreviousPage
+            }
+            syncToken
+        }
+    }
+"""
+
+
+def _get_node_ids(response):
+    return [edge["node"]["id"] for edge in response.data["ciphers"]["edges"]]
+
+
+def test_get_ciphers_keyset_pagination():
+    user = UserFactory()
+    ciphers = CipherFactory.create_batch(5, owner=user, type=CipherType.LOGIN)
+    expected_ids = [
+        str(relay.GlobalID("Cipher", str(cipher.uuid))) for cipher in ciphers
+    ]
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(CIPHERS_PAGE_QUERY, variables={"first": 2})
+        page_info = response.data["ciphers"]["pageInfo"]
+        assert _get_node_ids(response) == expected_ids[:2]
+        assert page_info["hasNextPage"]
+        assert not page_info["hasPreviousPage"]
+        assert response.data["ciphers"]["syncToken"]
+
+        # Ciphers added between pages don't shift the next page.
+        CipherFactory(owner=user, type=CipherType.LOGIN)
+
+        response = client.query(
+            CIPHERS_PAGE_QUERY,
+            variables={"first": 3, "after": page_info["endCursor"]},
+        )
+        page_info = response.data["ciphers"]["pageInfo"]
+        assert _get_node_ids(response) == expected_ids[2:5]
+        assert page_info["hasNextPage"]
+        assert page_info["hasPreviousPage"]
+        # Only the first page has the sync token.
+        assert response.data["ciphers"]["syncToken"] is None
+
+        response = client.query(
+            CIPHERS_PAGE_QUERY,
+            variables={"last": 2, "before": page_info["endCursor"]},
+        )
+        page_info = response.data["ciphers"]["pageInfo"]
+        assert _get_node_ids(response) == expected_ids[2:4]
+        assert page_info["hasNextPage"]
+        assert page_info["hasPreviousPage"]
+
+
+def test_get_ciphers_invalid_cursor():
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(
+            CIPHERS_PAGE_QUERY,
+            variables={"first": 2, "after": "invalid"},
+            asserts_errors=False,
+        )
+
+    assert response.errors[0]["message"] == (
+        "Argument 'after' contains a non-existing value."
+    )
+
+
+CIPHERS_CHANGED_SINCE_QUERY = """
+    query ChangedSince($syncToken: String!) {
+        ciphersChangedSince(syncToken: $syncToken) {
+            __typename
+            ... on CipherSync {
+                ciphers {
+                    id
+                    name
+                }
+                deletedIds
+                syncToken
+            }
+            ... on CipherSyncFailed {
+                message
+            }
+        }
+    }
+"""
+
+
+def test_ciphers_changed_since(settings):
+    settings.CIPHER_SYNC_TOKEN_MARGIN = 0
+    user = UserFactory()
+    cipher, deleted_cipher = CipherFactory.create_batch(
+        2,
+        owner=user,
+        type=CipherType.LOGIN,
+    )
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        # Full sync, the cipher changes once its page is read.
+        response = client.query(CIPHERS_PAGE_QUERY, variables={"first": 1})
+        sync_token = response.data["ciphers"]["syncToken"]
+
+        cipher.delete_on = timezone.now()
+        cipher.save()
+        client.query(
+            CIPHERS_PAGE_QUERY,
+            variables={
+                "first": 1,
+                "after": response.data["ciphers"]["pageInfo"]["endCursor"],
+            },
+        )
+        Cipher.objects.filter(pk=deleted_cipher.pk).delete()
+        CipherTombstone.objects.create(owner=user, uuid=deleted_cipher.uuid)
+
+        response = client.query(
+            CIPHERS_CHANGED_SINCE_QUERY,
+            variables={"syncToken": sync_token},
+        )
+
+    data = response.data["ciphersChangedSince"]
+    assert data["__typename"] == "CipherSync"
+    assert [c["id"] for c in data["ciphers"]] == [
+        str(relay.GlobalID("Cipher", str(cipher.uuid)))
+    ]
+    assert data["ciphers"][0]["name"] == cipher.data.name
+    assert data["deletedIds"] == [
+        str(relay.GlobalID("Cipher", str(deleted_cipher.uuid)))
+    ]
+    assert data["syncToken"] != sync_token
+
+
+def test_ciphers_changed_since_invalid_sync_token():
+    client = TestClient("/graphql")
+    with client.login(UserFactory()):
+        response = client.query(
+            CIPHERS_CHANGED_SINCE_QUERY,
+            variables={"syncToken": "invalid"},
+        )
+
+    assert response.data["ciphersChangedSince"] == {
+        "__typename": "CipherSyncFailed",
+        "message": "Invalid sync token.",
+    }
+
+
+def test_vault_revision():
+    user = UserFactory(vault_revision=3)
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query("query { vaultRevision }")
+
+    assert response.data["vaultRevision"] == 3
+
+
+def test_create_many_ciphers():
+    query = """
+        mutation CreateMany($input: [CreateCipherInput!]!) {
+            cipher {
+                createMany(input: $input) {
+                    __typename
+                    ... on Cipher {
+                        name
+                        data
+                    }
+                    ... on CipherCreateFailed {
+                        message
+                    }
+                }
+            }
+        }
+    """
+    item = {
+        "type": CipherType.LOGIN,
+        "name": "encname",
+        "notes": "encnotes",
+        "key": "somekey",
+        "isFavorite": "encfavorite",
+        "status": "encstatus",
+        "data": {
+            "username": "encusername",
+            "password": "encpassword",
+            "authenticatorKey": "encauthenticatorKey",
+        },
+    }
+    variables = {
+        "input": [
+            item,
+            {**item, "type": CipherType.CARD},
+            {**item, "name": "encname2"},
+            {**item, "data": {**item["data"], "username": None}},
+        ],
+    }
+
+    user = UserFactory()
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables=variables)
+
+    results = response.data["cipher"]["createMany"]
+    assert [result["__typename"] for result in results] == [
+        "Cipher",
+        "CipherCreateFailed",
+        "Cipher",
+        "CipherCreateFailed",
+    ]
+    assert results[0]["data"] == item["data"]
+    assert results[2]["name"] == "encname2"
+    assert results[1]["message"] == (
+        "Invalid service process: Missing cipher data 'cardholderName'."
+    )
+    assert results[3]["message"] == (
+        "Invalid service process: Missing value for username."
+    )
+    assert Cipher.objects.filter(owner=user).count() == 2
+
+
+def test_update_many_ciphers():
+    query = """
+        mutation UpdateMany($input: [UpdateCipherInput!]!) {
+            cipher {
+                updateMany(input: $input) {
+                    __typename
+                    ... on Cipher {
+                        id
+                        name
+                    }
+                    ... on CipherUpdateFailed {
+                        message
+                    }
+                }
+            }
+        }
+    """
+    user = UserFactory()
+    ciphers = CipherFactory.create_batch(2, owner=user, type=CipherType.LOGIN)
+    missing_id = str(relay.GlobalID("Cipher", str(uuid4())))
+    variables = {
+        "input": [
+            {
+                "id": str(relay.GlobalID("Cipher", str(cipher.uuid))),
+                "key": "newkey",
+                "isFavorite": "encfavorite",
+                "status": "encstatus",
+                "name": f"newname{i}",
+                "notes": "encnotes",
+                "data": None,
+            }
+            for i, cipher in enumerate(ciphers)
+        ],
+    }
+    variables["input"].append({**variables["input"][0], "id": missing_id})
+    variables["input"].append(
+        {**variables["input"][0], "id": str(relay.GlobalID("Cipher", "invalid"))},
+    )
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables=variables)
+
+    results = response.data["cipher"]["updateMany"]
+    assert [result.get("name") for result in results] == [
+        "newname0",
+        "newname1",
+        None,
+        None,
+    ]
+    assert results[2]["__typename"] == "CipherUpdateFailed"
+    assert results[3]["message"] == (
+        "Invalid service process: Invalid cipher id "
+        f"{variables['input'][3]['id']}."
+    )
+    for cipher in ciphers:
+        cipher.refresh_from_db()
+        assert cipher.key == "newkey"
+
+
+def test_delete_many_ciphers():
+    query = """
+        mutation DeleteMany($ids: [GlobalID!]!) {
+            cipher {
+                deleteMany(ids: $ids) {
+                    ... on CipherDeleted {
+                        deletedIds
+                    }
+                    ... on CipherDeleteFailed {
+                        message
+                    }
+                }
+            }
+        }
+    """
+    user = UserFactory()
+    cipher, other_user_cipher = CipherFactory(owner=user), CipherFactory()
+    ids = [
+        str(relay.GlobalID("Cipher", str(cipher.uuid))),
+        str(relay.GlobalID("Cipher", str(other_user_cipher.uuid))),
+        str(relay.GlobalID("Cipher", "invalid")),
+    ]
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables={"ids": ids})
+
+    assert response.data["cipher"]["deleteMany"]["deletedIds"] == ids[:1]
+    assert not Cipher.objects.filter(pk=cipher.pk).exists()
+    assert Cipher.objects.filter(pk=other_user_cipher.pk).exists()
+
+
+def test_cipher_import():
+    user = UserFactory()
+    cipher_import = create_cipher_import(user, io.BytesIO(b"{}"))
+    run_cipher_import(cipher_import)
+    query = """
+        query CipherImport($id: GlobalID!) {
+            cipherImport(id: $id) {
+                status
+                total
+                imported
+                failed
+                errors
+            }
+        }
+    """
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(
+            query,
+            variables={"id": str(relay.GlobalID("CipherImport", str(cipher_import.uuid)))},
+        )
+    assert response.data["cipherImport"] == {
+        "status": "COMPLETED",
+        "total": 1,
+        "imported": 0,
+        "failed": 1,
+        "errors": [
+            {
+                "line": 1,
+                "message": (
+                    "Invalid service process: Missing fields type, name, key, "
+                    "status, isFavorite."
+                ),
+            },
+        ],
+    }
+
+    with client.login(UserFactory()):
+        response = client.query(
+            query,
+            variables={"id": str(relay.GlobalID("CipherImport", str(cipher_import.uuid)))},
+        )
+    assert response.data["cipherImport"] is None
+
+
+def test_delete_many_ciphers_too_many_items(settings):
+    settings.CIPHER_BULK_MAX_ITEMS = 1
+    query = """
+        mutation DeleteMany($ids: [GlobalID!]!) {
+            cipher {
+                deleteMany(ids: $ids) {
+                    ... on CipherDeleteFailed {
+                        message
+                    }
+                }
+            }
+        }
+    """
+    user = UserFactory()
+    ciphers = CipherFactory.create_batch(2, owner=user)
+    ids = [str(relay.GlobalID("Cipher", str(cipher.uuid))) for cipher in ciphers]
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables={"ids": ids})
+
+    assert response.data["cipher"]["deleteMany"]["message"] == (
+        "Invalid service process: At most 1 items are allowed."
+    )
+    assert Cipher.objects.filter(owner=user).count() == 2
+
+
+def test_create_many_ciphers_too_many_items(settings):
+    settings.CIPHER_BULK_MAX_ITEMS = 1
+    query = """
+        mutation CreateMany($input: [CreateCipherInput!]!) {
+            cipher {
+                createMany(input: $input) {
+                    ... on CipherCreateFailed {
+                        message
+                    }
+                }
+            }
+        }
+    """
+    item = {
+        "type": CipherType.SECURE_NOTE,
+        "name": "encname",
+        "notes": "encnotes",
+        "key": "somekey",
+        "isFavorite": "encfavorite",
+        "status": "encstatus",
+        "data": None,
+    }
+
+    user = UserFactory()
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables={"input": [item, item]})
+
+    assert response.data["cipher"]["createMany"] == [
+        {"message": "Invalid service process: At most 1 items are allowed."},
+    ] * 2
+    assert not Cipher.objects.filter(owner=user).exists()
+
+
+def test_update_many_ciphers_failed(mocker):
+    mocker.patch.object(mutations, "update_ciphers", side_effect=DatabaseError)
+    query = """
+        mutation UpdateMany($input: [UpdateCipherInput!]!) {
+            cipher {
+                updateMany(input: $input) {
+                    ... on CipherUpdateFailed {
+                        message
+                    }
+                }
+            }
+        }
+    """
+    user = UserFactory()
+    cipher = CipherFactory(owner=user, type=CipherType.LOGIN)
+    item = {
+        "id": str(relay.GlobalID("Cipher", str(cipher.uuid))),
+        "key": "newkey",
+        "isFavorite": "encfavorite",
+        "status": "encstatus",
+        "name": "newname",
+        "notes": "encnotes",
+        "data": None,
+    }
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables={"input": [item]})
+
+    assert response.data["cipher"]["updateMany"] == [
+        {"message": "Something went wrong when updating a vault item."},
+    ]
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from mp.apps.authx.models import User
+from mp.apps.cipher.models import Cipher, CipherType
+from mp.apps.cipher.services import (
+    create_sync_token,
+    get_all_ciphers_by_owner,
+    get_cipher_changes,
+)
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "postgresql",
+        reason="Asserts PostgreSQL query plans.",
+    ),
+]
+
+OWNERS = 20
+CIPHERS_PER_OWNER = 100
+
+
+@pytest.fixture
+def owners():
+    owners = User.objects.bulk_create(
+        [User(email=f"owner{i}@example.com") for i in range(OWNERS)],
+    )
+    now = timezone.now()
+    Cipher.objects.bulk_create(
+        [
+            Cipher(
+                owner=owner,
+                type=CipherType.LOGIN,
+                key="key",
+                is_favorite="false",
+                status="ACTIVE",
+                # A few ciphers are scheduled for deletion.
+                delete_on=now - timedelta(days=1) if i % 50 == 0 else None,
+            )
+            for owner in owners
+            for i in range(CIPHERS_PER_OWNER)
+        ],
+        batch_size=1000,
+    )
+    # Most ciphers haven't changed recently.
+    Cipher.objects.update(updated=now - timedelta(days=30))
+    Cipher.objects.filter(pk__in=Cipher.objects.order_by("?")[:20]).update(
+        updated=now,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Cipher._meta.db_table}")
+    return owners
+
+
+def _assert_index_scan(queryset, index_name=None):
+    plan = queryset.explain()
+    assert f"Seq Scan on {Cipher._meta.db_table}" not in plan, plan
+    assert "Index Scan" in plan or "Index Only Scan" in plan, plan
+    if index_name is not None:
+        assert index_name in plan, plan
+
+
+def _get_index_name(*fields):
+    for index in Cipher._meta.indexes:
+        if tuple(index.fields) == fields:
+            return index.name
+    raise AssertionError(fields)
+
+
+def test_cipher_by_owner_and_uuid_uses_index(owners):
+    cipher = Cipher.objects.filter(owner=owners[0]).first()
+    queryset = Cipher.objects.filter(owner=owners[0], uuid=cipher.uuid)
+    # The unique index of uuid.
+    _assert_index_scan(queryset, "cipher_cipher_uuid_")
+
+
+def test_ciphers_by_owner_use_index(owners):
+    _assert_index_scan(get_all_ciphers_by_owner(owners[0]))
+    # A page of the ciphers connection.
+    _assert_index_scan(get_all_ciphers_by_owner(owners[0]).order_by("pk")[:20])
+
+
+def test_cipher_changes_use_index(owners):
+    changes = get_cipher_changes(owners[0], create_sync_token(owners[0]))
+    _assert_index_scan(changes.ciphers, _get_index_name("owner", "updated"))
+
+
+def test_ciphers_to_delete_use_partial_index(owners):  # noqa: ARG001
+    queryset = Cipher.objects.filter(delete_on__lte=timezone.now())
+    _assert_index_scan(queryset, "cipher_delete_on_idx")
@@ -0,0 +1,129 @@
+import pytest
+
+from mp.apps.cipher.models import Cipher, CipherCardData, CipherLoginData
+from mp.apps.cipher.tests.factories import CipherFactory
+from mp.core.instrumentation import track_crypto_ops
+from mp.core.model import decryption
+from mp.core.model.fields import EncryptedValue
+
+pytestmark = pytest.mark.django_db
+
+
+def test_cipher_fields_are_decrypted_on_access():
+    cipher = CipherFactory()
+
+    with track_crypto_ops() as crypto_ops:
+        loaded_cipher = Cipher.objects.get(pk=cipher.pk)
+        assert crypto_ops["decrypt"] == 0
+        assert isinstance(loaded_cipher.__dict__["key"], EncryptedValue)
+
+        assert loaded_cipher.key == cipher.key
+        assert loaded_cipher.key == cipher.key
+        assert crypto_ops["decrypt"] == 1
+
+
+def test_cipher_data_is_decrypted_on_access():
+    cipher = CipherFactory()
+
+    with track_crypto_ops() as crypto_ops:
+        data = Cipher.objects.get(pk=cipher.pk).data
+        assert isinstance(data, CipherLoginData)
+        assert crypto_ops["decrypt"] == 0
+
+        assert data.username == cipher.data.username
+        assert crypto_ops["decrypt"] == 1
+
+
+def test_cipher_eager_decryption():
+    cipher = CipherFactory()
+
+    with track_crypto_ops() as crypto_ops:
+        loaded_cipher = Cipher.objects.eager().get(pk=cipher.pk)
+        assert crypto_ops["decrypt"] == 3
+        assert loaded_cipher.__dict__["key"] == cipher.key
+
+
+def test_cipher_values_list_is_decrypted():
+    cipher = CipherFactory()
+
+    assert list(Cipher.objects.values_list("key", flat=True)) == [cipher.key]
+
+
+def test_cipher_lazy_save():
+    cipher = CipherFactory()
+
+    loaded_cipher = Cipher.objects.get(pk=cipher.pk)
+    loaded_cipher.save()
+
+    assert Cipher.objects.get(pk=cipher.pk).key == cipher.key
+
+
+@pytest.mark.parametrize("threshold", [1, 1000])
+def test_cipher_batch_decrypt(settings, threshold):
+    settings.DB_DECRYPTION_WORKERS = 2
+    settings.DB_DECRYPTION_PARALLEL_THRESHOLD = threshold
+    ciphers = CipherFactory.create_batch(3)
+
+    with track_crypto_ops() as crypto_ops:
+        loaded_ciphers = list(Cipher.objects.order_by("pk").batch_decrypt())
+        assert crypto_ops["decrypt"] == 9
+
+    assert [c.__dict__["key"] for c in loaded_ciphers] == [c.key for c in ciphers]
+    assert [c.__dict__["status"] for c in loaded_ciphers] == [c.status for c in ciphers]
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_cipher_batch_decrypt_workers(settings, mocker, workers):
+    settings.DB_DECRYPTION_WORKERS = workers
+    settings.DB_DECRYPTION_PARALLEL_THRESHOLD = 1
+    get_executor = mocker.spy(decryption, "_get_executor")
+    CipherFactory.create_batch(3)
+
+    list(Cipher.objects.batch_decrypt())
+
+    assert get_executor.spy_return._max_workers == workers
+
+
+def test_cipher_save_skips_unchanged_encrypted_fields():
+    cipher = CipherFactory()
+
+    loaded_cipher = Cipher.objects.get(pk=cipher.pk)
+    loaded_cipher.key = cipher.key
+    loaded_cipher.is_favorite = "true"
+
+    with track_crypto_ops() as crypto_ops:
+        loaded_cipher.save()
+        assert crypto_ops["encrypt"] == 1
+        # The reassigned values are decrypted to compare them, status is not.
+        assert crypto_ops["decrypt"] == 2
+
+    assert Cipher.objects.get(pk=cipher.pk).is_favorite == "true"
+
+    with track_crypto_ops() as crypto_ops:
+        loaded_cipher.save()
+        assert crypto_ops["encrypt"] == 0
+        assert crypto_ops["decrypt"] == 0
+
+
+def test_cipher_data_fields():
+    data_fields = CipherCardData.data_fields
+
+    assert ("cardholder_name", "cardholderName") in data_fields.json_fields
+    assert "name" not in dict(data_fields.json_fields)
+    assert data_fields.attnames["expMonth"] == "exp_month"
+    assert data_fields.attnames["notes"] == "notes"
+    assert "uuid" not in data_fields.payload_attnames
+
+
+def test_cipher_data_to_json():
+    cipher_data = CipherLoginData(
+        username="user",
+        password="secret",  # noqa: S106
+        authenticator_key="key",
+    )
+
+    assert cipher_data.to_json() == {
+        "username": "user",
+        "password": "secret",
+        "authenticatorKey": "key",
+    }
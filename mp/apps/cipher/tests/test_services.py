@@ -1,19 +1,55 @@
+import io
+import json
 from datetime import timedelta
+from uuid import uuid4
 
 import pytest
 from django.conf import settings
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from mp.apps.cipher.models import SecureNoteType
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher import services
+from mp.apps.cipher.models import (
+    Cipher,
+    CipherCardData,
+    CipherDataStorage,
+    CipherImport,
+    CipherImportPart,
+    CipherImportStatus,
+    CipherLoginData,
+    CipherTombstone,
+    CipherType,
+    SecureNoteType,
+)
 from mp.apps.cipher.services import (
     CipherCardDataBuilder,
     CipherLoginDataBuilder,
     CipherSecureNoteDataBuilder,
     DataBuilderMissingDataError,
+    InvalidSyncTokenError,
+    convert_cipher_storage,
+    create_cipher,
+    create_cipher_import,
+    create_ciphers,
+    create_sync_token,
+    delete_ciphers_by_owner_and_uuids,
+    get_all_ciphers_by_owner,
+    get_cipher_changes,
+    get_vault_revision,
+    iter_cipher_export,
+    purge_cipher_tombstones,
     restore_cipher_from_delete_state,
+    run_cipher_import,
+    update_cipher,
     update_cipher_to_delete_state,
+    update_ciphers,
 )
-from mp.apps.cipher.tests.factories import CipherFactory
+from mp.apps.cipher.tests.factories import CipherDataCardFactory, CipherFactory
+from mp.core.exceptions import ServiceValidationError
+from mp.core.instrumentation import track_crypto_ops
+from mp.core.model.datakeys import data_key_scope
 
 pytestmark = pytest.mark.django_db
 
@@ -36,6 +72,25 @@ def test_restore_cipher_from_delete_state():
     assert restored_cipher.delete_on is None
 
 
+def test_delete_ciphers_by_owner_and_uuids():
+    user = UserFactory()
+    kept, login, other_login = CipherFactory.create_batch(3, owner=user)
+    card = CipherFactory(owner=user, data=CipherDataCardFactory())
+
+    deleted_uuids = delete_ciphers_by_owner_and_uuids(
+        owner=user,
+        uuids=[login.uuid, other_login.uuid, card.uuid],
+    )
+
+    assert set(deleted_uuids) == {login.uuid, other_login.uuid, card.uuid}
+    assert list(Cipher.objects.filter(owner=user)) == [kept]
+    # No orphaned data rows.
+    assert list(CipherLoginData.objects.values_list("pk", flat=True)) == [
+        kept.object_id
+    ]
+    assert not CipherCardData.objects.exists()
+
+
 @pytest.mark.parametrize(
     "builder_class", [CipherLoginDataBuilder, CipherCardDataBuilder]
 )
@@ -56,3 +111,474 @@ def test_secure_note_data_builder():
     data_builder = CipherSecureNoteDataBuilder()
     secure_note = data_builder.build_cipher_data(data=None)
     assert secure_note.type == SecureNoteType.GENERIC
+
+
+def test_update_cipher_only_writes_changed_fields():
+    cipher = CipherFactory()
+    data = cipher.data
+    with data_key_scope(cipher.owner):
+        # Create the owner's data key.
+        pass
+
+    with track_crypto_ops() as crypto_ops:
+        update_cipher(
+            owner=cipher.owner,
+            uuid=cipher.uuid,
+            key=cipher.key,
+            is_favorite="true",
+            name=data.name,
+            status=cipher.status,
+            notes=data.notes,
+            data={"username": data.username, "password": data.password},
+        )
+        assert crypto_ops["encrypt"] == 1
+
+    updated_cipher = Cipher.objects.get(pk=cipher.pk)
+    assert updated_cipher.is_favorite == "true"
+    assert updated_cipher.data.username == data.username
+
+
+def test_get_cipher_changes(settings):
+    settings.CIPHER_SYNC_TOKEN_MARGIN = 0
+    user = UserFactory()
+    unchanged, updated, deleted = CipherFactory.create_batch(3, owner=user)
+    other_user_cipher = CipherFactory()
+
+    sync_token = create_sync_token(user)
+    update_cipher_to_delete_state(owner=user, uuid=updated.uuid)
+    delete_ciphers_by_owner_and_uuids(owner=user, uuids=[deleted.uuid])
+    delete_ciphers_by_owner_and_uuids(
+        owner=other_user_cipher.owner,
+        uuids=[other_user_cipher.uuid],
+    )
+    created = CipherFactory(owner=user)
+
+    changes = get_cipher_changes(user, sync_token)
+    # The changes are unordered.
+    assert {cipher.uuid for cipher in changes.ciphers} == {updated.uuid, created.uuid}
+    assert changes.deleted_uuids == [deleted.uuid]
+
+    changes = get_cipher_changes(user, changes.sync_token)
+    assert not changes.ciphers
+    assert not changes.deleted_uuids
+
+
+def test_get_cipher_changes_invalid_sync_token():
+    user = UserFactory()
+
+    with pytest.raises(InvalidSyncTokenError, match="Invalid sync token."):
+        get_cipher_changes(user, "invalid")
+
+    with pytest.raises(InvalidSyncTokenError, match="Invalid sync token."):
+        get_cipher_changes(user, create_sync_token(UserFactory()))
+
+
+def test_get_cipher_changes_expired_sync_token(settings):
+    user = UserFactory()
+    sync_token = create_sync_token(user)
+
+    settings.CIPHER_TOMBSTONE_RETENTION_DAYS = 0
+    with pytest.raises(InvalidSyncTokenError, match="full sync is required"):
+        get_cipher_changes(user, sync_token)
+
+
+def test_purge_cipher_tombstones():
+    cipher, expired_cipher = CipherFactory.create_batch(2)
+    delete_ciphers_by_owner_and_uuids(owner=cipher.owner, uuids=[cipher.uuid])
+    delete_ciphers_by_owner_and_uuids(
+        owner=expired_cipher.owner,
+        uuids=[expired_cipher.uuid],
+    )
+    CipherTombstone.objects.filter(uuid=expired_cipher.uuid).update(
+        deleted=timezone.now()
+        - timedelta(days=settings.CIPHER_TOMBSTONE_RETENTION_DAYS + 1),
+    )
+
+    assert purge_cipher_tombstones() == 1
+    assert list(CipherTombstone.objects.values_list("uuid", flat=True)) == [
+        cipher.uuid
+    ]
+
+
+def test_vault_revision():
+    user = UserFactory()
+    assert get_vault_revision(user) == 0
+
+    cipher = create_cipher(
+        owner=user,
+        type=CipherType.LOGIN,
+        name="name",
+        key="key",
+        status="ACTIVE",
+        is_favorite="false",
+        data={
+            "username": "username",
+            "password": "password",
+            "authenticatorKey": "",
+        },
+    )
+    assert get_vault_revision(user) == 1
+
+    update_cipher(
+        owner=user,
+        uuid=cipher.uuid,
+        key="key",
+        is_favorite="true",
+        name="name",
+        status="ACTIVE",
+        data={
+            "username": "username",
+            "password": "password",
+            "authenticatorKey": "",
+        },
+    )
+    update_cipher_to_delete_state(owner=user, uuid=cipher.uuid)
+    restore_cipher_from_delete_state(owner=user, uuid=cipher.uuid)
+    assert get_vault_revision(user) == 4
+
+    delete_ciphers_by_owner_and_uuids(owner=user, uuids=[uuid4()])
+    assert get_vault_revision(user) == 4
+
+    delete_ciphers_by_owner_and_uuids(owner=user, uuids=[cipher.uuid])
+    assert get_vault_revision(user) == 5
+
+
+LOGIN_DATA = {
+    "username": "username",
+    "password": "password",
+    "authenticatorKey": None,
+}
+
+
+def test_inline_cipher_storage(settings):
+    settings.CIPHER_DATA_STORAGE = CipherDataStorage.INLINE
+    user = UserFactory()
+
+    cipher = create_cipher(
+        owner=user,
+        type=CipherType.LOGIN,
+        name="name",
+        key="key",
+        status="ACTIVE",
+        is_favorite="false",
+        data=LOGIN_DATA,
+        notes="notes",
+    )
+    assert cipher.has_inline_data
+    assert not CipherLoginData.objects.exists()
+
+    update_cipher(
+        owner=user,
+        uuid=cipher.uuid,
+        key="key",
+        is_favorite="true",
+        name="new name",
+        status="ACTIVE",
+        data={"password": "new password"},
+    )
+
+    cipher = get_all_ciphers_by_owner(user).get()
+    assert isinstance(cipher.data, CipherLoginData)
+    assert cipher.data.name == "new name"
+    assert cipher.data.notes is None
+    assert cipher.data.to_json() == {
+        "username": "username",
+        "password": "new password",
+        "authenticatorKey": None,
+    }
+    assert not CipherLoginData.objects.exists()
+
+
+def test_convert_cipher_storage():
+    ciphers = CipherFactory.create_batch(3, type=CipherType.LOGIN)
+    expected = {cipher.uuid: cipher.data.to_json() for cipher in ciphers}
+
+    assert convert_cipher_storage(CipherDataStorage.INLINE, chunk_size=2) == 3
+    assert convert_cipher_storage(CipherDataStorage.INLINE) == 0
+    assert not CipherLoginData.objects.exists()
+    for cipher in Cipher.objects.all():
+        assert cipher.has_inline_data
+        assert cipher.data.to_json() == expected[cipher.uuid]
+
+    assert convert_cipher_storage(CipherDataStorage.TABLES, chunk_size=2) == 3
+    assert CipherLoginData.objects.count() == 3
+    for cipher in Cipher.objects.all():
+        assert not cipher.has_inline_data
+        assert cipher.payload is None
+        assert cipher.data.to_json() == expected[cipher.uuid]
+
+
+def _cipher_item(**kwargs):
+    return {
+        "type": CipherType.LOGIN,
+        "name": "name",
+        "key": "key",
+        "status": "ACTIVE",
+        "is_favorite": "false",
+        "data": LOGIN_DATA,
+        "notes": "notes",
+        **kwargs,
+    }
+
+
+@pytest.mark.parametrize("storage", CipherDataStorage.values)
+def test_create_ciphers(settings, storage):
+    settings.CIPHER_DATA_STORAGE = storage
+    user = UserFactory()
+    items = [
+        *(_cipher_item(name=f"name {i}") for i in range(20)),
+        _cipher_item(type=CipherType.CARD),
+        _cipher_item(type=CipherType.SECURE_NOTE, data=None),
+    ]
+
+    # Create the data key.
+    create_ciphers(user, items[-3:])
+    num_queries = []
+    for size in (3, len(items)):
+        with CaptureQueriesContext(connection) as context:
+            results = create_ciphers(user, items[-size:])
+        num_queries.append(len(context.captured_queries))
+
+    # One insert per table whatever the number of items.
+    assert num_queries[0] == num_queries[1]
+    assert isinstance(results[20], ServiceValidationError)
+    assert str(results[20]) == (
+        "Invalid service process: Missing cipher data 'cardholderName'."
+    )
+    ciphers = get_all_ciphers_by_owner(user).order_by("pk")
+    assert [cipher.uuid for cipher in ciphers][-21:] == [
+        result.uuid for i, result in enumerate(results) if i != 20
+    ]
+    assert Cipher.objects.get(uuid=results[5].uuid).data.name == "name 5"
+    assert get_vault_revision(user) == 3
+
+
+@pytest.mark.parametrize("storage", CipherDataStorage.values)
+def test_create_ciphers_missing_values(settings, storage):
+    settings.CIPHER_DATA_STORAGE = storage
+    user = UserFactory()
+    items = [
+        _cipher_item(name=None),
+        _cipher_item(data={**LOGIN_DATA, "username": None}),
+        _cipher_item(is_favorite=None),
+        _cipher_item(name="valid"),
+    ]
+
+    results = create_ciphers(user, items)
+
+    assert [str(result) for result in results[:3]] == [
+        "Invalid service process: Missing value for name.",
+        "Invalid service process: Missing value for username.",
+        "Invalid service process: Missing value for isFavorite.",
+    ]
+    assert [cipher.data.name for cipher in get_all_ciphers_by_owner(user)] == [
+        "valid",
+    ]
+
+
+def test_create_ciphers_max_items(settings):
+    settings.CIPHER_BULK_MAX_ITEMS = 2
+
+    with pytest.raises(ServiceValidationError, match="At most 2 items"):
+        create_ciphers(UserFactory(), [_cipher_item() for _ in range(3)])
+
+
+@pytest.mark.parametrize("storage", CipherDataStorage.values)
+def test_update_ciphers(settings, storage):
+    settings.CIPHER_DATA_STORAGE = storage
+    user = UserFactory()
+    ciphers = create_ciphers(user, [_cipher_item() for _ in range(10)])
+    missing_uuid = uuid4()
+    items = [
+        {
+            "uuid": cipher.uuid,
+            "key": f"key {i}",
+            "is_favorite": "true",
+            "name": f"name {i}",
+            "status": "ACTIVE",
+            "data": {"password": f"password {i}"},
+            "notes": None,
+        }
+        for i, cipher in enumerate(ciphers)
+    ]
+    items.append({**items[0], "uuid": missing_uuid})
+
+    with CaptureQueriesContext(connection) as context:
+        update_ciphers(user, items[:2])
+    num_queries = len(context.captured_queries)
+
+    with CaptureQueriesContext(connection) as context:
+        results = update_ciphers(user, items)
+    assert len(context.captured_queries) == num_queries
+    assert str(results[-1]) == (
+        f"Invalid service process: Cipher {missing_uuid} not found."
+    )
+    for i, cipher in enumerate(get_all_ciphers_by_owner(user).order_by("pk")):
+        assert cipher.key == f"key {i}"
+        assert cipher.data.name == f"name {i}"
+        assert cipher.data.notes is None
+        assert cipher.data.password == f"password {i}"
+        assert cipher.data.username == "username"
+    assert get_vault_revision(user) == 3
+
+
+def test_update_ciphers_missing_values():
+    user = UserFactory()
+    ciphers = create_ciphers(user, [_cipher_item() for _ in range(2)])
+    items = [
+        {
+            "uuid": cipher.uuid,
+            "key": "new key",
+            "is_favorite": "true",
+            "name": "new name",
+            "status": "ACTIVE",
+            "data": None,
+            "notes": None,
+        }
+        for cipher in ciphers
+    ]
+    items[0]["data"] = {"password": None}
+
+    results = update_ciphers(user, items)
+
+    assert str(results[0]) == "Invalid service process: Missing value for password."
+    assert [
+        cipher.key for cipher in get_all_ciphers_by_owner(user).order_by("pk")
+    ] == ["key", "new key"]
+
+
+def _import_line(**kwargs):
+    item = {
+        "type": CipherType.LOGIN,
+        "name": "name",
+        "key": "key",
+        "status": "ACTIVE",
+        "isFavorite": "false",
+        "data": LOGIN_DATA,
+        "notes": "notes",
+        **kwargs,
+    }
+    return json.dumps(item).encode("utf-8")
+
+
+def test_run_cipher_import(settings, mocker):
+    settings.CIPHER_IMPORT_CHUNK_SIZE = 2
+    # Lines span several parts.
+    mocker.patch.object(services, "IMPORT_PART_SIZE", 64)
+    user = UserFactory()
+    lines = [
+        _import_line(name="name 1"),
+        b"{invalid",
+        _import_line(name="name 2", notes=None),
+        b"",
+        _import_line(type=CipherType.CARD),
+        b"[]",
+        json.dumps({"type": CipherType.LOGIN}).encode("utf-8"),
+        _import_line(name="name 3"),
+    ]
+
+    cipher_import = create_cipher_import(user, io.BytesIO(b"\n".join(lines)))
+    assert cipher_import.status == CipherImportStatus.PENDING
+    assert cipher_import.parts.count() > len(lines)
+
+    run_cipher_import(cipher_import)
+
+    cipher_import.refresh_from_db()
+    assert cipher_import.status == CipherImportStatus.COMPLETED
+    assert cipher_import.total == 7
+    assert cipher_import.imported == 3
+    assert cipher_import.failed == 4
+    assert cipher_import.errors == [
+        {"line": 2, "message": "Invalid JSON."},
+        {
+            "line": 5,
+            "message": "Invalid service process: Missing cipher data 'cardholderName'.",
+        },
+        {
+            "line": 6,
+            "message": "Invalid service process: Item must be a JSON object.",
+        },
+        {
+            "line": 7,
+            "message": (
+                "Invalid service process: Missing fields name, key, status, "
+                "isFavorite."
+            ),
+        },
+    ]
+    assert not cipher_import.parts.exists()
+    assert sorted(
+        cipher.data.name for cipher in get_all_ciphers_by_owner(user)
+    ) == ["name 1", "name 2", "name 3"]
+
+
+def test_run_cipher_import_invalid_values():
+    user = UserFactory()
+    lines = [
+        _import_line(name=None),
+        _import_line(data={**LOGIN_DATA, "username": None}),
+        _import_line(isFavorite=False, key=1),
+        _import_line(data="data"),
+        _import_line(name="valid"),
+    ]
+    cipher_import = create_cipher_import(user, io.BytesIO(b"\n".join(lines)))
+
+    run_cipher_import(cipher_import)
+
+    cipher_import.refresh_from_db()
+    assert cipher_import.status == CipherImportStatus.COMPLETED
+    assert cipher_import.imported == 1
+    assert cipher_import.errors == [
+        {"line": 1, "message": "Invalid service process: Fields must be strings: name."},
+        {
+            "line": 2,
+            "message": "Invalid service process: Missing value for username.",
+        },
+        {
+            "line": 3,
+            "message": "Invalid service process: Fields must be strings: key, isFavorite.",
+        },
+        {
+            "line": 4,
+            "message": "Invalid service process: Field data must be a JSON object.",
+        },
+    ]
+    assert [cipher.data.name for cipher in get_all_ciphers_by_owner(user)] == [
+        "valid",
+    ]
+
+
+def test_create_cipher_import_max_size(settings):
+    settings.CIPHER_IMPORT_MAX_SIZE = 10
+
+    with pytest.raises(ServiceValidationError, match="larger than 10 bytes"):
+        create_cipher_import(UserFactory(), io.BytesIO(_import_line()))
+
+    assert not CipherImport.objects.exists()
+    assert not CipherImportPart.objects.exists()
+
+
+def test_run_cipher_import_failed(mocker):
+    mocker.patch.object(services, "create_ciphers", side_effect=DatabaseError)
+    cipher_import = create_cipher_import(UserFactory(), io.BytesIO(_import_line()))
+
+    with pytest.raises(DatabaseError):
+        run_cipher_import(cipher_import)
+
+    cipher_import.refresh_from_db()
+    assert cipher_import.status == CipherImportStatus.FAILED
+    assert not cipher_import.parts.exists()
+
+
+def test_iter_cipher_export_is_chunked():
+    user = UserFactory()
+    CipherFactory.create_batch(5, owner=user, type=CipherType.LOGIN)
+
+    with track_crypto_ops() as crypto_ops:
+        items = iter_cipher_export(user, chunk_size=2)
+        next(items)
+        first_chunk_decrypts = crypto_ops["decrypt"]
+        assert len([*items]) == 4
+
+    # Only the first chunk is decrypted before the first item.
+    assert first_chunk_decrypts * 5 == crypto_ops["decrypt"] * 2
@@ -1,10 +1,21 @@
+import io
+import json
 from datetime import timedelta
 
 import pytest
 from django.utils import timezone
 
-from mp.apps.cipher.models import Cipher
-from mp.apps.cipher.tasks import delete_ciphers_task
+from mp.apps.authx.tests.factories import UserFactory
+
+from mp.apps.cipher.models import (
+    Cipher,
+    CipherDataStorage,
+    CipherImportStatus,
+    CipherTombstone,
+    CipherType,
+)
+from mp.apps.cipher.services import convert_cipher_storage, create_cipher_import
+from mp.apps.cipher.tasks import delete_ciphers_task, import_ciphers_task
 from mp.apps.cipher.tests.factories import CipherFactory
 
 pytestmark = pytest.mark.django_db
@@ -12,10 +23,44 @@ pytestmark = pytest.mark.django_db
 
 def test_delete_ciphers_task():
     # Ciphers to be deleted.
-    CipherFactory.create_batch(5, delete_on=timezone.now())
+    ciphers = CipherFactory.create_batch(5, delete_on=timezone.now())
     # Ciphers not yet to be deleted.
     CipherFactory.create_batch(3, delete_on=timezone.now() + timedelta(days=1))
 
     delete_ciphers_task.call_local()
 
     assert Cipher.objects.count() == 3
+    for cipher in ciphers:
+        cipher.owner.refresh_from_db()
+        assert cipher.owner.vault_revision == 1
+    assert set(CipherTombstone.objects.values_list("uuid", flat=True)) == {
+        cipher.uuid for cipher in ciphers
+    }
+
+
+def test_delete_ciphers_task_inline_data():
+    cipher = CipherFactory(type=CipherType.LOGIN, delete_on=timezone.now())
+    convert_cipher_storage(CipherDataStorage.INLINE)
+
+    delete_ciphers_task.call_local()
+
+    assert not Cipher.objects.filter(pk=cipher.pk).exists()
+
+
+def test_import_ciphers_task():
+    user = UserFactory()
+    item = {
+        "type": CipherType.SECURE_NOTE,
+        "name": "name",
+        "key": "key",
+        "status": "ACTIVE",
+        "isFavorite": "false",
+    }
+    cipher_import = create_cipher_import(user, io.BytesIO(json.dumps(item).encode()))
+
+    import_ciphers_task.call_local(cipher_import.pk)
+
+    cipher_import.refresh_from_db()
+    assert cipher_import.status == CipherImportStatus.COMPLETED
+    assert cipher_import.imported == 1
+    assert Cipher.objects.get(owner=user).data.name == "name"
@@ -0,0 +1,160 @@
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.test.client import Client
+from django.urls import reverse
+from strawberry import relay
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher.models import CipherImport, CipherImportStatus, CipherType
+from mp.apps.cipher.services import (
+    create_cipher_import,
+    run_cipher_import,
+    update_cipher_to_delete_state,
+)
+from mp.apps.cipher.tests.factories import CipherFactory
+from mp.core.instrumentation import track_crypto_ops
+
+pytestmark = pytest.mark.django_db
+
+
+def test_vault_revision_view(client: Client):
+    user = UserFactory()
+    cipher = CipherFactory(owner=user)
+    client.force_login(user)
+    url = reverse("ciphers:revision")
+
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["data"]["revision"] == 0
+    etag = response.headers["ETag"]
+    assert etag == '"0"'
+
+    with track_crypto_ops() as crypto_ops:
+        response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert "decrypt" not in crypto_ops
+
+    update_cipher_to_delete_state(owner=user, uuid=cipher.uuid)
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["data"]["revision"] == 1
+    assert response.headers["ETag"] == '"1"'
+
+
+def test_vault_revision_view_no_authenticated_user(client: Client):
+    response = client.get(reverse("ciphers:revision"))
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json()["error"] == "Unknown user."
+
+
+@pytest.fixture
+def mock_import_ciphers_task(mocker):
+    return mocker.patch("mp.apps.cipher.views.import_ciphers_task")
+
+
+def test_cipher_import_view(client: Client, mock_import_ciphers_task):
+    user = UserFactory()
+    client.force_login(user)
+    body = "\n".join(json.dumps({"name": f"name {i}"}) for i in range(3))
+
+    response = client.post(
+        reverse("ciphers:import"),
+        data=body,
+        content_type="application/x-ndjson",
+    )
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    cipher_import = CipherImport.objects.get(owner=user)
+    assert response.json()["data"] == {
+        "id": str(relay.GlobalID("CipherImport", str(cipher_import.uuid))),
+        "status": CipherImportStatus.PENDING,
+    }
+    mock_import_ciphers_task.assert_called_once_with(cipher_import.pk)
+
+
+def test_cipher_import_view_without_csrf_token(mock_import_ciphers_task):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(UserFactory())
+
+    response = client.post(
+        reverse("ciphers:import"),
+        data=json.dumps({"name": "name"}),
+        content_type="application/x-ndjson",
+    )
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    mock_import_ciphers_task.assert_called_once()
+
+
+def test_cipher_import_view_too_large(
+    client: Client,
+    settings,
+    mock_import_ciphers_task,
+):
+    settings.CIPHER_IMPORT_MAX_SIZE = 10
+    client.force_login(UserFactory())
+
+    response = client.post(
+        reverse("ciphers:import"),
+        data=json.dumps({"name": "name"}),
+        content_type="application/x-ndjson",
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert not CipherImport.objects.exists()
+    mock_import_ciphers_task.assert_not_called()
+
+
+def test_cipher_import_view_invalid_request(client: Client, mock_import_ciphers_task):
+    url = reverse("ciphers:import")
+    response = client.post(url, data="{}", content_type="application/x-ndjson")
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    client.force_login(UserFactory())
+    response = client.post(url, data="{}", content_type="application/json")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()["error"] == "Invalid request content-type."
+    mock_import_ciphers_task.assert_not_called()
+
+
+def test_cipher_export_view(client: Client, settings):
+    settings.CIPHER_EXPORT_CHUNK_SIZE = 2
+    user = UserFactory()
+    ciphers = CipherFactory.create_batch(5, owner=user, type=CipherType.LOGIN)
+    CipherFactory(type=CipherType.LOGIN)
+    client.force_login(user)
+
+    response = client.get(reverse("ciphers:export"))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    body = b"".join(response.streaming_content)
+    items = [json.loads(line) for line in body.splitlines()]
+    assert [item["id"] for item in items] == [str(c.uuid) for c in ciphers]
+    assert items[0] == {
+        "id": str(ciphers[0].uuid),
+        "type": CipherType.LOGIN,
+        "name": ciphers[0].data.name,
+        "key": ciphers[0].key,
+        "status": ciphers[0].status,
+        "isFavorite": ciphers[0].is_favorite,
+        "data": ciphers[0].data.to_json(),
+        "notes": ciphers[0].data.notes,
+    }
+
+    # The export can be imported as is.
+    other_user = UserFactory()
+    cipher_import = create_cipher_import(other_user, io.BytesIO(body))
+    run_cipher_import(cipher_import)
+    assert cipher_import.imported == len(ciphers)
+
+
+def test_cipher_export_view_no_authenticated_user(client: Client):
+    response = client.get(reverse("ciphers:export"))
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from mp.apps.cipher.views import (
+    cipher_export_view,
+    cipher_import_view,
+    vault_revision_view,
+)
+
+app_name = "ciphers"
+urlpatterns = [
+    path("revision", view=vault_revision_view, name="revision"),
+    path("import", view=cipher_import_view, name="import"),
+    path("export", view=cipher_export_view, name="export"),
+]
@@ -0,0 +1,141 @@
+import json
+from collections.abc import Iterator
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from strawberry import relay
+
+from mp.apps.cipher.services import (
+    create_cipher_import,
+    get_vault_revision,
+    iter_cipher_export,
+)
+from mp.apps.cipher.tasks import import_ciphers_task
+from mp.core.exceptions import ServiceValidationError
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+@require_GET
+@csrf_exempt
+def vault_revision_view(request: HttpRequest) -> HttpResponse:
+    """Return the user's vault revision, its ETag is the revision.
+
+    Polling clients send it back in `If-None-Match` and get a 304 response as
+    long as the vault is unchanged, no cipher is loaded either way.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {
+                "error": "Unknown user.",
+            },
+            status=HTTPStatus.UNAUTHORIZED,
+        )
+
+    revision = get_vault_revision(request.user)
+    etag = quote_etag(str(revision))
+
+    response = get_conditional_response(request, etag=etag) or JsonResponse(
+        {
+            "data": {
+                "revision": revision,
+            },
+        },
+        status=HTTPStatus.OK,
+    )
+    response.headers["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@require_POST
+@csrf_exempt
+def cipher_import_view(request: HttpRequest) -> HttpResponse:
+    """Start an import of client-encrypted ciphers, one JSON item per line.
+
+    The items have the fields of `CreateCipherInput`. The body is stored in the
+    database in parts (`CipherImportPart`) and imported by a background task,
+    its progress is available with the `cipherImport` query.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {
+                "error": "Unknown user.",
+            },
+            status=HTTPStatus.UNAUTHORIZED,
+        )
+
+    if request.content_type != NDJSON_CONTENT_TYPE:
+        return JsonResponse(
+            {
+                "error": "Invalid request content-type.",
+            },
+            status=HTTPStatus.BAD_REQUEST,
+        )
+
+    try:
+        cipher_import = create_cipher_import(owner=request.user, stream=request)
+    except ServiceValidationError as error:
+        return JsonResponse(
+            {
+                "error": str(error),
+            },
+            status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    import_ciphers_task(cipher_import.pk)
+
+    return JsonResponse(
+        {
+            "data": {
+                "id": str(relay.GlobalID("CipherImport", str(cipher_import.uuid))),
+                "status": cipher_import.status,
+            },
+        },
+        status=HTTPStatus.ACCEPTED,
+    )
+
+
+def _iter_export_lines(items: Iterator[dict]) -> Iterator[bytes]:
+    for item in items:
+        yield json.dumps(item, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+@require_GET
+@csrf_exempt
+def cipher_export_view(request: HttpRequest) -> HttpResponse:
+    """Stream the user's vault as newline-delimited JSON, in the import format.
+
+    The ciphers are read and decrypted `CIPHER_EXPORT_CHUNK_SIZE` at a time while
+    the response is sent, the memory use doesn't depend on the vault size.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {
+                "error": "Unknown user.",
+            },
+            status=HTTPStatus.UNAUTHORIZED,
+        )
+
+    response = StreamingHttpResponse(
+        _iter_export_lines(
+            iter_cipher_export(
+                owner=request.user,
+                chunk_size=settings.CIPHER_EXPORT_CHUNK_SIZE,
+            ),
+        ),
+        content_type=NDJSON_CONTENT_TYPE,
+    )
+    response.headers["Content-Disposition"] = 'attachment; filename="vault.ndjson"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
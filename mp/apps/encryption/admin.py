@@ -0,0 +1,25 @@
+from django.contrib import admin
+
+from mp.apps.encryption.models import DataKey, ReEncryptionCheckpoint
+
+
+class DataKeyAdmin(admin.ModelAdmin):
+    list_display = ("owner", "created", "updated")
+    exclude = ("key",)
+    readonly_fields = ("owner", "created", "updated")
+
+
+class ReEncryptionCheckpointAdmin(admin.ModelAdmin):
+    list_display = (
+        "model_label",
+        "key_fingerprint",
+        "last_pk",
+        "processed_rows",
+        "completed",
+        "updated",
+    )
+    readonly_fields = ("created", "updated")
+
+
+admin.site.register(DataKey, DataKeyAdmin)
+admin.site.register(ReEncryptionCheckpoint, ReEncryptionCheckpointAdmin)
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class EncryptionConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    label = "encryption"
+    name = "mp.apps.encryption"
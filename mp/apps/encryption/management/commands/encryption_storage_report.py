@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from mp.apps.encryption.services import get_encrypted_models, get_storage_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the stored bytes of every encrypted field and the estimated bytes "
+        "when stored with EncryptedBinaryField."
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            "--sample-size",
+            type=int,
+            default=1000,
+            help="Rows decrypted per field to estimate the binary size.",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002
+        row_format = "{:<48} {:>10} {:>14} {:>14} {:>8}"
+        self.stdout.write(
+            row_format.format(
+                "table.field",
+                "rows",
+                "stored bytes",
+                "binary bytes",
+                "saved",
+            ),
+        )
+
+        for model in get_encrypted_models():
+            reports = get_storage_report(model, sample_size=options["sample_size"])
+            stored_bytes = sum(report.stored_bytes for report in reports)
+            binary_bytes = sum(report.binary_bytes for report in reports)
+
+            for report in reports:
+                self.stdout.write(
+                    row_format.format(
+                        f"{report.table}.{report.field}",
+                        report.rows,
+                        report.stored_bytes,
+                        report.binary_bytes,
+                        _percent(report.saved_bytes, report.stored_bytes),
+                    ),
+                )
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    row_format.format(
+                        f"{reports[0].table} (total)",
+                        "",
+                        stored_bytes,
+                        binary_bytes,
+                        _percent(stored_bytes - binary_bytes, stored_bytes),
+                    ),
+                ),
+            )
+
+
+def _percent(part: int, total: int) -> str:
+    if not total:
+        return "-"
+    return f"{part / total:.0%}"
@@ -0,0 +1,54 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from mp.apps.encryption.services import (
+    get_encrypted_models,
+    move_to_data_keys,
+    uses_data_keys,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Encrypt the values of the data key enabled models (e.g. ciphers) that are "
+        "still encrypted with DB_SYMMETRIC_KEY with the data key of their owner."
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            help="Model label (e.g. cipher.Cipher) to move, can be repeated.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.DB_REENCRYPTION_CHUNK_SIZE,
+        )
+        parser.add_argument(
+            "--throttle",
+            type=float,
+            default=settings.DB_REENCRYPTION_THROTTLE,
+            help="Seconds to sleep between chunks.",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002
+        models = (
+            [apps.get_model(label) for label in options["models"]]
+            if options["models"]
+            else [model for model in get_encrypted_models() if uses_data_keys(model)]
+        )
+
+        for model in models:
+            rows = move_to_data_keys(
+                model,
+                chunk_size=options["chunk_size"],
+                throttle=options["throttle"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model._meta.label}: {rows} rows moved to data keys.",  # noqa: SLF001
+                ),
+            )
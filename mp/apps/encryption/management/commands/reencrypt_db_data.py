@@ -0,0 +1,65 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from mp.apps.encryption.services import (
+    get_checkpoint,
+    get_encrypted_models,
+    reencrypt_model,
+    reset_checkpoints,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encrypt the encrypted fields of every model with DB_SYMMETRIC_KEY. "
+        "Keep the previous key in DB_SYMMETRIC_KEY_FALLBACKS until it finishes."
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            help="Model label (e.g. cipher.Cipher) to re-encrypt, can be repeated.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.DB_REENCRYPTION_CHUNK_SIZE,
+        )
+        parser.add_argument(
+            "--throttle",
+            type=float,
+            default=settings.DB_REENCRYPTION_THROTTLE,
+            help="Seconds to sleep between chunks.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the saved progress of the current key and start over.",
+        )
+
+    def handle(self, *args, **options):  # noqa: ANN002
+        models = (
+            [apps.get_model(label) for label in options["models"]]
+            if options["models"]
+            else get_encrypted_models()
+        )
+
+        if options["restart"]:
+            reset_checkpoints(models)
+
+        for model in models:
+            reencrypt_model(
+                model,
+                chunk_size=options["chunk_size"],
+                throttle=options["throttle"],
+            )
+            checkpoint = get_checkpoint(model)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{checkpoint.model_label}: {checkpoint.processed_rows} rows "
+                    "re-encrypted.",
+                ),
+            )
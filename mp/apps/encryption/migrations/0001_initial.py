@@ -0,0 +1,37 @@
+# Generated by Django 4.2.25 on 2026-10-18 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ReEncryptionCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_label", models.CharField(max_length=100)),
+                ("key_fingerprint", models.CharField(max_length=64)),
+                ("last_pk", models.PositiveBigIntegerField(default=0)),
+                ("processed_rows", models.PositiveBigIntegerField(default=0)),
+                ("completed", models.BooleanField(default=False)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "unique_together": {("model_label", "key_fingerprint")},
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db.models import (
+    PROTECT,
+    BooleanField,
+    CharField,
+    DateTimeField,
+    Model,
+    OneToOneField,
+    PositiveBigIntegerField,
+)
+
+from mp.core.model.fields import EncryptedTextField
+
+
+class DataKey(Model):
+    """Data encryption key of an owner, wrapped with the master key.
+
+    Rotating the master key only re-encrypts this row, the owner's data
+    encrypted with the data key is left untouched.
+    """
+
+    key = EncryptedTextField(null=False, blank=False)
+    owner = OneToOneField(
+        settings.AUTH_USER_MODEL,
+        related_name="data_key",
+        null=False,
+        blank=False,
+        on_delete=PROTECT,
+    )
+
+    created = DateTimeField(auto_now_add=True)
+    updated = DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}:{self.pk}"
+
+
+class ReEncryptionCheckpoint(Model):
+    """Progress of re-encrypting a model's encrypted fields with a primary key.
+
+    A checkpoint is kept per model and primary key fingerprint so an interrupted
+    re-encryption job can resume from the last processed primary key.
+    """
+
+    model_label = CharField(max_length=100, null=False, blank=False)
+    key_fingerprint = CharField(max_length=64, null=False, blank=False)
+    last_pk = PositiveBigIntegerField(null=False, blank=False, default=0)
+    processed_rows = PositiveBigIntegerField(null=False, blank=False, default=0)
+    completed = BooleanField(null=False, blank=False, default=False)
+
+    created = DateTimeField(auto_now_add=True)
+    updated = DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("model_label", "key_fingerprint")
+
+    def __str__(self) -> str:
+        return f"{self.model_label} - {self.key_fingerprint}"
@@ -0,0 +1,338 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Count,
+    ExpressionWrapper,
+    Model,
+    Q,
+    Sum,
+)
+from django.db.models.functions import Length
+
+from mp.apps.encryption.models import ReEncryptionCheckpoint
+from mp.core.model.datakeys import (
+    DATA_KEY_SEPARATOR,
+    data_key_scope,
+    get_data_key_model,
+)
+from mp.core.model.fields import ENVELOPE_V1_OVERHEAD, EncryptedFieldMixin
+from mp.core.model.keyring import get_key_ring
+
+logger = logging.getLogger(__name__)
+
+
+def get_encrypted_field_names(model: type[Model]) -> list[str]:
+    fields = model._meta.concrete_fields  # noqa: SLF001
+    return [f.attname for f in fields if isinstance(f, EncryptedFieldMixin)]
+
+
+def get_encrypted_models() -> list[type[Model]]:
+    return [
+        model
+        for model in apps.get_models()
+        if model._meta.managed  # noqa: SLF001
+        and not model._meta.proxy  # noqa: SLF001
+        and get_encrypted_field_names(model)
+    ]
+
+
+# Annotation prefix of the fields of a row still encrypted with the master key.
+_MASTER_KEY_ANNOTATION = "master_key_"
+
+
+def uses_data_keys(model: type[Model]) -> bool:
+    """Return whether the model is encrypted with the data keys of its owners.
+
+    Such models set `use_data_key_encryption` and implement
+    `get_data_key_owner_ids(pks)`, the owner id of each row by primary key.
+    """
+    return getattr(model, "use_data_key_encryption", False)
+
+
+def get_master_key_field_filter(name: str) -> Q:
+    """Filter the rows whose `name` value is encrypted with the master key."""
+    return (
+        ~Q(**{f"{name}__contains": DATA_KEY_SEPARATOR})
+        & ~Q(**{name: ""})
+        & Q(**{f"{name}__isnull": False})
+    )
+
+
+def get_master_key_filter(model: type[Model]) -> Q:
+    """Filter the rows that have values encrypted with the master key.
+
+    Values encrypted with a data key don't depend on the master key, rotating
+    the master key only re-encrypts the data keys themselves.
+    """
+    if not uses_data_keys(model):
+        return Q()
+
+    master_key_rows = Q()
+    for name in get_encrypted_field_names(model):
+        master_key_rows |= get_master_key_field_filter(name)
+    return master_key_rows
+
+
+def _get_master_key_rows(
+    model: type[Model],
+    last_pk: int,
+    chunk_size: int,
+) -> list[Model]:
+    """Lock and return the next rows with values encrypted with the master key.
+
+    The rows of data key enabled models are annotated with the fields to
+    re-encrypt, see `_reencrypt_rows`.
+    """
+    field_names = get_encrypted_field_names(model)
+    queryset = (
+        model._base_manager.select_for_update()  # noqa: SLF001
+        .filter(get_master_key_filter(model), pk__gt=last_pk)
+        .order_by("pk")
+        .only("pk", *field_names)
+    )
+    if uses_data_keys(model):
+        queryset = queryset.annotate(
+            **{
+                f"{_MASTER_KEY_ANNOTATION}{name}": ExpressionWrapper(
+                    get_master_key_field_filter(name),
+                    output_field=BooleanField(),
+                )
+                for name in field_names
+            },
+        )
+    return list(queryset[:chunk_size])
+
+
+def _reencrypt_rows(model: type[Model], objs: list[Model]) -> None:
+    """Re-encrypt the values of the rows encrypted with the master key.
+
+    Values are decrypted with any key of the key ring when loaded and encrypted
+    with the primary key when saved. The master key values of data key enabled
+    models are encrypted with the data key of the row's owner instead (rows
+    without an owner stay on the master key), their data key values are left
+    as is.
+    """
+    field_names = get_encrypted_field_names(model)
+    manager = model._base_manager  # noqa: SLF001
+    if not uses_data_keys(model):
+        manager.bulk_update(objs, field_names)
+        return
+
+    owner_ids = model.get_data_key_owner_ids([obj.pk for obj in objs])  # type: ignore[attr-defined]
+    owner_model = get_data_key_model()._meta.get_field("owner").related_model  # noqa: SLF001
+    owners = owner_model._base_manager.in_bulk(set(owner_ids.values()))  # noqa: SLF001
+
+    # One bulk update per owner and set of fields to re-encrypt.
+    groups: dict[tuple[int | None, tuple[str, ...]], list[Model]] = defaultdict(list)
+    for obj in objs:
+        names = tuple(
+            name
+            for name in field_names
+            if getattr(obj, f"{_MASTER_KEY_ANNOTATION}{name}")
+        )
+        if names:
+            groups[owner_ids.get(obj.pk), names].append(obj)
+
+    for (owner_id, names), group in groups.items():
+        owner = owners.get(owner_id)
+        with data_key_scope(owner) if owner is not None else nullcontext():
+            manager.bulk_update(group, names)
+
+
+def get_checkpoint(model: type[Model]) -> ReEncryptionCheckpoint:
+    checkpoint, _ = ReEncryptionCheckpoint.objects.get_or_create(
+        model_label=model._meta.label,  # noqa: SLF001
+        key_fingerprint=get_key_ring().primary_fingerprint,
+    )
+    return checkpoint
+
+
+def reencrypt_model(
+    model: type[Model],
+    chunk_size: int,
+    throttle: float = 0,
+    max_chunks: int | None = None,
+) -> int:
+    """Re-encrypt the encrypted fields of a model with the primary key.
+
+    Rows are walked in primary key order, `chunk_size` rows at a time. Each chunk
+    is locked, re-encrypted with a single bulk update and checkpointed in the same
+    transaction, so the job can be interrupted at any point and resumed later.
+    The job sleeps `throttle` seconds between chunks to limit the database load.
+
+    Returns the number of processed chunks.
+    """
+    checkpoint = get_checkpoint(model)
+    if checkpoint.completed:
+        return 0
+
+    chunks = 0
+
+    while max_chunks is None or chunks < max_chunks:
+        with transaction.atomic():
+            objs = _get_master_key_rows(model, checkpoint.last_pk, chunk_size)
+
+            if not objs:
+                checkpoint.completed = True
+                checkpoint.save(update_fields=["completed", "updated"])
+                logger.info(
+                    "Re-encryption of %s completed, %s rows processed.",
+                    checkpoint.model_label,
+                    checkpoint.processed_rows,
+                )
+                break
+
+            _reencrypt_rows(model, objs)
+
+            checkpoint.last_pk = objs[-1].pk
+            checkpoint.processed_rows += len(objs)
+            checkpoint.save(update_fields=["last_pk", "processed_rows", "updated"])
+
+        chunks += 1
+        if throttle:
+            time.sleep(throttle)
+
+    return chunks
+
+
+def reencrypt_models(
+    chunk_size: int,
+    throttle: float = 0,
+    max_chunks: int | None = None,
+    models: list[type[Model]] | None = None,
+) -> int:
+    """Re-encrypt every model with encrypted fields, see `reencrypt_model`.
+
+    `max_chunks` is shared between the models. Returns the number of processed
+    chunks.
+    """
+    chunks = 0
+
+    for model in models or get_encrypted_models():
+        remaining = None if max_chunks is None else max_chunks - chunks
+        if remaining is not None and remaining <= 0:
+            break
+
+        chunks += reencrypt_model(
+            model,
+            chunk_size=chunk_size,
+            throttle=throttle,
+            max_chunks=remaining,
+        )
+
+    return chunks
+
+
+def move_to_data_keys(
+    model: type[Model],
+    chunk_size: int,
+    throttle: float = 0,
+) -> int:
+    """Encrypt the values still encrypted with the master key with data keys.
+
+    Moves the rows of a data key enabled model written before it used data keys
+    (or outside of a `data_key_scope`) to the data key of their owner, see
+    `_reencrypt_rows`. Returns the number of processed rows.
+    """
+    if not uses_data_keys(model):
+        return 0
+
+    last_pk = 0
+    rows = 0
+    while True:
+        with transaction.atomic():
+            objs = _get_master_key_rows(model, last_pk, chunk_size)
+            if not objs:
+                break
+            _reencrypt_rows(model, objs)
+
+        last_pk = objs[-1].pk
+        rows += len(objs)
+        if throttle:
+            time.sleep(throttle)
+
+    logger.info("Moved %s rows of %s to data keys.", rows, model._meta.label)  # noqa: SLF001
+    return rows
+
+
+def reset_checkpoints(models: list[type[Model]] | None = None) -> int:
+    """Delete the checkpoints of the current primary key to start over."""
+    labels = [
+        model._meta.label  # noqa: SLF001
+        for model in models or get_encrypted_models()
+    ]
+    deleted, _ = ReEncryptionCheckpoint.objects.filter(
+        model_label__in=labels,
+        key_fingerprint=get_key_ring().primary_fingerprint,
+    ).delete()
+    return deleted
+
+
+@dataclass
+class FieldStorageReport:
+    table: str
+    field: str
+    rows: int
+    stored_bytes: int
+    binary_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.stored_bytes - self.binary_bytes
+
+
+def get_storage_report(
+    model: type[Model],
+    sample_size: int,
+) -> list[FieldStorageReport]:
+    """Compare the stored size of encrypted fields with the binary envelope size.
+
+    The stored size is measured by the database. The binary envelope size is
+    computed from the decrypted value of up to `sample_size` rows per field and
+    extrapolated to the remaining rows.
+    """
+    manager = model._base_manager  # noqa: SLF001
+    table = model._meta.db_table  # noqa: SLF001
+    reports = []
+
+    for field_name in get_encrypted_field_names(model):
+        totals = manager.aggregate(
+            rows=Count(field_name),
+            stored_bytes=Sum(Length(field_name)),
+        )
+        sample = manager.exclude(**{f"{field_name}__isnull": True}).annotate(
+            stored_bytes=Length(field_name),
+        )[:sample_size]
+
+        sample_stored_bytes = 0
+        sample_binary_bytes = 0
+        for value, stored_bytes in sample.values_list(field_name, "stored_bytes"):
+            sample_stored_bytes += stored_bytes
+            if value:
+                sample_binary_bytes += ENVELOPE_V1_OVERHEAD + len(value.encode())
+
+        stored_bytes = totals["stored_bytes"] or 0
+        binary_bytes = sample_binary_bytes
+        if sample_stored_bytes and stored_bytes > sample_stored_bytes:
+            binary_bytes = round(
+                stored_bytes * sample_binary_bytes / sample_stored_bytes,
+            )
+
+        reports.append(
+            FieldStorageReport(
+                table=table,
+                field=field_name,
+                rows=totals["rows"],
+                stored_bytes=stored_bytes,
+                binary_bytes=binary_bytes,
+            ),
+        )
+
+    return reports
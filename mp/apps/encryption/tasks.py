@@ -0,0 +1,24 @@
+import logging
+
+from django.conf import settings
+from huey import crontab
+from huey.contrib.djhuey import db_periodic_task, lock_task
+
+from mp.apps.encryption.services import reencrypt_models
+
+logger = logging.getLogger(__name__)
+
+
+@db_periodic_task(crontab(minute="*/15"))
+@lock_task("reencrypt-db-data")
+def reencrypt_db_data_task():
+    # Nothing to rotate when there is no previous key to move away from.
+    if not settings.DB_SYMMETRIC_KEY_FALLBACKS:
+        return
+
+    chunks = reencrypt_models(
+        chunk_size=settings.DB_REENCRYPTION_CHUNK_SIZE,
+        throttle=settings.DB_REENCRYPTION_THROTTLE,
+        max_chunks=settings.DB_REENCRYPTION_MAX_CHUNKS_PER_RUN,
+    )
+    logger.info("Re-encrypted %s chunks of database data.", chunks)
@@ -0,0 +1,153 @@
+from io import StringIO
+
+import pytest
+from cryptography.fernet import Fernet
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher.models import Cipher, CipherType
+from mp.apps.cipher.services import create_cipher
+from mp.apps.cipher.tests.factories import CipherFactory
+from mp.apps.encryption.models import DataKey
+from mp.apps.encryption.services import get_encrypted_field_names, reencrypt_model
+from mp.core.instrumentation import track_crypto_ops
+from mp.core.model.datakeys import DATA_KEY_SEPARATOR, reset_data_key_cache
+
+pytestmark = pytest.mark.django_db
+
+OLD_KEY = Fernet.generate_key().decode("utf-8")
+
+
+def _create_cipher(owner):
+    return create_cipher(
+        owner=owner,
+        type="SECURE_NOTE",
+        name="name",
+        key="key",
+        status="ACTIVE",
+        is_favorite="false",
+        notes="notes",
+    )
+
+
+def _get_stored_key(cipher):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT key FROM cipher_cipher WHERE id = %s", [cipher.pk])
+        return cursor.fetchone()[0]
+
+
+def _get_stored_values(obj, *names):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(names)} FROM {obj._meta.db_table} WHERE id = %s",
+            [obj.pk],
+        )
+        return cursor.fetchone()
+
+
+def test_cipher_is_encrypted_with_owner_data_key():
+    owner = UserFactory()
+    cipher = _create_cipher(owner)
+    data_key = DataKey.objects.get(owner=owner)
+
+    key_id, separator, token = _get_stored_key(cipher).partition(DATA_KEY_SEPARATOR)
+    assert separator == DATA_KEY_SEPARATOR
+    assert int(key_id) == data_key.pk
+    assert Fernet(data_key.key).decrypt(token.encode("utf-8")) == b"key"
+
+    loaded_cipher = Cipher.objects.get(pk=cipher.pk)
+    assert loaded_cipher.key == "key"
+    assert loaded_cipher.data.name == "name"
+    assert loaded_cipher.data.notes == "notes"
+
+    # The owner's data key is re-used.
+    _create_cipher(owner)
+    assert DataKey.objects.filter(owner=owner).count() == 1
+
+
+def test_data_key_is_cached():
+    cipher = _create_cipher(UserFactory())
+
+    with track_crypto_ops() as crypto_ops:
+        assert Cipher.objects.get(pk=cipher.pk).key == "key"
+        assert crypto_ops["unwrap"] == 0
+
+        reset_data_key_cache()
+        assert Cipher.objects.get(pk=cipher.pk).key == "key"
+        assert Cipher.objects.get(pk=cipher.pk).key == "key"
+        assert crypto_ops["unwrap"] == 1
+
+
+def test_master_key_rotation_only_rewraps_data_keys():
+    with override_settings(DB_SYMMETRIC_KEY=OLD_KEY):
+        cipher = _create_cipher(UserFactory())
+    stored_key = _get_stored_key(cipher)
+
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        assert reencrypt_model(DataKey, chunk_size=10) == 1
+        assert reencrypt_model(Cipher, chunk_size=10) == 0
+
+    reset_data_key_cache()
+    assert _get_stored_key(cipher) == stored_key
+    assert Cipher.objects.get(pk=cipher.pk).key == "key"
+
+
+def test_reencryption_keeps_data_key_values():
+    owner = UserFactory()
+    with override_settings(DB_SYMMETRIC_KEY=OLD_KEY):
+        cipher = _create_cipher(owner)
+        # E.g. a value written outside of a data key scope.
+        Cipher.objects.filter(pk=cipher.pk).update(status="DELETED")
+    stored_key, stored_status = _get_stored_values(cipher, "key", "status")
+    assert DATA_KEY_SEPARATOR in stored_key
+    assert DATA_KEY_SEPARATOR not in stored_status
+
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        call_command("reencrypt_db_data", stdout=StringIO())
+
+    key, status = _get_stored_values(cipher, "key", "status")
+    assert key == stored_key
+    data_key = DataKey.objects.get(owner=owner)
+    assert status.startswith(f"{data_key.pk}{DATA_KEY_SEPARATOR}")
+
+    reset_data_key_cache()
+    loaded_cipher = Cipher.objects.get(pk=cipher.pk)
+    assert loaded_cipher.key == "key"
+    assert loaded_cipher.status == "DELETED"
+
+
+def test_move_to_data_keys():
+    owner = UserFactory()
+    # Written before the ciphers used data keys.
+    cipher = CipherFactory(owner=owner, type=CipherType.LOGIN)
+    assert DATA_KEY_SEPARATOR not in _get_stored_key(cipher)
+
+    call_command("move_to_data_keys", stdout=StringIO())
+
+    data_key = DataKey.objects.get(owner=owner)
+    for obj in (cipher, cipher.data):
+        values = _get_stored_values(obj, *get_encrypted_field_names(type(obj)))
+        assert all(
+            value.startswith(f"{data_key.pk}{DATA_KEY_SEPARATOR}")
+            for value in values
+            if value
+        )
+
+    loaded_cipher = Cipher.objects.get(pk=cipher.pk)
+    assert loaded_cipher.key == cipher.key
+    assert loaded_cipher.data.username == cipher.data.username
+
+
+def test_data_key_field_read_is_counted_once():
+    cipher = _create_cipher(UserFactory())
+    reset_data_key_cache()
+    loaded_cipher = Cipher.objects.get(pk=cipher.pk)
+
+    with track_crypto_ops() as crypto_ops:
+        assert loaded_cipher.key == "key"
+
+    # The decryption of the data key itself is part of its unwrapping.
+    assert crypto_ops["decrypt"] == 1
+    assert crypto_ops["unwrap"] == 1
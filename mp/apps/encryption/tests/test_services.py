@@ -0,0 +1,95 @@
+import pytest
+from cryptography.fernet import Fernet
+from django.test import override_settings
+
+from mp.apps.authx.models import User
+from mp.apps.cipher.models import Cipher, CipherLoginData
+from mp.apps.cipher.tests.factories import CipherFactory
+from mp.apps.encryption.services import (
+    get_checkpoint,
+    get_encrypted_models,
+    get_storage_report,
+    reencrypt_model,
+    reencrypt_models,
+    reset_checkpoints,
+)
+from mp.apps.encryption.tasks import reencrypt_db_data_task
+
+pytestmark = pytest.mark.django_db
+
+OLD_KEY = Fernet.generate_key().decode("utf-8")
+
+
+def test_get_encrypted_models():
+    models = get_encrypted_models()
+
+    assert Cipher in models
+    assert CipherLoginData in models
+    assert User in models
+
+
+def test_reencrypt_model_resumes_from_checkpoint():
+    with override_settings(DB_SYMMETRIC_KEY=OLD_KEY):
+        ciphers = CipherFactory.create_batch(3)
+
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        # Simulate an interrupted job.
+        assert reencrypt_model(Cipher, chunk_size=2, max_chunks=1) == 1
+
+        checkpoint = get_checkpoint(Cipher)
+        assert checkpoint.processed_rows == 2
+        assert checkpoint.last_pk == ciphers[1].pk
+        assert not checkpoint.completed
+
+        assert reencrypt_model(Cipher, chunk_size=2) == 1
+
+        checkpoint.refresh_from_db()
+        assert checkpoint.processed_rows == 3
+        assert checkpoint.completed
+
+        # Completed models are skipped.
+        assert reencrypt_model(Cipher, chunk_size=2) == 0
+
+    # Without the old key.
+    for cipher in ciphers:
+        assert Cipher.objects.get(pk=cipher.pk).key == cipher.key
+
+
+def test_reencrypt_models_max_chunks_is_shared():
+    CipherFactory.create_batch(2)
+
+    assert reencrypt_models(chunk_size=1, max_chunks=3, models=[Cipher, User]) == 3
+    assert get_checkpoint(Cipher).completed
+    assert get_checkpoint(User).processed_rows == 1
+
+
+def test_reset_checkpoints():
+    CipherFactory()
+    reencrypt_model(Cipher, chunk_size=10)
+
+    assert reset_checkpoints([Cipher]) == 1
+    assert not get_checkpoint(Cipher).completed
+
+
+def test_reencrypt_db_data_task_without_fallback_keys(mocker):
+    mock_reencrypt_models = mocker.patch(
+        "mp.apps.encryption.tasks.reencrypt_models"
+    )
+    reencrypt_db_data_task.call_local()
+    mock_reencrypt_models.assert_not_called()
+
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        reencrypt_db_data_task.call_local()
+    mock_reencrypt_models.assert_called_once()
+
+
+def test_get_storage_report():
+    CipherFactory.create_batch(2)
+
+    reports = {report.field: report for report in get_storage_report(Cipher, 1)}
+
+    assert reports.keys() == {"key", "is_favorite", "status", "payload"}
+    report = reports["key"]
+    assert report.table == "cipher_cipher"
+    assert report.rows == 2
+    assert report.stored_bytes > report.binary_bytes > 0
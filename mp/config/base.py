@@ -15,6 +15,7 @@ from pathlib import Path
 import dj_database_url
 import environ
 from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 from huey import SqliteHuey
 
 env = environ.Env()
@@ -60,12 +61,13 @@ THIRD_PARTY_APPS = [
     "huey.contrib.djhuey",
 ]
 
-LOCAL_APPS = ["mp.apps.authx", "mp.apps.cipher"]
+LOCAL_APPS = ["mp.apps.authx", "mp.apps.cipher", "mp.apps.encryption"]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "mp.core.middleware.CryptoOpsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -252,9 +254,112 @@ NO_REPLY_EMAIL = f"no-reply@{DOMAIN}"
 # ------------------------------------------------------------
 CIPHER_DELETE_DAYS_PERIOD = 30
 
+# Maximum number of items of a bulk cipher mutation (e.g. createMany).
+CIPHER_BULK_MAX_ITEMS = env.int("CIPHER_BULK_MAX_ITEMS", default=500)
+
+# CIPHER IMPORT
+# ------------------------------------------------------------
+CIPHER_IMPORT_MAX_SIZE = env.int("CIPHER_IMPORT_MAX_SIZE", default=50 * 1024 * 1024)
+# Items written per transaction, at most CIPHER_BULK_MAX_ITEMS.
+CIPHER_IMPORT_CHUNK_SIZE = env.int("CIPHER_IMPORT_CHUNK_SIZE", default=500)
+if CIPHER_IMPORT_CHUNK_SIZE > CIPHER_BULK_MAX_ITEMS:
+    err_msg = "CIPHER_IMPORT_CHUNK_SIZE cannot be higher than CIPHER_BULK_MAX_ITEMS."
+    raise ImproperlyConfigured(err_msg)
+# Failed items kept with their error, the remaining ones are only counted.
+CIPHER_IMPORT_MAX_ERRORS = 100
+
+# Ciphers read and decrypted at a time by the vault export.
+CIPHER_EXPORT_CHUNK_SIZE = env.int("CIPHER_EXPORT_CHUNK_SIZE", default=1000)
+
+# CIPHER DATA STORAGE
+# ------------------------------------------------------------
+# Where new ciphers store their data: "tables" (a row of the cipher data
+# table of their type) or "inline" (encrypted JSON in `Cipher.payload`).
+# Existing ciphers are converted with `manage.py convert_cipher_storage`.
+CIPHER_DATA_STORAGE = env("CIPHER_DATA_STORAGE", default="tables")
+
+# CIPHER SYNC
+# ------------------------------------------------------------
+# Days deleted ciphers are kept as tombstones, sync tokens expire with them.
+CIPHER_TOMBSTONE_RETENTION_DAYS = 90
+# Seconds a sync token goes back in time, to include the changes of
+# transactions still running when it was issued.
+CIPHER_SYNC_TOKEN_MARGIN = 10
+
 # FERNET
 # ------------------------------------------------------------
 DB_SYMMETRIC_KEY = env("DB_SYMMETRIC_KEY")
+# Previous keys, only used to decrypt values that are not yet re-encrypted with
+# the DB_SYMMETRIC_KEY, e.g. DB_SYMMETRIC_KEY_FALLBACKS=oldkey1,oldkey2
+DB_SYMMETRIC_KEY_FALLBACKS = env.list("DB_SYMMETRIC_KEY_FALLBACKS", default=[])
+
+# Re-encryption job, see `reencrypt_db_data` command and task.
+DB_REENCRYPTION_CHUNK_SIZE = env.int("DB_REENCRYPTION_CHUNK_SIZE", default=500)
+# Seconds to sleep between chunks.
+DB_REENCRYPTION_THROTTLE = env.float("DB_REENCRYPTION_THROTTLE", default=0.5)
+DB_REENCRYPTION_MAX_CHUNKS_PER_RUN = env.int(
+    "DB_REENCRYPTION_MAX_CHUNKS_PER_RUN",
+    default=200,
+)
+
+# Send the per-request crypto timings in the `Server-Timing` response header.
+CRYPTO_SERVER_TIMING = env.bool(
+    "CRYPTO_SERVER_TIMING",
+    default=APP_ENVIRONMENT != "production",
+)
+
+# Values of encrypted fields with `compress=True` are compressed from this size
+# (in bytes).
+DB_COMPRESSION_THRESHOLD = env.int("DB_COMPRESSION_THRESHOLD", default=1024)
+
+# Per owner data keys, see `mp.core.model.datakeys`.
+DB_DATA_KEY_MODEL = "encryption.DataKey"
+DB_DATA_KEY_CACHE_SIZE = env.int("DB_DATA_KEY_CACHE_SIZE", default=1024)
+# Seconds an unwrapped data key is kept in memory.
+DB_DATA_KEY_CACHE_TTL = env.int("DB_DATA_KEY_CACHE_TTL", default=300)
+
+# Batch decryption, see `EncryptedQuerySet.batch_decrypt()`. Serial by default,
+# the thread pool is opt-in: on `benchmarks/bench_batch_decryption.py` the batch
+# decrypts 5133 rows/s serially and 5672, 5021 and 4921 rows/s with 2, 4 and 8
+# workers (eager loading 4870, lazy loading 6434 rows/s), too small a gain for
+# the threads.
+DB_DECRYPTION_WORKERS = env.int("DB_DECRYPTION_WORKERS", default=1)
+# With more than one worker, batches with fewer encrypted values are decrypted
+# serially.
+DB_DECRYPTION_PARALLEL_THRESHOLD = env.int(
+    "DB_DECRYPTION_PARALLEL_THRESHOLD",
+    default=256,
+)
+
+# Serve /graphql with the async view and schema, e.g. when running under ASGI.
+GRAPHQL_ASYNC = env.bool("GRAPHQL_ASYNC", default=False)
+
+# Automatic persisted queries of the GraphQL API, see `mp.graphql.persisted_queries`.
+GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE = env.int(
+    "GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE",
+    default=1000,
+)
+# Seconds a persisted query is kept in the Django cache.
+GRAPHQL_PERSISTED_QUERIES_TIMEOUT = env.int(
+    "GRAPHQL_PERSISTED_QUERIES_TIMEOUT",
+    default=60 * 60 * 24 * 30,
+)
+# Only execute the already registered persisted queries: reject the requests
+# without a hash and the unknown hashes instead of registering their query.
+GRAPHQL_PERSISTED_QUERIES_ONLY = env.bool(
+    "GRAPHQL_PERSISTED_QUERIES_ONLY",
+    default=False,
+)
+
+# Parsed and validated GraphQL documents kept per process and schema, by query
+# text (strawberry's `ParserCache` and `ValidationCache`).
+GRAPHQL_DOCUMENT_CACHE_SIZE = env.int("GRAPHQL_DOCUMENT_CACHE_SIZE", default=256)
+
+# Maximum number of operations of a batched (JSON array) GraphQL request.
+GRAPHQL_BATCH_MAX_SIZE = env.int("GRAPHQL_BATCH_MAX_SIZE", default=10)
+
+# Maximum estimated cost of a GraphQL operation, see `mp.graphql.query_cost`.
+GRAPHQL_QUERY_MAX_COST = env.int("GRAPHQL_QUERY_MAX_COST", default=5000)
 
 # HUEY
 # ------------------------------------------------------------
@@ -28,6 +28,12 @@ CSRF_COOKIE_SECURE = True
 
 RATELIMIT_ENABLE = True
 
+# With GRAPHQL_ASYNC the server runs under uvicorn (ASGI), see deploy/prod/start_web.
+if GRAPHQL_ASYNC:
+    # Under ASGI the sync code of each request runs in a new thread, persistent
+    # connections (per thread) would never be re-used nor closed.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
 # Emailing.
 # ------------------------------------------------------------
 ANYMAIL = {
@@ -55,7 +61,7 @@ if env("SENTRY_DSN", default=None):
             cache_spans=False,
             signals_spans=False,
         ),
-        StrawberryIntegration(),
+        StrawberryIntegration(async_execution=GRAPHQL_ASYNC),
     ]
 
     sentry_sdk.init(
@@ -23,6 +23,7 @@ urlpatterns = [
     # API related views.
     # ------------------------------------------------------------------------
     path("accounts/", include("mp.apps.authx.urls")),
+    path("ciphers/", include("mp.apps.cipher.urls")),
     # Don't append with slash should be requested like:
     #   POST localhost:8000/graphql
     path("graphql", include("mp.graphql.urls")),
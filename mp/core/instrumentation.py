@@ -0,0 +1,96 @@
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class CryptoOps(Counter[str]):
+    """Number of crypto operations per name and their total duration in seconds."""
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002
+        super().__init__(*args, **kwargs)
+        self.durations: Counter[str] = Counter()
+
+    def add(self, name: str, count: int = 1, duration: float = 0) -> None:
+        self[name] += count
+        self.durations[name] += duration
+
+    def merge(self, other: "CryptoOps") -> None:
+        self.update(other)
+        self.durations.update(other.durations)
+
+
+_crypto_ops: ContextVar[CryptoOps | None] = ContextVar("crypto_ops", default=None)
+_current_crypto_op: ContextVar[str | None] = ContextVar(
+    "current_crypto_op",
+    default=None,
+)
+
+
+def record_crypto_op(name: str, count: int = 1) -> None:
+    """Count a crypto operation if it happens inside `track_crypto_ops`."""
+    crypto_ops = _crypto_ops.get()
+    if crypto_ops is not None:
+        crypto_ops.add(name, count)
+
+
+def record_crypto_ops(other: CryptoOps) -> None:
+    """Add operations tracked elsewhere, e.g. in another thread."""
+    crypto_ops = _crypto_ops.get()
+    if crypto_ops is not None:
+        crypto_ops.merge(other)
+
+
+@contextmanager
+def time_crypto_op(name: str) -> Iterator[None]:
+    """Count and time a crypto operation if it happens inside `track_crypto_ops`.
+
+    An operation within another one (e.g. the decryption of a data key while it
+    is unwrapped) is part of it, it is neither counted nor timed on its own.
+    """
+    crypto_ops = _crypto_ops.get()
+    if crypto_ops is None or _current_crypto_op.get() is not None:
+        yield
+        return
+
+    token = _current_crypto_op.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        crypto_ops.add(name, duration=time.perf_counter() - start)
+        _current_crypto_op.reset(token)
+
+
+def timed_crypto_op(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorate a function to count and time its calls, see `time_crypto_op`."""
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if _crypto_ops.get() is None:
+                return func(*args, **kwargs)
+
+            with time_crypto_op(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def track_crypto_ops() -> Iterator[CryptoOps]:
+    """Count crypto operations (e.g. `encrypt`, `decrypt`) within the block."""
+    crypto_ops = CryptoOps()
+    token = _crypto_ops.set(crypto_ops)
+    try:
+        yield crypto_ops
+    finally:
+        _crypto_ops.reset(token)
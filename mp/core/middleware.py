@@ -0,0 +1,66 @@
+import logging
+from collections.abc import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from mp.core.instrumentation import CryptoOps, track_crypto_ops
+
+logger = logging.getLogger(__name__)
+
+
+def get_server_timing(crypto_ops: CryptoOps) -> str:
+    """Format the crypto operations as a `Server-Timing` header value."""
+    return ", ".join(
+        f'crypto-{name};dur={crypto_ops.durations[name] * 1000:.3f};desc="{count}"'
+        for name, count in sorted(crypto_ops.items())
+    )
+
+
+class CryptoOpsMiddleware:
+    """Count and time the crypto operations performed per request.
+
+    The operations are attached to the request as `request.crypto_ops` and logged
+    with structured fields once the response is ready. With
+    `CRYPTO_SERVER_TIMING` they are also sent in the `Server-Timing` header.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with track_crypto_ops() as crypto_ops:
+            request.crypto_ops = crypto_ops  # type: ignore[attr-defined]
+            response = self.get_response(request)
+
+        if not crypto_ops:
+            return response
+
+        if settings.CRYPTO_SERVER_TIMING:
+            response.headers["Server-Timing"] = ", ".join(
+                value
+                for value in (
+                    response.headers.get("Server-Timing"),
+                    get_server_timing(crypto_ops),
+                )
+                if value
+            )
+
+        durations = {
+            name: round(duration * 1000, 3)
+            for name, duration in crypto_ops.durations.items()
+        }
+        logger.info(
+            "Crypto operations for %s %s: %s",
+            request.method,
+            request.path,
+            dict(crypto_ops),
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "crypto_ops": dict(crypto_ops),
+                "crypto_duration_ms": durations,
+                "crypto_total_ms": round(sum(durations.values()), 3),
+            },
+        )
+        return response
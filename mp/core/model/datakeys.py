@@ -0,0 +1,133 @@
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+
+from cryptography.fernet import Fernet, InvalidToken
+from django.apps import apps
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import Model
+from django.dispatch import receiver
+
+from mp.core.instrumentation import record_crypto_op, time_crypto_op
+from mp.core.utils.cache import LRUCache
+
+DATA_KEY_SETTINGS = (
+    "DB_DATA_KEY_MODEL",
+    "DB_DATA_KEY_CACHE_SIZE",
+    "DB_DATA_KEY_CACHE_TTL",
+)
+
+# Data key envelope: "<data key id>$<Fernet token>". Values encrypted with the
+# master key are base64 encoded and never contain the separator.
+DATA_KEY_SEPARATOR = "$"
+
+_data_key_id: ContextVar[int | None] = ContextVar("data_key_id", default=None)
+
+
+def get_data_key_model() -> type[Model]:
+    """Return the model of the data keys, see `DB_DATA_KEY_MODEL`.
+
+    The model has an `owner` and an encrypted `key` field, the key is wrapped
+    (encrypted) with the master key like any other encrypted field.
+    """
+    return apps.get_model(settings.DB_DATA_KEY_MODEL, require_ready=False)
+
+
+@cache
+def _get_data_key_cache() -> LRUCache[Fernet]:
+    return LRUCache(
+        maxsize=settings.DB_DATA_KEY_CACHE_SIZE,
+        ttl=settings.DB_DATA_KEY_CACHE_TTL,
+    )
+
+
+def reset_data_key_cache() -> None:
+    _get_data_key_cache.cache_clear()
+
+
+@receiver(setting_changed)
+def _reset_data_key_cache_on_setting_changed(*, setting: str, **kwargs) -> None:  # noqa: ARG001
+    if setting in DATA_KEY_SETTINGS:
+        reset_data_key_cache()
+
+
+def get_data_key(key_id: int) -> Fernet:
+    """Return the unwrapped data key, it is cached for `DB_DATA_KEY_CACHE_TTL`.
+
+    Loading and decrypting the data key is timed as a single `unwrap`.
+    """
+    data_key_cache = _get_data_key_cache()
+    fernet = data_key_cache.get(key_id)
+    if fernet is not None:
+        return fernet
+
+    model = get_data_key_model()
+    with time_crypto_op("unwrap"):
+        try:
+            data_key = model._base_manager.get(pk=key_id)  # noqa: SLF001
+        except model.DoesNotExist as error:
+            raise InvalidToken from error
+        fernet = Fernet(data_key.key)  # type: ignore[attr-defined]
+    data_key_cache.set(key_id, fernet)
+    return fernet
+
+
+def load_data_keys(values: Iterable[str]) -> None:
+    """Unwrap the data keys of the encrypted values, e.g. before a parallel batch."""
+    key_ids = {
+        int(value.partition(DATA_KEY_SEPARATOR)[0])
+        for value in values
+        if isinstance(value, str) and DATA_KEY_SEPARATOR in value
+    }
+    for key_id in key_ids:
+        get_data_key(key_id)
+
+
+def _get_or_create_data_key_id(owner: Model) -> int:
+    model = get_data_key_model()
+    manager = model._base_manager  # noqa: SLF001
+    key_id = manager.filter(owner=owner).values_list("pk", flat=True).first()
+    if key_id is not None:
+        return key_id
+
+    key = Fernet.generate_key().decode("utf-8")
+    data_key, created = manager.get_or_create(owner=owner, defaults={"key": key})
+    if created:
+        record_crypto_op("wrap")
+        _get_data_key_cache().set(data_key.pk, Fernet(key))
+    return data_key.pk
+
+
+@contextmanager
+def data_key_scope(owner: Model) -> Iterator[None]:
+    """Encrypt the values of data key enabled models with the owner's data key.
+
+    The data key is created on first use. Only writes need the scope, the key id
+    is part of the encrypted value.
+    """
+    token = _data_key_id.set(_get_or_create_data_key_id(owner))
+    try:
+        yield
+    finally:
+        _data_key_id.reset(token)
+
+
+def encrypt_with_data_key(data: bytes) -> str | None:
+    """Encrypt with the data key of the current scope, None outside a scope."""
+    key_id = _data_key_id.get()
+    if key_id is None:
+        return None
+
+    fernet = get_data_key(key_id)
+    with time_crypto_op("encrypt"):
+        token = fernet.encrypt(data)
+    return f"{key_id}{DATA_KEY_SEPARATOR}{token.decode('utf-8')}"
+
+
+def decrypt_with_data_key(data: str) -> bytes:
+    key_id, _, token = data.partition(DATA_KEY_SEPARATOR)
+    fernet = get_data_key(int(key_id))
+    with time_crypto_op("decrypt"):
+        return fernet.decrypt(token.encode("utf-8"))
@@ -0,0 +1,91 @@
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from django.conf import settings
+from django.db.models import Model
+
+from mp.core.instrumentation import CryptoOps, record_crypto_ops, track_crypto_ops
+from mp.core.model.datakeys import load_data_keys
+from mp.core.model.fields import EncryptedValue, set_decrypted_value
+
+
+@cache
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    # One pool per worker count, e.g. when `DB_DECRYPTION_WORKERS` is changed by
+    # the tests or benchmarks.
+    return ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="db-decryption",
+    )
+
+
+def _collect_encrypted_values(
+    instances: Iterable[Model],
+) -> list[tuple[Model, str, EncryptedValue]]:
+    """Return the pending encrypted values of the instances and their related objects.
+
+    Related objects are the ones cached by `select_related()` or by prefetching
+    a (generic) foreign key.
+    """
+    encrypted_values = []
+    seen = set()
+    pending = list(instances)
+    while pending:
+        instance = pending.pop()
+        if id(instance) in seen:
+            continue
+        seen.add(id(instance))
+
+        for attname, value in instance.__dict__.items():
+            if isinstance(value, EncryptedValue):
+                encrypted_values.append((instance, attname, value))
+        pending.extend(
+            related
+            for related in instance._state.fields_cache.values()  # noqa: SLF001
+            if isinstance(related, Model)
+        )
+    return encrypted_values
+
+
+def _decrypt_chunk(chunk: list[EncryptedValue]) -> tuple[list[str], CryptoOps]:
+    # Worker threads don't share the caller's context, count the operations
+    # here and merge them back in the calling thread.
+    with track_crypto_ops() as crypto_ops:
+        return [value.decrypt() for value in chunk], crypto_ops
+
+
+def decrypt_instances(instances: Iterable[Model]) -> int:
+    """Decrypt every lazily loaded encrypted value of the instances at once.
+
+    The values are decrypted serially unless `DB_DECRYPTION_WORKERS` opts in to
+    the thread pool: above `DB_DECRYPTION_PARALLEL_THRESHOLD` values the work is
+    then split across the threads, the cryptography backend releases the GIL
+    while it runs the ciphers. Returns the number of decrypted values.
+    """
+    encrypted_values = _collect_encrypted_values(instances)
+    if not encrypted_values:
+        return 0
+
+    values = [value for _, _, value in encrypted_values]
+    workers = settings.DB_DECRYPTION_WORKERS
+    if len(values) < settings.DB_DECRYPTION_PARALLEL_THRESHOLD or workers <= 1:
+        plaintexts = [value.decrypt() for value in values]
+    else:
+        # Unwrap the data keys here, the worker threads have no database access.
+        load_data_keys(value.value for value in values)
+        chunk_size = -(-len(values) // workers)
+        chunks = [values[i : i + chunk_size] for i in range(0, len(values), chunk_size)]
+        plaintexts = []
+        executor = _get_executor(workers)
+        for chunk_plaintexts, crypto_ops in executor.map(_decrypt_chunk, chunks):
+            plaintexts.extend(chunk_plaintexts)
+            record_crypto_ops(crypto_ops)
+
+    for (instance, attname, value), plaintext in zip(
+        encrypted_values,
+        plaintexts,
+        strict=True,
+    ):
+        set_decrypted_value(instance, attname, value, plaintext)
+    return len(plaintexts)
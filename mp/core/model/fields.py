@@ -1,38 +1,291 @@
 import base64
+import os
+import zlib
+from abc import ABCMeta, abstractmethod
+from contextvars import ContextVar
 
-from cryptography.fernet import Fernet
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import InvalidToken
 from django.conf import settings
-from django.db.models import TextField
+from django.db.models import BinaryField, Field, Model, TextField
+from django.db.models.query_utils import DeferredAttribute
 
+from mp.core.instrumentation import time_crypto_op, timed_crypto_op
+from mp.core.model.datakeys import (
+    DATA_KEY_SEPARATOR,
+    decrypt_with_data_key,
+    encrypt_with_data_key,
+)
+from mp.core.model.keyring import KEY_ID_SIZE, get_key_ring
 
-def _encrypt_db_data(data: str) -> str:
-    f = Fernet(settings.DB_SYMMETRIC_KEY)
-    encrypted_data = f.encrypt(data.encode("utf-8"))
+# Binary envelope: version (1 byte) | key id | nonce | AES-GCM ciphertext and tag.
+ENVELOPE_V1 = b"\x01"
+NONCE_SIZE = 12
+TAG_SIZE = 16
+ENVELOPE_V1_OVERHEAD = len(ENVELOPE_V1) + KEY_ID_SIZE + NONCE_SIZE + TAG_SIZE
+
+# Payload header of the encrypted data: marker | codec. The marker is never part
+# of a UTF-8 string, values without it are plain UTF-8 (e.g. legacy values).
+PAYLOAD_MARKER = b"\xff"
+PAYLOAD_ZLIB = b"\x01"
+PAYLOAD_HEADER_SIZE = len(PAYLOAD_MARKER) + len(PAYLOAD_ZLIB)
+
+# Set while model instances are built by `mp.core.model.query.EncryptedQuerySet`.
+lazy_decryption: ContextVar[bool] = ContextVar("lazy_decryption", default=False)
+
+
+def encode_payload(data: str, *, compress: bool = False) -> bytes:
+    """Encode a value before its encryption, compressing large values if enabled.
+
+    Values of `DB_COMPRESSION_THRESHOLD` bytes or more are compressed with zlib,
+    the compressed payload is only used if it is smaller.
+    """
+    encoded_data = data.encode("utf-8")
+    if not compress or len(encoded_data) < settings.DB_COMPRESSION_THRESHOLD:
+        return encoded_data
+
+    with time_crypto_op("compress"):
+        payload = PAYLOAD_MARKER + PAYLOAD_ZLIB + zlib.compress(encoded_data)
+    return payload if len(payload) < len(encoded_data) else encoded_data
+
+
+def decode_payload(payload: bytes) -> str:
+    if payload[:1] != PAYLOAD_MARKER:
+        return payload.decode("utf-8")
+
+    codec = payload[len(PAYLOAD_MARKER) : PAYLOAD_HEADER_SIZE]
+    if codec != PAYLOAD_ZLIB:
+        err_msg = f"Unknown payload codec {codec!r}."
+        raise ValueError(err_msg)
+
+    with time_crypto_op("decompress"):
+        return zlib.decompress(payload[PAYLOAD_HEADER_SIZE:]).decode("utf-8")
+
+
+@timed_crypto_op("encrypt")
+def _encrypt_db_data(data: str | bytes) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    encrypted_data = get_key_ring().encrypt(data)
     return base64.urlsafe_b64encode(encrypted_data).decode("utf-8")
 
 
 def _decrypt_db_data(data: str) -> str:
-    f = Fernet(settings.DB_SYMMETRIC_KEY)
     decoded_data = base64.urlsafe_b64decode(data.encode("utf-8"))
-    return f.decrypt(decoded_data).decode("utf-8")
+    with time_crypto_op("decrypt"):
+        payload = get_key_ring().decrypt(decoded_data)
+    return decode_payload(payload)
 
 
-class EncryptedTextField(TextField):
-    description = "Encrypts field value on the database."
+@timed_crypto_op("encrypt")
+def _encrypt_db_bytes(data: str | bytes) -> bytes:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    key_ring = get_key_ring()
+    header = ENVELOPE_V1 + key_ring.primary_key_id
+    nonce = os.urandom(NONCE_SIZE)
+    aead = key_ring.get_aead(key_ring.primary_key_id)
+    return header + nonce + aead.encrypt(nonce, data, header)
+
+
+def _decrypt_db_bytes(data: bytes) -> str:
+    if data[:1] != ENVELOPE_V1:
+        # Legacy value, a text column converted to bytes (e.g. text::bytea).
+        return _decrypt_db_data(data.decode("utf-8"))
+
+    with time_crypto_op("decrypt"):
+        header_size = len(ENVELOPE_V1) + KEY_ID_SIZE
+        header = data[:header_size]
+        nonce = data[header_size : header_size + NONCE_SIZE]
+        aead = get_key_ring().get_aead(header[len(ENVELOPE_V1) :])
+        try:
+            decrypted_data = aead.decrypt(
+                nonce,
+                data[header_size + NONCE_SIZE :],
+                header,
+            )
+        except InvalidTag as error:
+            raise InvalidToken from error
+    return decode_payload(decrypted_data)
+
+
+class EncryptedValue:
+    """Encrypted database value that is not decrypted yet."""
+
+    __slots__ = ("field", "value")
+
+    def __init__(self, field: "EncryptedFieldMixin", value) -> None:  # noqa: ANN001
+        self.field = field
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.field}>"
+
+    def decrypt(self) -> str:
+        return self.field.decrypt(self.value)
+
+
+def set_decrypted_value(
+    instance: Model,
+    attname: str,
+    encrypted_value: EncryptedValue,
+    plaintext: str,
+) -> None:
+    """Replace a lazily loaded value of the instance with its plaintext."""
+    instance.__dict__[attname] = plaintext
+    # Also the loaded value of `EncryptedModelMixin` instances.
+    loaded_values = instance.__dict__.get("_loaded_encrypted_values")
+    if loaded_values and loaded_values.get(attname) is encrypted_value:
+        loaded_values[attname] = plaintext
+
+
+class EncryptedAttribute(DeferredAttribute):
+    """Decrypt a lazily loaded value on first access and keep the plaintext.
+
+    Unlike `DeferredAttribute` this is a data descriptor, so it is consulted even
+    when the value is already in the instance `__dict__`.
+    """
+
+    def __get__(self, instance, cls=None):  # noqa: ANN001, ANN204
+        if instance is None:
+            return self
+
+        value = super().__get__(instance, cls)
+        if isinstance(value, EncryptedValue):
+            plaintext = value.decrypt()
+            set_decrypted_value(instance, self.field.attname, value, plaintext)
+            return plaintext
+        return value
+
+    def __set__(self, instance, value) -> None:  # noqa: ANN001
+        instance.__dict__[self.field.attname] = value
+
+
+class EncryptedFieldMixin(Field, metaclass=ABCMeta):
+    """Encrypt the field's string value when saving and decrypt when loading.
+
+    Empty values are stored as is. Model instances loaded through an
+    `EncryptedQuerySet` keep an `EncryptedValue` and decrypt it on first access.
+    With `compress=True` large values are compressed before their encryption.
+    Subclasses implement `encrypt` and `decrypt`.
+    """
+
+    descriptor_class = EncryptedAttribute
+
+    def __init__(self, *args, compress: bool = False, **kwargs) -> None:  # noqa: ANN002
+        self.compress = compress
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compress:
+            kwargs["compress"] = True
+        return name, path, args, kwargs
+
+    @abstractmethod
+    def encrypt(self, value: str): ...
+
+    @abstractmethod
+    def decrypt(self, value) -> str: ...  # noqa: ANN001
 
     def get_db_prep_save(self, value, connection):  # noqa: ANN001
-        value = super().get_db_prep_value(value, connection)
+        if hasattr(value, "as_sql"):
+            # Expressions (e.g. the CASE statement of bulk_update()) encrypt
+            # their values when they are compiled.
+            return value
+
+        value = self.get_prep_value(value)
         if value is None or len(value) == 0:
             return value
 
         # Encrypt the value before saving
-        return _encrypt_db_data(value)
+        return self.encrypt(value)
 
-    def from_db_value(self, value: str | None, *args, **kwargs):  # noqa: ANN002
+    def from_db_value(self, value, *args, **kwargs):  # noqa: ANN001, ANN002
         if value is None or len(value) == 0:
             return value
+        if lazy_decryption.get():
+            return EncryptedValue(self, value)
         # Decrypt the value when retrieving
+        return self.decrypt(value)
+
+
+class EncryptedTextField(EncryptedFieldMixin, TextField):
+    """Encrypted string value stored as text.
+
+    Values are encrypted with the master key (`DB_SYMMETRIC_KEY`). Models with
+    `use_data_key_encryption = True` use the owner's data key instead when they
+    are saved within `mp.core.model.datakeys.data_key_scope`.
+    """
+
+    description = "Encrypts field value on the database."
+
+    def encrypt(self, value: str) -> str:
+        payload = encode_payload(value, compress=self.compress)
+        # Unbound fields have no model.
+        model = getattr(self, "model", None)
+        if getattr(model, "use_data_key_encryption", False):
+            encrypted_value = encrypt_with_data_key(payload)
+            if encrypted_value is not None:
+                return encrypted_value
+        return _encrypt_db_data(payload)
+
+    def decrypt(self, value: str) -> str:
+        if DATA_KEY_SEPARATOR in value:
+            return decode_payload(decrypt_with_data_key(value))
         return _decrypt_db_data(value)
 
     def get_internal_type(self):
         return "TextField"
+
+
+class EncryptedBinaryField(EncryptedFieldMixin, BinaryField):
+    """Encrypted string value stored as bytes.
+
+    The value is stored in a versioned binary envelope encrypted with AES-GCM
+    instead of a base64 encoded Fernet token, which is roughly half the size.
+    Legacy values of an `EncryptedTextField` column altered to this field are
+    still readable and are converted on their next save (or re-encryption).
+    """
+
+    description = "Encrypts field value on the database as bytes."
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002
+        kwargs.setdefault("editable", True)
+        super().__init__(*args, **kwargs)
+
+    def encrypt(self, value: str) -> bytes:
+        return _encrypt_db_bytes(encode_payload(value, compress=self.compress))
+
+    def decrypt(self, value: bytes | memoryview | str) -> str:
+        if isinstance(value, str):
+            # Legacy value on backends without a typed binary column (SQLite).
+            return _decrypt_db_data(value)
+        return _decrypt_db_bytes(bytes(value))
+
+    def get_db_prep_save(self, value, connection):  # noqa: ANN001
+        value = super().get_db_prep_save(value, connection)
+        if isinstance(value, str):
+            # Empty values are not encrypted.
+            value = value.encode("utf-8")
+        if isinstance(value, bytes):
+            return connection.Database.Binary(value)
+        return value
+
+    def from_db_value(self, value, *args, **kwargs):  # noqa: ANN001, ANN002
+        if value is not None and len(value) == 0:
+            return ""
+        return super().from_db_value(value, *args, **kwargs)
+
+    def get_default(self):
+        default = super().get_default()
+        return "" if default == b"" else default
+
+    def to_python(self, value):  # noqa: ANN001
+        return value
+
+    def value_to_string(self, obj):  # noqa: ANN001
+        return self.value_from_object(obj)
+
+    def get_internal_type(self):
+        return "BinaryField"
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+from functools import cache
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+KEY_RING_SETTINGS = ("DB_SYMMETRIC_KEY", "DB_SYMMETRIC_KEY_FALLBACKS")
+
+KEY_ID_SIZE = 4
+AEAD_KEY_INFO = b"mellonpass-db-aes-256-gcm"
+
+
+def _derive_aead(key: str) -> AESGCM:
+    """Derive an AES-256-GCM key from a Fernet key.
+
+    The Fernet key material is not used as is, so each algorithm has its own key.
+    """
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=AEAD_KEY_INFO)
+    return AESGCM(hkdf.derive(base64.urlsafe_b64decode(key)))
+
+
+class KeyRing:
+    """Fernet keys used to encrypt database values.
+
+    The first key is the primary key, it is the only key used for encryption.
+    The remaining keys (fallbacks) are only tried for decryption, this allows
+    old values to be read while they are being re-encrypted to the primary key.
+
+    Each key also has a derived AES-GCM key, identified by a short key id, for
+    the binary encrypted fields.
+    """
+
+    def __init__(self, keys: list[str]) -> None:
+        if not keys:
+            err_msg = "Key ring requires at least one key."
+            raise ImproperlyConfigured(err_msg)
+
+        self._fernets = [Fernet(key) for key in keys]
+        self._multi_fernet = MultiFernet(self._fernets)
+
+        digests = [hashlib.sha256(key.encode("utf-8")).digest() for key in keys]
+        self._primary_fingerprint = digests[0].hex()[:16]
+        self._aeads = {
+            digest[:KEY_ID_SIZE]: _derive_aead(key)
+            for digest, key in zip(digests, keys, strict=True)
+        }
+        self.primary_key_id = digests[0][:KEY_ID_SIZE]
+
+    def __len__(self) -> int:
+        return len(self._fernets)
+
+    @property
+    def primary(self) -> Fernet:
+        return self._fernets[0]
+
+    @property
+    def primary_fingerprint(self) -> str:
+        """Non-secret identifier of the primary key."""
+        return self._primary_fingerprint
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self.primary.encrypt(data)
+
+    def decrypt(self, token: bytes) -> bytes:
+        return self._multi_fernet.decrypt(token)
+
+    def rotate(self, token: bytes) -> bytes:
+        """Re-encrypt the token with the primary key."""
+        return self._multi_fernet.rotate(token)
+
+    def get_aead(self, key_id: bytes) -> AESGCM:
+        try:
+            return self._aeads[key_id]
+        except KeyError as error:
+            raise InvalidToken from error
+
+
+@cache
+def get_key_ring() -> KeyRing:
+    """Return the process wide key ring built from the settings.
+
+    Building a Fernet instance parses and validates the key, so the key ring is
+    built once per process and re-used by every encrypted field.
+    """
+    return KeyRing(
+        [settings.DB_SYMMETRIC_KEY, *settings.DB_SYMMETRIC_KEY_FALLBACKS],
+    )
+
+
+def reset_key_ring() -> None:
+    get_key_ring.cache_clear()
+
+
+@receiver(setting_changed)
+def _reset_key_ring_on_setting_changed(*, setting: str, **kwargs) -> None:  # noqa: ARG001
+    if setting in KEY_RING_SETTINGS:
+        reset_key_ring()
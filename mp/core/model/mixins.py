@@ -0,0 +1,73 @@
+from django.db.models import Model
+
+from mp.core.model.fields import EncryptedFieldMixin, EncryptedValue
+
+
+def get_encrypted_attnames(model: type[Model]) -> list[str]:
+    fields = model._meta.concrete_fields  # noqa: SLF001
+    return [f.attname for f in fields if isinstance(f, EncryptedFieldMixin)]
+
+
+class EncryptedModelMixin:
+    """Only write the encrypted fields that changed when saving a loaded instance.
+
+    The values of the encrypted fields are kept as they were loaded (encrypted
+    or decrypted). A save without `update_fields` skips the encrypted fields
+    whose value is unchanged, so they are neither re-encrypted nor rewritten.
+    """
+
+    _loaded_encrypted_values: dict[str, object] | None = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):  # noqa: ANN001, ANN206
+        instance = super().from_db(db, field_names, values)  # type: ignore[misc]
+        instance._set_loaded_encrypted_values()  # noqa: SLF001
+        return instance
+
+    def _set_loaded_encrypted_values(self) -> None:
+        self._loaded_encrypted_values = {
+            attname: self.__dict__[attname]
+            for attname in get_encrypted_attnames(self.__class__)  # type: ignore[arg-type]
+            if attname in self.__dict__
+        }
+
+    def get_unchanged_encrypted_fields(self) -> set[str]:
+        """Return the attnames of the loaded encrypted fields that didn't change."""
+        if self._loaded_encrypted_values is None:
+            return set()
+
+        unchanged = set()
+        for attname, loaded_value in self._loaded_encrypted_values.items():
+            value = self.__dict__.get(attname)
+            if value is loaded_value:
+                unchanged.add(attname)
+            elif isinstance(loaded_value, EncryptedValue) and isinstance(value, str):
+                plaintext = loaded_value.decrypt()
+                # Keep the plaintext, the next save won't decrypt it again.
+                self._loaded_encrypted_values[attname] = plaintext
+                if value == plaintext:
+                    unchanged.add(attname)
+            elif value == loaded_value:
+                unchanged.add(attname)
+        return unchanged
+
+    def save(self, *args, **kwargs) -> None:  # noqa: ANN002
+        adding = self._state.adding  # type: ignore[attr-defined]
+        if not adding and kwargs.get("update_fields") is None and not args:
+            unchanged = self.get_unchanged_encrypted_fields()
+            if unchanged:
+                deferred = self.get_deferred_fields()  # type: ignore[attr-defined]
+                kwargs["update_fields"] = [
+                    f.name
+                    for f in self._meta.concrete_fields  # type: ignore[attr-defined]
+                    if not f.primary_key
+                    and f.attname not in deferred
+                    and f.attname not in unchanged
+                ]
+
+        super().save(*args, **kwargs)  # type: ignore[misc]
+        self._set_loaded_encrypted_values()
+
+    def refresh_from_db(self, *args, **kwargs) -> None:  # noqa: ANN002
+        super().refresh_from_db(*args, **kwargs)  # type: ignore[misc]
+        self._set_loaded_encrypted_values()
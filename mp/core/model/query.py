@@ -0,0 +1,69 @@
+from collections.abc import Iterator
+
+from django.db.models import Model, QuerySet
+from django.db.models.query import ModelIterable
+
+from mp.core.model.decryption import decrypt_instances
+from mp.core.model.fields import lazy_decryption
+
+
+class LazyDecryptionModelIterable(ModelIterable):
+    """Build model instances without decrypting their encrypted fields.
+
+    The flag is only set while a row is converted into an instance, code that
+    runs between rows (e.g. a `values_list()` inside a loop) is not affected.
+    """
+
+    def __iter__(self) -> Iterator[Model]:
+        iterator = super().__iter__()
+        while True:
+            token = lazy_decryption.set(True)
+            try:
+                obj = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                lazy_decryption.reset(token)
+            yield obj
+
+
+class EncryptedQuerySet(QuerySet):
+    """QuerySet that decrypts encrypted fields on first attribute access.
+
+    Paths that only need a few columns of the rows (e.g. deleting by uuid) don't
+    pay the decryption of the fields they never read. `values()` and
+    `values_list()` results are always decrypted.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002
+        super().__init__(*args, **kwargs)
+        self._iterable_class = LazyDecryptionModelIterable
+        self._batch_decrypt = False
+
+    def _clone(self) -> "EncryptedQuerySet":
+        clone = super()._clone()  # type: ignore[misc]
+        clone._batch_decrypt = self._batch_decrypt  # noqa: SLF001
+        return clone
+
+    def _fetch_all(self) -> None:
+        fetched = self._result_cache is not None  # type: ignore[attr-defined]
+        super()._fetch_all()  # type: ignore[misc]
+        if self._batch_decrypt and not fetched:
+            decrypt_instances(self._result_cache)  # type: ignore[attr-defined]
+
+    def eager(self) -> "EncryptedQuerySet":
+        """Decrypt every encrypted field when the rows are loaded."""
+        clone = self._chain()  # type: ignore[attr-defined]
+        clone._iterable_class = ModelIterable  # noqa: SLF001
+        return clone
+
+    def batch_decrypt(self) -> "EncryptedQuerySet":
+        """Decrypt the encrypted fields of all the fetched rows in one batch.
+
+        Meant for pages of rows that are fully read (e.g. a GraphQL connection),
+        the values are decrypted in parallel for large batches. Related objects
+        loaded with `select_related()` or `prefetch_related()` are included.
+        """
+        clone = self._chain()  # type: ignore[attr-defined]
+        clone._batch_decrypt = True  # noqa: SLF001
+        return clone
@@ -0,0 +1,29 @@
+from mp.core.utils.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_ttl(mocker):
+    mock_monotonic = mocker.patch("mp.core.utils.cache.time.monotonic")
+    mock_monotonic.return_value = 100
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+
+    mock_monotonic.return_value = 109
+    assert cache.get("a") == 1
+
+    mock_monotonic.return_value = 110
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,118 @@
+import base64
+import os
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from django.db import connection
+from django.db.models import TextField
+from django.test import override_settings
+
+from mp.core.instrumentation import track_crypto_ops
+from mp.core.model.fields import (
+    ENVELOPE_V1,
+    ENVELOPE_V1_OVERHEAD,
+    EncryptedBinaryField,
+    EncryptedFieldMixin,
+    EncryptedTextField,
+    _encrypt_db_data,
+)
+
+OLD_KEY = Fernet.generate_key().decode("utf-8")
+
+
+def _load(field, value):
+    return field.from_db_value(memoryview(value), None, connection)
+
+
+def test_encrypted_field_requires_encrypt_and_decrypt():
+    class IncompleteEncryptedField(EncryptedFieldMixin, TextField):
+        def encrypt(self, value):
+            return value
+
+    with pytest.raises(TypeError, match="decrypt"):
+        IncompleteEncryptedField()
+
+
+def test_encrypted_binary_field_round_trip():
+    field = EncryptedBinaryField()
+    stored = field.encrypt("secret")
+
+    assert stored[:1] == ENVELOPE_V1
+    assert len(stored) == ENVELOPE_V1_OVERHEAD + len(b"secret")
+    assert _load(field, stored) == "secret"
+
+
+def test_encrypted_binary_field_empty_values():
+    field = EncryptedBinaryField(null=True)
+
+    assert field.get_db_prep_save(None, connection) is None
+    assert field.from_db_value(None, None, connection) is None
+    assert _load(field, b"") == ""
+    assert EncryptedBinaryField().get_default() == ""
+
+
+def test_encrypted_binary_field_reads_legacy_text_values():
+    field = EncryptedBinaryField()
+    legacy_value = _encrypt_db_data("secret")
+
+    # e.g. after altering a text column with `USING column::bytea`.
+    assert _load(field, legacy_value.encode("utf-8")) == "secret"
+
+
+def test_encrypted_binary_field_decrypts_with_fallback_keys():
+    field = EncryptedBinaryField()
+
+    with override_settings(DB_SYMMETRIC_KEY=OLD_KEY):
+        stored = field.encrypt("secret")
+
+    with pytest.raises(InvalidToken):
+        _load(field, stored)
+
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        assert _load(field, stored) == "secret"
+
+
+def test_encrypted_binary_field_rejects_tampered_values():
+    field = EncryptedBinaryField()
+    stored = bytearray(field.encrypt("secret"))
+    stored[-1] ^= 1
+
+    with pytest.raises(InvalidToken):
+        _load(field, bytes(stored))
+
+
+@override_settings(DB_COMPRESSION_THRESHOLD=64)
+@pytest.mark.parametrize("field_class", [EncryptedTextField, EncryptedBinaryField])
+def test_encrypted_field_compression(field_class):
+    field = field_class(compress=True)
+    large_value = "note " * 100
+
+    with track_crypto_ops() as crypto_ops:
+        assert field.decrypt(field.encrypt(large_value)) == large_value
+        assert crypto_ops["compress"] == 1
+        assert crypto_ops["decompress"] == 1
+
+        # Values under the threshold are not compressed.
+        assert field.decrypt(field.encrypt("note")) == "note"
+        assert crypto_ops["compress"] == 1
+
+    assert len(field.encrypt(large_value)) < len(field_class().encrypt(large_value))
+
+
+@override_settings(DB_COMPRESSION_THRESHOLD=64)
+def test_encrypted_field_skips_incompressible_values():
+    field = EncryptedTextField(compress=True)
+    value = base64.b64encode(os.urandom(48)).decode("utf-8")
+
+    with track_crypto_ops() as crypto_ops:
+        assert field.decrypt(field.encrypt(value)) == value
+        assert crypto_ops["compress"] == 1
+        assert crypto_ops["decompress"] == 0
+
+
+def test_encrypted_field_deconstruct_compress():
+    _, _, _, kwargs = EncryptedTextField(compress=True).deconstruct()
+    assert kwargs["compress"] is True
+
+    _, _, _, kwargs = EncryptedTextField().deconstruct()
+    assert "compress" not in kwargs
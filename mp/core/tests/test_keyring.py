@@ -0,0 +1,53 @@
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from django.conf import settings
+from django.test import override_settings
+
+from mp.core.instrumentation import track_crypto_ops
+from mp.core.model.fields import _decrypt_db_data, _encrypt_db_data
+from mp.core.model.keyring import get_key_ring
+
+OLD_KEY = Fernet.generate_key().decode("utf-8")
+
+
+def test_key_ring_is_cached_per_process():
+    assert get_key_ring() is get_key_ring()
+
+
+def test_key_ring_reloads_on_settings_change():
+    key_ring = get_key_ring()
+
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        assert get_key_ring() is not key_ring
+        assert len(get_key_ring()) == 2
+
+    assert len(get_key_ring()) == 1
+
+
+def test_key_ring_decrypts_with_fallback_keys():
+    with override_settings(DB_SYMMETRIC_KEY=OLD_KEY, DB_SYMMETRIC_KEY_FALLBACKS=[]):
+        encrypted = _encrypt_db_data("secret")
+
+    with pytest.raises(InvalidToken):
+        _decrypt_db_data(encrypted)
+
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        assert _decrypt_db_data(encrypted) == "secret"
+
+
+def test_key_ring_encrypts_with_primary_key():
+    with override_settings(DB_SYMMETRIC_KEY_FALLBACKS=[OLD_KEY]):
+        encrypted = _encrypt_db_data("secret")
+
+    # The primary key alone must be able to decrypt new values.
+    assert settings.DB_SYMMETRIC_KEY_FALLBACKS == []
+    assert _decrypt_db_data(encrypted) == "secret"
+
+
+def test_track_crypto_ops():
+    with track_crypto_ops() as crypto_ops:
+        encrypted = _encrypt_db_data("secret")
+        _decrypt_db_data(encrypted)
+        _decrypt_db_data(encrypted)
+
+    assert crypto_ops == {"encrypt": 1, "decrypt": 2}
@@ -0,0 +1,61 @@
+import logging
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from mp.core.instrumentation import timed_crypto_op
+from mp.core.middleware import CryptoOpsMiddleware
+from mp.core.model.fields import _encrypt_db_data
+
+
+@timed_crypto_op("sign")
+def _sign():
+    return "signature"
+
+
+def _get_response(request):
+    _encrypt_db_data("secret")
+    _encrypt_db_data("secret")
+    _sign()
+    return HttpResponse()
+
+
+def test_crypto_ops_middleware_server_timing(settings):
+    settings.CRYPTO_SERVER_TIMING = True
+    request = RequestFactory().post("/graphql")
+
+    response = CryptoOpsMiddleware(_get_response)(request)
+
+    assert request.crypto_ops == {"encrypt": 2, "sign": 1}
+    metrics = response.headers["Server-Timing"].split(", ")
+    assert [metric.split(";")[0] for metric in metrics] == [
+        "crypto-encrypt",
+        "crypto-sign",
+    ]
+    assert metrics[0].endswith(';desc="2"')
+
+
+def test_crypto_ops_middleware_logs(settings, caplog):
+    settings.CRYPTO_SERVER_TIMING = False
+    request = RequestFactory().post("/graphql")
+
+    with caplog.at_level(logging.INFO, logger="mp.core.middleware"):
+        response = CryptoOpsMiddleware(_get_response)(request)
+
+    assert "Server-Timing" not in response.headers
+    (record,) = caplog.records
+    assert record.path == "/graphql"
+    assert record.crypto_ops == {"encrypt": 2, "sign": 1}
+    assert set(record.crypto_duration_ms) == {"encrypt", "sign"}
+    assert record.crypto_total_ms >= 0
+
+
+def test_crypto_ops_middleware_without_crypto_ops(settings, caplog):
+    settings.CRYPTO_SERVER_TIMING = True
+    request = RequestFactory().get("/")
+
+    with caplog.at_level(logging.INFO, logger="mp.core.middleware"):
+        response = CryptoOpsMiddleware(lambda _: HttpResponse())(request)
+
+    assert "Server-Timing" not in response.headers
+    assert not caplog.records
@@ -6,9 +6,12 @@ from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec
 from django.conf import settings
 
+from mp.core.instrumentation import timed_crypto_op
+
 logger = logging.getLogger(__name__)
 
 
+@timed_crypto_op("es256_sign")
 def es256_jwt(payload: dict) -> str:
     return jwt.encode(
         payload,
@@ -17,6 +20,7 @@ def es256_jwt(payload: dict) -> str:
     )
 
 
+@timed_crypto_op("es256_verify")
 def verify_jwt(token: str, *, verify: bool = True) -> tuple[bool, str | dict]:
     try:
         payload = jwt.decode(
@@ -0,0 +1,81 @@
+import hashlib
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from mp.core.utils.cache import LRUCache
+
+PERSISTED_QUERY_SETTINGS = (
+    "GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE",
+    "GRAPHQL_PERSISTED_QUERIES_TIMEOUT",
+)
+
+# Automatic persisted queries (APQ) protocol, the client sends the hash as
+# `extensions.persistedQuery.sha256Hash` and the query only when it is unknown.
+PERSISTED_QUERY_VERSION = 1
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+
+_CACHE_KEY_PREFIX = "graphql:persisted-query:"
+
+
+def get_query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class PersistedQueryStore:
+    """Query text of the persisted queries, by hash.
+
+    The queries are kept in a bounded in-process LRU backed by the Django cache,
+    which is shared by the workers. Parsing and validation are left to the
+    document caches of the schema.
+    """
+
+    def __init__(self, maxsize: int, timeout: int | None) -> None:
+        self.timeout = timeout
+        self._queries: LRUCache[str] = LRUCache(maxsize=maxsize)
+
+    def get(self, sha256_hash: str) -> str | None:
+        query = self._queries.get(sha256_hash)
+        if query is not None:
+            return query
+
+        query = django_cache.get(_CACHE_KEY_PREFIX + sha256_hash)
+        if query is None:
+            return None
+
+        self._queries.set(sha256_hash, query)
+        return query
+
+    def add(self, sha256_hash: str, query: str) -> None:
+        """Persist the query, the hash must be the SHA-256 of the query."""
+        if get_query_hash(query) != sha256_hash:
+            err_msg = "Provided sha256Hash does not match query."
+            raise ValueError(err_msg)
+
+        django_cache.set(_CACHE_KEY_PREFIX + sha256_hash, query, self.timeout)
+        self._queries.set(sha256_hash, query)
+
+
+@cache
+def get_persisted_query_store() -> PersistedQueryStore:
+    return PersistedQueryStore(
+        maxsize=settings.GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE,
+        timeout=settings.GRAPHQL_PERSISTED_QUERIES_TIMEOUT,
+    )
+
+
+def reset_persisted_query_store() -> None:
+    get_persisted_query_store.cache_clear()
+
+
+@receiver(setting_changed)
+def _reset_persisted_query_store_on_setting_changed(
+    *,
+    setting: str,
+    **kwargs,  # noqa: ARG001
+) -> None:
+    if setting in PERSISTED_QUERY_SETTINGS:
+        reset_persisted_query_store()
@@ -0,0 +1,225 @@
+from collections.abc import Iterator, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLInterfaceType,
+    GraphQLNamedType,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    IntValueNode,
+    SelectionSetNode,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    is_leaf_type,
+    is_list_type,
+)
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import SchemaExtension
+
+# Cost of a field by `<type>.<field>`, other fields cost 1 except the scalar and
+# enum fields, which cost nothing.
+FIELD_WEIGHTS: Mapping[str, int] = {
+    # Loads the data of its type and decrypts it.
+    "Cipher.data": 10,
+}
+
+# Arguments bounding the size of a connection page.
+PAGE_SIZE_ARGUMENTS = ("first", "last")
+
+
+@dataclass
+class QueryCost:
+    requested: int
+    maximum: int
+
+
+_query_cost: ContextVar[QueryCost | None] = ContextVar("query_cost", default=None)
+
+
+class QueryCostCalculator:
+    """Estimate the cost of an operation before executing it.
+
+    Each field costs its weight times the number of items it returns: the
+    `first`/`last` argument of a connection (`relay_max_results` when omitted)
+    for the lists of the connection and `relay_max_results` for other lists.
+    """
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        fragments: Mapping[str, FragmentDefinitionNode],
+        variables: Mapping[str, Any],
+        max_page_size: int,
+    ) -> None:
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+        self.max_page_size = max_page_size
+
+    def get_cost(
+        self,
+        parent_type: GraphQLNamedType,
+        selection_set: SelectionSetNode | None,
+        list_size: int,
+    ) -> int:
+        if selection_set is None:
+            return 0
+
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.get_field_cost(parent_type, selection, list_size)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = self.schema.get_type(
+                        selection.type_condition.name.value,
+                    )
+                cost += self.get_cost(fragment_type, selection.selection_set, list_size)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments[selection.name.value]
+                cost += self.get_cost(
+                    self.schema.get_type(fragment.type_condition.name.value),
+                    fragment.selection_set,
+                    list_size,
+                )
+        return cost
+
+    def get_field_cost(
+        self,
+        parent_type: GraphQLNamedType,
+        field: FieldNode,
+        list_size: int,
+    ) -> int:
+        if not isinstance(parent_type, GraphQLObjectType | GraphQLInterfaceType):
+            return 0
+
+        field_definition = parent_type.fields.get(field.name.value)
+        if field_definition is None:
+            # E.g. `__typename`.
+            return 0
+
+        field_type = get_named_type(field_definition.type)
+        weight = FIELD_WEIGHTS.get(
+            f"{parent_type.name}.{field.name.value}",
+            0 if is_leaf_type(field_type) else 1,
+        )
+        page_size = self.get_page_size(field)
+        children_cost = self.get_cost(
+            field_type,
+            field.selection_set,
+            self.max_page_size if page_size is None else page_size,
+        )
+
+        count = (
+            list_size if is_list_type(get_nullable_type(field_definition.type)) else 1
+        )
+        return count * (weight + children_cost)
+
+    def get_page_size(self, field: FieldNode) -> int | None:
+        """Return the page size of a connection field.
+
+        Raises `GraphQLError` if it is higher than the maximum page size.
+        """
+        page_size = None
+        for argument in field.arguments or ():
+            if argument.name.value not in PAGE_SIZE_ARGUMENTS:
+                continue
+
+            value: Any = None
+            if isinstance(argument.value, IntValueNode):
+                value = int(argument.value.value)
+            elif isinstance(argument.value, VariableNode):
+                value = self.variables.get(argument.value.name.value)
+            if not isinstance(value, int):
+                # Rejected at execution.
+                continue
+
+            if value > self.max_page_size:
+                err_msg = (
+                    f"Argument '{argument.name.value}' cannot be higher than "
+                    f"{self.max_page_size}."
+                )
+                raise GraphQLError(err_msg, argument)
+            page_size = max(page_size or 0, value)
+        return page_size
+
+
+class QueryCostLimiter(SchemaExtension):
+    """Reject the operations costing more than `GRAPHQL_QUERY_MAX_COST`.
+
+    The cost is computed before the execution, with the variables of the
+    operation, and reported in the `cost` extension of the response.
+    """
+
+    def on_operation(self) -> Iterator[None]:
+        _query_cost.set(None)
+        yield
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        document = execution_context.graphql_document
+        operation = (
+            get_operation_ast(document, execution_context.operation_name)
+            if document is not None
+            else None
+        )
+        if operation is None:
+            yield
+            return
+
+        graphql_schema = execution_context.schema._schema  # noqa: SLF001
+        max_page_size = execution_context.schema.config.relay_max_results
+        calculator = QueryCostCalculator(
+            schema=graphql_schema,
+            fragments={
+                definition.name.value: definition
+                for definition in document.definitions
+                if isinstance(definition, FragmentDefinitionNode)
+            },
+            variables=execution_context.variables or {},
+            max_page_size=max_page_size,
+        )
+        try:
+            cost = calculator.get_cost(
+                graphql_schema.get_root_type(operation.operation),
+                operation.selection_set,
+                max_page_size,
+            )
+        except GraphQLError as error:
+            # The execution is skipped when the result is already set.
+            execution_context.result = ExecutionResult(data=None, errors=[error])
+            yield
+            return
+
+        query_cost = QueryCost(requested=cost, maximum=settings.GRAPHQL_QUERY_MAX_COST)
+        _query_cost.set(query_cost)
+        if query_cost.requested > query_cost.maximum:
+            error = GraphQLError(
+                f"Query cost {query_cost.requested} exceeds the maximum cost of "
+                f"{query_cost.maximum}.",
+                extensions={"code": "QUERY_TOO_COSTLY"},
+            )
+            execution_context.result = ExecutionResult(data=None, errors=[error])
+        yield
+
+    def get_results(self) -> dict[str, Any]:
+        query_cost = _query_cost.get()
+        if query_cost is None:
+            return {}
+        return {
+            "cost": {
+                "requested": query_cost.requested,
+                "maximum": query_cost.maximum,
+            },
+        }
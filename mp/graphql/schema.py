@@ -3,17 +3,27 @@ from typing import Any
 import strawberry
 from django.conf import settings
 from graphql.validation import NoSchemaIntrospectionCustomRule
-from strawberry.extensions import AddValidationRules, QueryDepthLimiter
+from strawberry.extensions import (
+    AddValidationRules,
+    ParserCache,
+    QueryDepthLimiter,
+    ValidationCache,
+)
 from strawberry.tools import merge_types
 
 from mp.apps.cipher.graphql import schema as cipher_schema
+from mp.graphql.query_cost import QueryCostLimiter
 
 
 def _get_extensions() -> list[Any]:
-    ext = []
+    ext: list[Any] = [
+        ParserCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+        ValidationCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+        QueryCostLimiter,
+    ]
 
     if not settings.DEBUG:
-        ext = [
+        ext += [
             AddValidationRules([NoSchemaIntrospectionCustomRule]),
             QueryDepthLimiter(max_depth=5),
         ]
@@ -21,6 +31,17 @@ def _get_extensions() -> list[Any]:
     return ext
 
 
+def get_document_cache_info(schema: strawberry.Schema) -> dict[str, Any]:
+    """Return the `cache_info()` of the parser and validation caches of a schema."""
+    cache_info = {}
+    for extension in schema.extensions:
+        if isinstance(extension, ParserCache):
+            cache_info["parser"] = extension.cached_parse_document.cache_info()
+        elif isinstance(extension, ValidationCache):
+            cache_info["validation"] = extension.cached_validate_document.cache_info()
+    return cache_info
+
+
 Mutation = merge_types(
     "Mutation",
     (cipher_schema.Mutation,),
@@ -33,3 +54,10 @@ schema = strawberry.Schema(
     mutation=Mutation,
     extensions=_get_extensions(),
 )
+
+# Same API with async resolvers, see `mp.graphql.views.MPAsyncGraphQLView`.
+async_schema = strawberry.Schema(
+    query=merge_types("Query", (cipher_schema.AsyncQuery,)),
+    mutation=merge_types("Mutation", (cipher_schema.AsyncMutation,)),
+    extensions=_get_extensions(),
+)
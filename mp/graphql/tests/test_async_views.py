@@ -0,0 +1,126 @@
+import pytest
+from strawberry import relay
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher.models import Cipher, CipherType
+from mp.apps.cipher.tests.factories import CipherFactory
+from mp.core.strawberry.test import TestClient
+from mp.graphql.persisted_queries import get_query_hash, reset_persisted_query_store
+from mp.graphql.schema import async_schema, schema
+
+pytestmark = [pytest.mark.django_db, pytest.mark.urls("mp.graphql.tests.urls")]
+
+
+def test_async_schema_matches_schema():
+    assert str(async_schema) == str(schema)
+
+
+def test_async_vault_revision():
+    user = UserFactory(vault_revision=4)
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query("query { vaultRevision }")
+
+    assert response.data["vaultRevision"] == 4
+
+
+def test_async_not_authenticated():
+    client = TestClient("/graphql")
+    response = client.query("query { vaultRevision }", assert_no_errors=False)
+
+    assert response.errors[0]["extensions"]["code"] == "UNAUTHORIZED"
+
+
+def test_async_ciphers():
+    user = UserFactory()
+    ciphers = CipherFactory.create_batch(3, owner=user, type=CipherType.LOGIN)
+    query = """
+        query Ciphers($first: Int!) {
+            ciphers(first: $first) {
+                edges { node { id data } }
+                pageInfo { hasNextPage }
+            }
+        }
+    """
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables={"first": 2})
+
+    edges = response.data["ciphers"]["edges"]
+    assert [edge["node"]["id"] for edge in edges] == [
+        str(relay.GlobalID("Cipher", str(cipher.uuid))) for cipher in ciphers[:2]
+    ]
+    assert edges[0]["node"]["data"] == ciphers[0].data.to_json()
+    assert response.data["ciphers"]["pageInfo"]["hasNextPage"] is True
+
+
+def test_async_cipher():
+    user = UserFactory()
+    cipher = CipherFactory(owner=user, type=CipherType.LOGIN)
+    query = """
+        query Cipher($id: GlobalID!) {
+            cipher(id: $id) { key name }
+        }
+    """
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(
+            query,
+            variables={"id": str(relay.GlobalID("Cipher", str(cipher.uuid)))},
+        )
+
+    assert response.data["cipher"] == {"key": cipher.key, "name": cipher.data.name}
+
+
+def test_async_create_cipher():
+    user = UserFactory()
+    query = """
+        mutation CreateCipher($input: CreateCipherInput!) {
+            cipher {
+                create(input: $input) {
+                    ... on Cipher { name data }
+                }
+            }
+        }
+    """
+    variables = {
+        "input": {
+            "type": CipherType.LOGIN,
+            "name": "encname",
+            "key": "enckey",
+            "isFavorite": "encfavorite",
+            "status": "encstatus",
+            "notes": "encnotes",
+            "data": {
+                "username": "encusername",
+                "password": "encpassword",
+                "authenticatorKey": "enckey",
+            },
+        },
+    }
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query, variables=variables)
+
+    assert response.data["cipher"]["create"]["name"] == "encname"
+    assert Cipher.objects.filter(owner=user).count() == 1
+
+
+def test_async_persisted_query():
+    reset_persisted_query_store()
+    user = UserFactory(vault_revision=1)
+    query = "query { vaultRevision }"
+    extensions = {
+        "persistedQuery": {"version": 1, "sha256Hash": get_query_hash(query)},
+    }
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        client.request({"query": query, "extensions": extensions})
+        response = client.request({"extensions": extensions}).json()
+
+    assert response["data"]["vaultRevision"] == 1
@@ -0,0 +1,112 @@
+import pytest
+from django.core.cache import cache
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.core.strawberry.test import TestClient
+from mp.graphql.persisted_queries import (
+    PERSISTED_QUERY_NOT_FOUND,
+    get_query_hash,
+    reset_persisted_query_store,
+)
+
+pytestmark = pytest.mark.django_db
+
+QUERY = "query { vaultRevision }"
+
+
+@pytest.fixture(autouse=True)
+def _reset_persisted_queries():
+    reset_persisted_query_store()
+    cache.clear()
+
+
+def test_batch():
+    user = UserFactory(vault_revision=3)
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.request(
+            [
+                {"query": QUERY},
+                {"query": "query Sync { cipherSyncToken }"},
+                {"query": "query { unknownField }"},
+            ],
+        )
+
+    assert response.status_code == 200
+    revision, sync_token, invalid = response.json()
+    assert revision["data"] == {"vaultRevision": 3}
+    assert sync_token["data"]["cipherSyncToken"]
+    assert "data" not in invalid
+    assert invalid["errors"]
+
+
+def test_batch_operation_errors_do_not_fail_the_batch():
+    user = UserFactory(vault_revision=3)
+    persisted_query = {
+        "persistedQuery": {"version": 1, "sha256Hash": get_query_hash(QUERY)},
+    }
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.request(
+            [
+                {"extensions": persisted_query},
+                {"variables": {}},
+                {"query": QUERY, "extensions": persisted_query},
+                {"extensions": persisted_query},
+            ],
+        )
+
+    not_found, missing_query, registered, persisted = response.json()
+    assert not_found["errors"][0]["message"] == PERSISTED_QUERY_NOT_FOUND
+    assert missing_query["errors"][0]["message"] == (
+        "No GraphQL query found in the request"
+    )
+    assert registered["data"] == {"vaultRevision": 3}
+    assert persisted["data"] == {"vaultRevision": 3}
+
+
+def test_batch_shares_the_request(django_assert_num_queries):
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        # The session and user are loaded once, then a query per operation.
+        with django_assert_num_queries(2 + 5):
+            client.request([{"query": QUERY}] * 5)
+
+
+@pytest.mark.parametrize("size", [0, 11])
+def test_batch_size(settings, size):
+    settings.GRAPHQL_BATCH_MAX_SIZE = 10
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.request([{"query": QUERY}] * size)
+
+    assert response.status_code == 400
+
+
+def test_batch_operations_must_be_objects():
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.request([{"query": QUERY}, QUERY])
+
+    assert response.status_code == 400
+
+
+@pytest.mark.urls("mp.graphql.tests.urls")
+def test_async_batch():
+    user = UserFactory(vault_revision=3)
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.request([{"query": QUERY}, {"query": QUERY}])
+
+    assert [result["data"] for result in response.json()] == [
+        {"vaultRevision": 3},
+    ] * 2
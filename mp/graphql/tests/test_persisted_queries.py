@@ -0,0 +1,127 @@
+import pytest
+from django.core.cache import cache
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.core.strawberry.test import TestClient
+from mp.graphql.persisted_queries import (
+    PERSISTED_QUERY_NOT_FOUND,
+    get_persisted_query_store,
+    get_query_hash,
+    reset_persisted_query_store,
+)
+
+pytestmark = pytest.mark.django_db
+
+QUERY = "query { vaultRevision }"
+
+
+@pytest.fixture(autouse=True)
+def _reset_persisted_queries():
+    reset_persisted_query_store()
+    cache.clear()
+
+
+def _post(client, body):
+    return client.request(body).json()
+
+
+def _persisted_query(sha256_hash=None):
+    return {
+        "persistedQuery": {
+            "version": 1,
+            "sha256Hash": sha256_hash or get_query_hash(QUERY),
+        },
+    }
+
+
+def test_persisted_query_not_found():
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = _post(client, {"extensions": _persisted_query()})
+
+    (error,) = response["errors"]
+    assert error["message"] == PERSISTED_QUERY_NOT_FOUND
+    assert error["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+
+def test_persisted_query_registration():
+    user = UserFactory(vault_revision=2)
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = _post(client, {"query": QUERY, "extensions": _persisted_query()})
+        assert response["data"]["vaultRevision"] == 2
+
+        response = _post(client, {"extensions": _persisted_query()})
+        assert response["data"]["vaultRevision"] == 2
+
+    assert get_persisted_query_store().get(get_query_hash(QUERY)) == QUERY
+
+
+def test_persisted_query_is_shared_through_the_django_cache():
+    user = UserFactory(vault_revision=2)
+    get_persisted_query_store().add(get_query_hash(QUERY), QUERY)
+    # E.g. another worker.
+    reset_persisted_query_store()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = _post(client, {"extensions": _persisted_query()})
+
+    assert response["data"]["vaultRevision"] == 2
+
+
+def test_persisted_query_hash_mismatch():
+    client = TestClient("/graphql")
+    response = client.request(
+        {"query": QUERY, "extensions": _persisted_query(get_query_hash("{ a }"))},
+    )
+
+    assert response.status_code == 400
+    assert get_persisted_query_store().get(get_query_hash("{ a }")) is None
+
+
+@pytest.mark.parametrize(
+    "extensions",
+    ["invalid", {"persistedQuery": 1}, {"persistedQuery": "invalid"}],
+)
+def test_persisted_query_invalid_extensions(extensions):
+    client = TestClient("/graphql")
+    response = client.request({"query": QUERY, "extensions": extensions})
+
+    assert response.status_code == 400
+
+
+def test_persisted_queries_only(settings):
+    settings.GRAPHQL_PERSISTED_QUERIES_ONLY = True
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.request({"query": QUERY})
+        assert response.status_code == 400
+
+        # Unknown queries are not registered.
+        response = _post(client, {"query": QUERY, "extensions": _persisted_query()})
+        assert response["errors"][0]["message"] == PERSISTED_QUERY_NOT_FOUND
+        assert get_persisted_query_store().get(get_query_hash(QUERY)) is None
+
+        get_persisted_query_store().add(get_query_hash(QUERY), QUERY)
+        response = _post(client, {"extensions": _persisted_query()})
+        assert response["data"]["vaultRevision"] == 0
+
+        response = _post(client, {"query": QUERY, "extensions": _persisted_query()})
+        assert response["data"]["vaultRevision"] == 0
+
+
+def test_persisted_query_store_lru(settings):
+    settings.GRAPHQL_PERSISTED_QUERIES_CACHE_SIZE = 1
+    store = get_persisted_query_store()
+    store.add(get_query_hash(QUERY), QUERY)
+    store.add(get_query_hash("{ a }"), "{ a }")
+
+    assert len(store._queries) == 1  # noqa: SLF001
+    # Still in the Django cache.
+    assert store.get(get_query_hash(QUERY)) == QUERY
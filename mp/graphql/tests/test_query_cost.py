@@ -0,0 +1,110 @@
+import pytest
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.apps.cipher.graphql import queries
+from mp.apps.cipher.models import CipherType
+from mp.apps.cipher.tests.factories import CipherFactory
+from mp.core.strawberry.test import TestClient
+
+pytestmark = pytest.mark.django_db
+
+CIPHERS_QUERY = """
+    query Ciphers($first: Int) {
+        ciphers(first: $first) {
+            edges { node { id name data } }
+            pageInfo { hasNextPage }
+        }
+    }
+"""
+
+
+def test_query_cost():
+    user = UserFactory()
+    CipherFactory.create_batch(2, owner=user, type=CipherType.LOGIN)
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(CIPHERS_QUERY, variables={"first": 10})
+
+    assert len(response.data["ciphers"]["edges"]) == 2  # noqa: PLR2004
+    # ciphers + 10 * (edge + node + data) + pageInfo
+    assert response.extensions["cost"] == {"requested": 122, "maximum": 5000}
+
+
+def test_query_cost_defaults_to_the_max_page_size():
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(CIPHERS_QUERY)
+
+    assert response.extensions["cost"]["requested"] == 1 + 100 * 12 + 1
+
+
+def test_query_cost_of_fragments():
+    user = UserFactory()
+    query = """
+        query {
+            ciphers(first: 5) { edges { ...CipherEdge } }
+            ciphersChangedSince(syncToken: "invalid") {
+                ... on CipherSyncFailed { message }
+            }
+        }
+
+        fragment CipherEdge on CipherEdge { node { data } }
+    """
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(query)
+
+    # ciphers + 5 * (edge + node + data) + ciphersChangedSince
+    assert response.extensions["cost"]["requested"] == 1 + 5 * 12 + 1
+
+
+def test_query_over_budget(settings, mocker):
+    settings.GRAPHQL_QUERY_MAX_COST = 100
+    get_all_ciphers_by_owner = mocker.spy(queries, "get_all_ciphers_by_owner")
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(
+            CIPHERS_QUERY,
+            variables={"first": 10},
+            assert_no_errors=False,
+        )
+
+    (error,) = response.errors
+    assert error["message"] == "Query cost 122 exceeds the maximum cost of 100."
+    assert error["extensions"]["code"] == "QUERY_TOO_COSTLY"
+    assert response.extensions["cost"] == {"requested": 122, "maximum": 100}
+    get_all_ciphers_by_owner.assert_not_called()
+
+
+@pytest.mark.parametrize("argument", ["first", "last"])
+def test_query_page_size_is_capped(mocker, argument):
+    get_all_ciphers_by_owner = mocker.spy(queries, "get_all_ciphers_by_owner")
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(
+            f"query {{ ciphers({argument}: 100000) {{ edges {{ node {{ id }} }} }} }}",
+            assert_no_errors=False,
+        )
+
+    (error,) = response.errors
+    assert error["message"] == f"Argument '{argument}' cannot be higher than 100."
+    get_all_ciphers_by_owner.assert_not_called()
+
+
+@pytest.mark.urls("mp.graphql.tests.urls")
+def test_async_query_cost():
+    user = UserFactory()
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        response = client.query(CIPHERS_QUERY, variables={"first": 10})
+
+    assert response.extensions["cost"] == {"requested": 122, "maximum": 5000}
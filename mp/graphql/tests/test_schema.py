@@ -0,0 +1,29 @@
+import pytest
+
+from mp.apps.authx.tests.factories import UserFactory
+from mp.core.strawberry.test import TestClient
+from mp.graphql.schema import get_document_cache_info, schema
+
+pytestmark = pytest.mark.django_db
+
+# Unique to this test, so it is not already in the caches.
+CIPHERS_QUERY = """
+    query DocumentCache {
+        ciphers(first: 1) { edges { node { id } } }
+    }
+"""
+
+
+def test_document_cache_info():
+    user = UserFactory()
+    before = get_document_cache_info(schema)
+
+    client = TestClient("/graphql")
+    with client.login(user):
+        client.query(CIPHERS_QUERY)
+        client.query(CIPHERS_QUERY)
+
+    after = get_document_cache_info(schema)
+    for name in ("parser", "validation"):
+        assert after[name].misses == before[name].misses + 1
+        assert after[name].hits == before[name].hits + 1
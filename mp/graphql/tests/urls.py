@@ -0,0 +1,7 @@
+from django.urls import path
+
+from mp.graphql.views import mp_async_graphql_view
+
+urlpatterns = [
+    path("graphql", mp_async_graphql_view),
+]
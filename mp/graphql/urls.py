@@ -1,8 +1,16 @@
+from django.conf import settings
 from django.urls import path
 from django.views.decorators.csrf import csrf_protect
 
-from mp.graphql.views import mp_graphql_view
+from mp.graphql.views import mp_async_graphql_view, mp_graphql_view
 
 urlpatterns = [
-    path("", csrf_protect(mp_graphql_view)),
+    # csrf_protect() doesn't support async views before Django 5.0, the async
+    # view is still protected by CsrfViewMiddleware.
+    path(
+        "",
+        mp_async_graphql_view
+        if settings.GRAPHQL_ASYNC
+        else csrf_protect(mp_graphql_view),
+    ),
 ]
@@ -1,19 +1,178 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import HttpRequest
+from django.http import HttpRequest, HttpResponse
 from django.utils.decorators import classonlymethod
-from strawberry.django.views import GraphQLView
-from strawberry.http import GraphQLHTTPResponse
+from graphql import GraphQLError
+from strawberry.django.context import StrawberryDjangoContext
+from strawberry.django.views import AsyncGraphQLView, GraphQLView
+from strawberry.exceptions import MissingQueryError
+from strawberry.http import GraphQLHTTPResponse, GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+from strawberry.http.parse_content_type import parse_content_type
+from strawberry.schema.exceptions import InvalidOperationTypeError
 from strawberry.types import ExecutionResult
+from strawberry.types.graphql import OperationType
+
+from mp.graphql.persisted_queries import (
+    PERSISTED_QUERY_NOT_FOUND,
+    PERSISTED_QUERY_VERSION,
+    get_persisted_query_store,
+)
+from mp.graphql.schema import async_schema, schema
+
+
+@dataclass
+class MPGraphQLRequestData(GraphQLRequestData):
+    extensions: dict[str, Any] | None = None
+
+
+@dataclass
+class BatchExecutionResult(ExecutionResult):
+    """Results of the operations of a batched request, in the request order."""
+
+    results: list[ExecutionResult] = field(default_factory=list)
+
+
+def _get_persisted_query_hash(extensions: Any) -> str | None:  # noqa: ANN401
+    """Return the persisted query hash of the request extensions, if any.
+
+    Raises `HTTPException` if the extensions are invalid.
+    """
+    if not isinstance(extensions, dict):
+        raise HTTPException(400, "Extensions must be an object.")
 
-from mp.graphql.schema import schema
+    persisted_query_data = extensions.get("persistedQuery")
+    if persisted_query_data is None:
+        return None
 
+    if not isinstance(persisted_query_data, dict):
+        raise HTTPException(400, "Persisted query must be an object.")
 
-class MPGrahpQLView(GraphQLView):
-    def process_result(
+    if persisted_query_data.get("version") != PERSISTED_QUERY_VERSION:
+        raise HTTPException(400, "Unsupported persisted query version.")
+
+    sha256_hash = persisted_query_data.get("sha256Hash")
+    if not isinstance(sha256_hash, str):
+        raise HTTPException(400, "Missing persisted query sha256Hash.")
+    return sha256_hash
+
+
+class MPGraphQLViewMixin:
+    """Request handling shared by the sync and async GraphQL views.
+
+    A JSON array body is a batch: its operations are executed in order within
+    the same request (context, session, database connection) and the response
+    is the array of their results.
+    """
+
+    allow_queries_via_get: bool
+
+    def get_request_data(self, data: dict[str, Any]) -> MPGraphQLRequestData:
+        return MPGraphQLRequestData(
+            query=data.get("query"),
+            variables=data.get("variables"),
+            operation_name=data.get("operationName"),
+            extensions=data.get("extensions"),
+        )
+
+    def get_batch_request_data(
+        self,
+        data: dict[str, Any] | list[Any],
+    ) -> MPGraphQLRequestData | list[MPGraphQLRequestData]:
+        if not isinstance(data, list):
+            return self.get_request_data(data)
+
+        if not data:
+            raise HTTPException(400, "Batched requests require an operation.")
+
+        if len(data) > settings.GRAPHQL_BATCH_MAX_SIZE:
+            raise HTTPException(
+                400,
+                "Batched requests are limited to "
+                f"{settings.GRAPHQL_BATCH_MAX_SIZE} operations.",
+            )
+
+        if not all(isinstance(operation, dict) for operation in data):
+            raise HTTPException(400, "Batched operations must be JSON objects.")
+
+        return [self.get_request_data(operation) for operation in data]
+
+    def get_batch_error_result(self, error: Exception, method: str) -> ExecutionResult:
+        """Return the result of a batched operation failing before its execution.
+
+        Unlike a single operation it does not fail the request, the previous
+        operations of the batch are already executed.
+        """
+        if isinstance(error, HTTPException):
+            message = error.reason
+        elif isinstance(error, InvalidOperationTypeError):
+            message = error.as_http_error_reason(method)  # type: ignore[arg-type]
+        else:
+            message = "No GraphQL query found in the request"
+        return ExecutionResult(data=None, errors=[GraphQLError(message)])
+
+    def get_persisted_query(
+        self,
+        request_data: GraphQLRequestData,
+    ) -> str | None:
+        """Return the persisted query text of the request, persisting it if needed.
+
+        Raises `GraphQLError` if the client has to send the query along its hash.
+        """
+        sha256_hash = _get_persisted_query_hash(
+            getattr(request_data, "extensions", None) or {},
+        )
+        if sha256_hash is None:
+            if settings.GRAPHQL_PERSISTED_QUERIES_ONLY:
+                raise HTTPException(400, "Only persisted queries are allowed.")
+            return None
+
+        store = get_persisted_query_store()
+        persisted_query = store.get(sha256_hash)
+        if persisted_query is not None and request_data.query in (
+            None,
+            persisted_query,
+        ):
+            return persisted_query
+
+        # With GRAPHQL_PERSISTED_QUERIES_ONLY the registered queries are an
+        # allowlist, clients cannot add new ones.
+        if request_data.query is None or settings.GRAPHQL_PERSISTED_QUERIES_ONLY:
+            raise GraphQLError(
+                PERSISTED_QUERY_NOT_FOUND,
+                extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+            )
+
+        try:
+            store.add(sha256_hash, request_data.query)
+        except ValueError as error:
+            raise HTTPException(400, str(error)) from error
+        return request_data.query
+
+    def get_allowed_operation_types(self, method: str) -> set[OperationType]:
+        allowed_operation_types = OperationType.from_http(method)  # type: ignore[arg-type]
+        if not self.allow_queries_via_get and method == "GET":
+            allowed_operation_types = allowed_operation_types - {OperationType.QUERY}
+        return allowed_operation_types
+
+    def format_result(
         self,
-        request: HttpRequest,
         result: ExecutionResult,
-    ) -> GraphQLHTTPResponse:
+    ) -> GraphQLHTTPResponse | list[GraphQLHTTPResponse]:
+        if isinstance(result, BatchExecutionResult):
+            batch_data = []
+            for operation_result in result.results:
+                operation_data = self.format_result(operation_result)
+                if operation_result.errors:
+                    # Only called by the base view for the (empty) batch errors.
+                    self._handle_errors(operation_result.errors, operation_data)
+                batch_data.append(operation_data)
+            return batch_data
+
         data: GraphQLHTTPResponse = {"data": result.data}
 
         if result.errors:
@@ -21,8 +180,98 @@ class MPGrahpQLView(GraphQLView):
             # No need to return data on errors.
             del data["data"]
 
+        if result.extensions:
+            data["extensions"] = result.extensions
+
         return data
 
+
+class MPGrahpQLView(MPGraphQLViewMixin, GraphQLView):
+    def parse_http_body(  # type: ignore[override]
+        self,
+        request,  # noqa: ANN001
+    ) -> GraphQLRequestData | list[MPGraphQLRequestData]:
+        content_type, _ = parse_content_type(request.content_type or "")
+        if request.method != "POST" or "application/json" not in content_type:
+            return super().parse_http_body(request)
+
+        return self.get_batch_request_data(self.parse_json(request.body))
+
+    def execute_operation(
+        self,
+        request: HttpRequest,
+        context: Any,  # noqa: ANN401
+        root_value: Any | None,  # noqa: ANN401
+    ) -> ExecutionResult:
+        request_adapter = self.request_adapter_class(request)
+
+        try:
+            request_data = self.parse_http_body(request_adapter)
+        except json.decoder.JSONDecodeError as error:
+            raise HTTPException(400, "Unable to parse request body as JSON") from error
+        except KeyError as error:
+            raise HTTPException(400, "File(s) missing in form data") from error
+
+        allowed_operation_types = self.get_allowed_operation_types(
+            request_adapter.method,
+        )
+        if not isinstance(request_data, list):
+            return self.execute_request_data(
+                request_data,
+                context,
+                root_value,
+                allowed_operation_types,
+            )
+
+        results = []
+        for operation_data in request_data:
+            try:
+                result = self.execute_request_data(
+                    operation_data,
+                    context,
+                    root_value,
+                    allowed_operation_types,
+                )
+            except (
+                HTTPException,
+                InvalidOperationTypeError,
+                MissingQueryError,
+            ) as error:
+                result = self.get_batch_error_result(error, request_adapter.method)
+            results.append(result)
+        return BatchExecutionResult(data=None, errors=None, results=results)
+
+    def execute_request_data(
+        self,
+        request_data: GraphQLRequestData,
+        context: Any,  # noqa: ANN401
+        root_value: Any | None,  # noqa: ANN401
+        allowed_operation_types: set[OperationType],
+    ) -> ExecutionResult:
+        try:
+            persisted_query = self.get_persisted_query(request_data)
+        except GraphQLError as error:
+            return ExecutionResult(data=None, errors=[error])
+
+        if persisted_query is not None:
+            request_data.query = persisted_query
+
+        return self.schema.execute_sync(
+            request_data.query,
+            root_value=root_value,
+            variable_values=request_data.variables,
+            context_value=context,
+            operation_name=request_data.operation_name,
+            allowed_operation_types=allowed_operation_types,
+        )
+
+    def process_result(  # type: ignore[override]
+        self,
+        request: HttpRequest,
+        result: ExecutionResult,
+    ) -> GraphQLHTTPResponse | list[GraphQLHTTPResponse]:
+        return self.format_result(result)
+
     @classonlymethod
     def as_view(self, **initkwargs):
         view = super().as_view(**initkwargs)
@@ -31,8 +280,124 @@ class MPGrahpQLView(GraphQLView):
         return view
 
 
+class MPAsyncGraphQLView(MPGraphQLViewMixin, AsyncGraphQLView):
+    """Async variant of `MPGrahpQLView`, for the async schema under ASGI.
+
+    An in-flight request only holds the event loop while it awaits the
+    database or the decryption running in a thread.
+    """
+
+    async def get_context(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+    ) -> StrawberryDjangoContext:
+        # Load the session user outside of the event loop, there is no
+        # `request.auser()` before Django 5.0.
+        await sync_to_async(lambda: request.user.is_authenticated)()
+        return await super().get_context(request, response)
+
+    async def parse_http_body(  # type: ignore[override]
+        self,
+        request,  # noqa: ANN001
+    ) -> GraphQLRequestData | list[MPGraphQLRequestData]:
+        content_type, _ = parse_content_type(request.content_type or "")
+        if request.method != "POST" or "application/json" not in content_type:
+            return await super().parse_http_body(request)
+
+        return self.get_batch_request_data(self.parse_json(await request.get_body()))
+
+    async def execute_operation(
+        self,
+        request: HttpRequest,
+        context: Any,  # noqa: ANN401
+        root_value: Any | None,  # noqa: ANN401
+    ) -> ExecutionResult:
+        request_adapter = self.request_adapter_class(request)
+
+        try:
+            request_data = await self.parse_http_body(request_adapter)
+        except json.decoder.JSONDecodeError as error:
+            raise HTTPException(400, "Unable to parse request body as JSON") from error
+        except KeyError as error:
+            raise HTTPException(400, "File(s) missing in form data") from error
+
+        allowed_operation_types = self.get_allowed_operation_types(
+            request_adapter.method,
+        )
+        if not isinstance(request_data, list):
+            return await self.execute_request_data(
+                request_data,
+                context,
+                root_value,
+                allowed_operation_types,
+            )
+
+        results = []
+        for operation_data in request_data:
+            try:
+                result = await self.execute_request_data(
+                    operation_data,
+                    context,
+                    root_value,
+                    allowed_operation_types,
+                )
+            except (
+                HTTPException,
+                InvalidOperationTypeError,
+                MissingQueryError,
+            ) as error:
+                result = self.get_batch_error_result(error, request_adapter.method)
+            results.append(result)
+        return BatchExecutionResult(data=None, errors=None, results=results)
+
+    async def execute_request_data(
+        self,
+        request_data: GraphQLRequestData,
+        context: Any,  # noqa: ANN401
+        root_value: Any | None,  # noqa: ANN401
+        allowed_operation_types: set[OperationType],
+    ) -> ExecutionResult:
+        try:
+            persisted_query = self.get_persisted_query(request_data)
+        except GraphQLError as error:
+            return ExecutionResult(data=None, errors=[error])
+
+        if persisted_query is not None:
+            request_data.query = persisted_query
+
+        return await self.schema.execute(
+            request_data.query,
+            root_value=root_value,
+            variable_values=request_data.variables,
+            context_value=context,
+            operation_name=request_data.operation_name,
+            allowed_operation_types=allowed_operation_types,
+        )
+
+    async def process_result(  # type: ignore[override]
+        self,
+        request: HttpRequest,
+        result: ExecutionResult,
+    ) -> GraphQLHTTPResponse | list[GraphQLHTTPResponse]:
+        return self.format_result(result)
+
+    @classonlymethod
+    def as_view(self, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.__name__ = "mp_async_graphql_view"
+
+        return view
+
+
 mp_graphql_view = MPGrahpQLView.as_view(
     schema=schema,
     allow_queries_via_get=False,
     graphql_ide="graphiql" if settings.DEBUG else None,
 )
+
+mp_async_graphql_view = MPAsyncGraphQLView.as_view(
+    schema=async_schema,
+    allow_queries_via_get=False,
+    graphql_ide="graphiql" if settings.DEBUG else None,
+)